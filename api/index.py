@@ -1,7 +1,12 @@
 import os
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# Function instances are frozen between invocations: keep one health-checked
+# connection per instance instead of a pool whose background workers stall.
+os.environ.setdefault("DB_CONN_MODE", "serverless")
 
 from django.core.wsgi import get_wsgi_application  # noqa: E402
 
-app = get_wsgi_application()
+from config.static_serving import wrap_static_files  # noqa: E402
+
+app = wrap_static_files(get_wsgi_application())
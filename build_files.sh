@@ -0,0 +1,5 @@
+#!/bin/bash
+# Vercel static build: collect hashed, precompressed assets into the CDN output dir.
+set -e
+python3 -m pip install -r requirements.txt
+DEBUG=False python3 manage.py collectstatic --noinput --clear
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import copy
 import os
 from pathlib import Path
 
@@ -37,6 +38,13 @@ def _env_bool(name: str, default: bool = False) -> bool:
     return os.getenv(name, str(default)).strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)).strip())
+    except ValueError:
+        return default
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
 
@@ -70,6 +78,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'main.profiling.RequestProfilingMiddleware',
+    'main.query_budget.QueryBudgetMiddleware',
+    'main.db_routing.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -106,6 +117,100 @@ DATABASES = {
     }
 }
 
+# Opt-in SQLite profile for single-node deployments with concurrent writers:
+# WAL lets readers proceed alongside a writer, IMMEDIATE transactions take the
+# write lock up front so busy_timeout waits instead of failing mid-transaction.
+SQLITE_TUNED_OPTIONS = {
+    "init_command": (
+        "PRAGMA journal_mode=WAL;"
+        "PRAGMA synchronous=NORMAL;"
+        "PRAGMA cache_size=-32000;"
+        "PRAGMA mmap_size=134217728;"
+        "PRAGMA temp_store=MEMORY"
+    ),
+    "transaction_mode": "IMMEDIATE",
+    "timeout": _env_int("DB_SQLITE_BUSY_TIMEOUT", 20),
+}
+DB_SQLITE_PROFILE = os.getenv("DB_SQLITE_PROFILE", "default").strip().lower()
+
+if DB_SQLITE_PROFILE == "tuned" and DATABASES["default"]["ENGINE"].endswith("sqlite3"):
+    DATABASES["default"]["OPTIONS"] = dict(SQLITE_TUNED_OPTIONS)
+
+# Connection management:
+#   default    - open and close a connection per request (Django default)
+#   persistent - reuse connections for DB_CONN_MAX_AGE seconds, health-checked before reuse
+#   pool       - psycopg connection pool (PostgreSQL only), sized by DB_POOL_* settings
+#   serverless - short-lived persistent connection suited to frozen/thawed function instances
+DB_CONN_MODE = os.getenv("DB_CONN_MODE", "serverless" if os.getenv("VERCEL") else "default").strip().lower()
+
+if DB_CONN_MODE == "persistent":
+    DATABASES["default"]["CONN_MAX_AGE"] = _env_int("DB_CONN_MAX_AGE", 60)
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+elif DB_CONN_MODE == "serverless":
+    DATABASES["default"]["CONN_MAX_AGE"] = _env_int("DB_CONN_MAX_AGE", 30)
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+    if DATABASES["default"]["ENGINE"].endswith("postgresql"):
+        DATABASES["default"]["OPTIONS"] = {"connect_timeout": _env_int("DB_CONNECT_TIMEOUT", 5)}
+elif DB_CONN_MODE == "pool" and DATABASES["default"]["ENGINE"].endswith("postgresql"):
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": _env_int("DB_POOL_MIN_SIZE", 2),
+            "max_size": _env_int("DB_POOL_MAX_SIZE", 10),
+            "timeout": _env_int("DB_POOL_TIMEOUT", 10),
+            "max_idle": _env_int("DB_POOL_MAX_IDLE", 300),
+        },
+    }
+
+# Read replicas. DB_REPLICAS lists replica hosts (PostgreSQL) or database files
+# (SQLite, for local testing with `manage.py replica_status --sync-sqlite`); each
+# becomes a "replicaN" alias sharing the primary's other settings. Views marked
+# with @read_from_replica send GET reads there unless the browser wrote within
+# REPLICA_STICKY_SECONDS or the replica lags more than REPLICA_MAX_LAG_SECONDS.
+# Lag is probed every REPLICA_HEALTH_CHECK_INTERVAL by a thread per process or,
+# where threads freeze (Vercel), by `manage.py replica_status` against a shared
+# cache; with no recent probe every read goes to the primary.
+REPLICA_DATABASES = []
+for _idx, _target in enumerate(filter(None, (item.strip() for item in os.getenv("DB_REPLICAS", "").split(","))), start=1):
+    _replica = copy.deepcopy(DATABASES["default"])
+    _replica["NAME" if _replica["ENGINE"].endswith("sqlite3") else "HOST"] = _target
+    _replica["TEST"] = {"MIRROR": "default"}
+    DATABASES[f"replica{_idx}"] = _replica
+    REPLICA_DATABASES.append(f"replica{_idx}")
+
+DATABASE_ROUTERS = ["main.db_routing.ReadReplicaRouter"]
+REPLICA_STICKY_SECONDS = _env_int("REPLICA_STICKY_SECONDS", 15)
+REPLICA_MAX_LAG_SECONDS = _env_int("REPLICA_MAX_LAG_SECONDS", 5)
+REPLICA_HEALTH_CHECK_INTERVAL = _env_int("REPLICA_HEALTH_CHECK_INTERVAL", 2)
+REPLICA_HEALTH_PROBE_THREAD = _env_bool("REPLICA_HEALTH_PROBE_THREAD", not os.getenv("VERCEL"))
+
+
+# Cache, sessions and the authenticated-user fast path
+# SESSION_BACKEND: db (default) | cached_db | cache. With AUTH_USER_CACHE_TIMEOUT > 0
+# request.user is served from the cache instead of a query per request.
+# cached_db/cache sessions and the user cache need a CACHE_BACKEND shared by all
+# workers (Redis, Memcached, database); the main.E001 check refuses LocMemCache.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+SESSION_ENGINE = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+}.get(os.getenv("SESSION_BACKEND", "db").strip().lower(), "django.contrib.sessions.backends.db")
+
+AUTH_USER_CACHE_TIMEOUT = _env_int("AUTH_USER_CACHE_TIMEOUT", 0)
+if AUTH_USER_CACHE_TIMEOUT > 0:
+    # ModelBackend stays listed so sessions created before the switch remain valid.
+    AUTHENTICATION_BACKENDS = [
+        "main.auth_backends.CachedModelBackend",
+        "django.contrib.auth.backends.ModelBackend",
+    ]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -142,10 +247,112 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = 'static/'
+# Same directory build_files.sh collects into and vercel.json publishes, so the
+# manifest the app reads is the one that was deployed.
+STATIC_ROOT = Path(os.getenv('STATIC_ROOT', BASE_DIR / 'staticfiles_build' / 'static'))
+STATICFILES_DIRS = [
+    ('images', BASE_DIR / 'images'),
+]
+# Production builds collect content-hashed, precompressed (.gz/.br) files that
+# config.static_serving serves with immutable cache headers.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage'
+            if DEBUG
+            else 'main.static_storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# "single" renders all questions on one page; "paged" serves one section per request.
+ASSESSMENT_FORM_MODE = os.getenv("ASSESSMENT_FORM_MODE", "single").strip().lower()
+
+# Autosaved assessment drafts expire after this many hours and are purged by
+# `manage.py purge_assessment_drafts`.
+ASSESSMENT_DRAFT_TTL_HOURS = _env_int("ASSESSMENT_DRAFT_TTL_HOURS", 72)
+ASSESSMENT_DRAFT_PURGE_BATCH_SIZE = _env_int("ASSESSMENT_DRAFT_PURGE_BATCH_SIZE", 500)
+
 LOGIN_URL = "login"
 LOGIN_REDIRECT_URL = "home"
 LOGOUT_REDIRECT_URL = "home"
 
+
+# Assessment analytics
+# Raw events and fine-grained rollups are pruned by `manage.py prune_analytics`.
+
+ANALYTICS_EVENT_RETENTION_DAYS = _env_int("ANALYTICS_EVENT_RETENTION_DAYS", 30)
+ANALYTICS_MINUTE_ROLLUP_RETENTION_HOURS = _env_int("ANALYTICS_MINUTE_ROLLUP_RETENTION_HOURS", 48)
+ANALYTICS_HOUR_ROLLUP_RETENTION_DAYS = _env_int("ANALYTICS_HOUR_ROLLUP_RETENTION_DAYS", 90)
+ANALYTICS_PRUNE_BATCH_SIZE = _env_int("ANALYTICS_PRUNE_BATCH_SIZE", 1000)
+
+
+# Report storage compression
+# REPORT_COMPRESSION_CODEC: zlib (default) | zstd (requires the zstandard package) | none.
+# Stored values carry their codec, so switching only affects newly written rows;
+# `manage.py recompress_reports` rewrites existing ones.
+
+REPORT_COMPRESSION_CODEC = os.getenv("REPORT_COMPRESSION_CODEC", "zlib").strip().lower()
+REPORT_COMPRESSION_LEVEL = _env_int("REPORT_COMPRESSION_LEVEL", 6)
+# Use the latest dictionary trained by `manage.py train_report_dictionary`.
+REPORT_COMPRESSION_DICTIONARY = _env_bool("REPORT_COMPRESSION_DICTIONARY", False)
+
+# Reports older than this are moved to the archive table by `manage.py archive_reports`.
+REPORT_ARCHIVE_AFTER_DAYS = _env_int("REPORT_ARCHIVE_AFTER_DAYS", 365)
+REPORT_ARCHIVE_BATCH_SIZE = _env_int("REPORT_ARCHIVE_BATCH_SIZE", 500)
+
+# Local red-flag pre-screen: on a match the user gets the emergency page at once
+# and the model assessment finishes in a background thread.
+RED_FLAG_PRESCREEN = _env_bool("RED_FLAG_PRESCREEN", True)
+# Serverless instances freeze once the response is sent, so on Vercel the
+# report is finished from the report page instead of a thread. Reports still
+# pending after PENDING_ASSESSMENT_STALE_SECONDS are picked up by the report
+# page or `manage.py finish_pending_assessments`.
+RED_FLAG_BACKGROUND_THREAD = _env_bool("RED_FLAG_BACKGROUND_THREAD", not os.getenv("VERCEL"))
+PENDING_ASSESSMENT_STALE_SECONDS = _env_int("PENDING_ASSESSMENT_STALE_SECONDS", 120)
+
+# Assessment model routing. Each payload is scored by answered questions,
+# free-text length and red-flag pre-screen result, then sent to one tier.
+ASSESSMENT_MODEL_ROUTING = _env_bool("ASSESSMENT_MODEL_ROUTING", True)
+ASSESSMENT_MODEL_TIERS = {
+    "fast": {
+        "model": os.getenv("OPENAI_FAST_MODEL", "gpt-4.1-nano"),
+        "timeout": _env_int("OPENAI_FAST_TIMEOUT", 20),
+    },
+    "standard": {
+        "model": os.getenv("OPENAI_MODEL", "gpt-4.1-mini"),
+        "timeout": _env_int("OPENAI_TIMEOUT", 60),
+    },
+    "thorough": {
+        "model": os.getenv("OPENAI_THOROUGH_MODEL", os.getenv("OPENAI_MODEL", "gpt-4.1-mini")),
+        "timeout": _env_int("OPENAI_THOROUGH_TIMEOUT", 90),
+    },
+}
+ROUTING_FAST_MAX_ANSWERS = _env_int("ROUTING_FAST_MAX_ANSWERS", 8)
+ROUTING_FAST_MAX_CHARS = _env_int("ROUTING_FAST_MAX_CHARS", 600)
+ROUTING_THOROUGH_MIN_ANSWERS = _env_int("ROUTING_THOROUGH_MIN_ANSWERS", 30)
+ROUTING_THOROUGH_MIN_CHARS = _env_int("ROUTING_THOROUGH_MIN_CHARS", 4000)
+
+# Check each generated report for the nine sections and the disclaimer and ask
+# the model for only the missing or malformed ones.
+REPORT_SECTION_REPAIR = _env_bool("REPORT_SECTION_REPAIR", True)
+
+# Staff can profile a single request by adding ?_profile=<token> (or an
+# X-Profile-Token header); the token is shown on the request profile admin page.
+REQUEST_PROFILING = _env_bool("REQUEST_PROFILING", True)
+REQUEST_PROFILING_TOKEN_MAX_AGE = _env_int("REQUEST_PROFILING_TOKEN_MAX_AGE", 3600)
+REQUEST_PROFILING_MAX_QUERIES = _env_int("REQUEST_PROFILING_MAX_QUERIES", 500)
+REQUEST_PROFILING_SUMMARY_ROWS = _env_int("REQUEST_PROFILING_SUMMARY_ROWS", 40)
+
+# Per-view query budgets (main.query_budget). Views declare a limit with
+# @query_budget; the same statement running more than QUERY_BUDGET_MAX_REPEATS
+# times in one request is reported as a likely N+1.
+QUERY_BUDGET_ENABLED = _env_bool("QUERY_BUDGET_ENABLED", DEBUG)
+QUERY_BUDGET_RAISE = _env_bool("QUERY_BUDGET_RAISE", False)
+QUERY_BUDGET_DEFAULT = _env_int("QUERY_BUDGET_DEFAULT", 20)
+QUERY_BUDGET_MAX_REPEATS = _env_int("QUERY_BUDGET_MAX_REPEATS", 2)
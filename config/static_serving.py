@@ -0,0 +1,112 @@
+import mimetypes
+import re
+from pathlib import Path
+
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{12}\.[^./]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+BLOCK_SIZE = 64 * 1024
+
+
+def accepted_encodings(header: str) -> dict[str, float]:
+    # "gzip;q=0.5, br;q=0" -> {"gzip": 0.5, "br": 0.0}; malformed q-values count as 0.
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(header: str, available: list[str]) -> str | None:
+    # Highest q wins, ties go to the order of ENCODINGS; "*" covers unlisted names.
+    accepted = accepted_encodings(header)
+    best, best_quality = None, 0.0
+    for name in available:
+        quality = accepted.get(name, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class FileIterator:
+    # WSGI servers call close() when the response is done, even if the client goes away.
+    def __init__(self, handle, block_size: int = BLOCK_SIZE):
+        self.handle = handle
+        self.block_size = block_size
+
+    def __iter__(self):
+        return iter(lambda: self.handle.read(self.block_size), b"")
+
+    def close(self):
+        self.handle.close()
+
+
+class PrecompressedStaticFiles:
+    # Serves collected static files straight from STATIC_ROOT before the request
+    # reaches Django, preferring the .br/.gz variants written at collectstatic time.
+
+    def __init__(self, application, root, prefix: str):
+        self.application = application
+        self.root = Path(root).resolve()
+        self.prefix = "/" + prefix.strip("/") + "/"
+
+    def __call__(self, environ, start_response):
+        path_info = environ.get("PATH_INFO", "")
+        if environ.get("REQUEST_METHOD") in ("GET", "HEAD") and path_info.startswith(self.prefix):
+            response = self.serve(environ, start_response, path_info[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.application(environ, start_response)
+
+    def resolve(self, relative: str) -> Path | None:
+        candidate = (self.root / relative).resolve()
+        if self.root not in candidate.parents or not candidate.is_file():
+            return None
+        return candidate
+
+    def serve(self, environ, start_response, relative: str):
+        source = self.resolve(relative)
+        if source is None:
+            return None
+
+        variants = {name: source.with_name(source.name + suffix) for name, suffix in ENCODINGS}
+        available = [name for name, variant in variants.items() if variant.is_file()]
+        encoding = choose_encoding(environ.get("HTTP_ACCEPT_ENCODING", ""), available)
+        served = variants[encoding] if encoding else source
+
+        content_type = mimetypes.guess_type(source.name)[0] or "application/octet-stream"
+        headers = [
+            ("Content-Type", content_type),
+            ("Content-Length", str(served.stat().st_size)),
+            ("Cache-Control", IMMUTABLE_CACHE_CONTROL if HASHED_NAME_RE.search(source.name) else DEFAULT_CACHE_CONTROL),
+            ("Vary", "Accept-Encoding"),
+        ]
+        if encoding:
+            headers.append(("Content-Encoding", encoding))
+        start_response("200 OK", headers)
+        if environ["REQUEST_METHOD"] == "HEAD":
+            return [b""]
+        handle = served.open("rb")
+        file_wrapper = environ.get("wsgi.file_wrapper")
+        if file_wrapper is not None:
+            return file_wrapper(handle, BLOCK_SIZE)
+        return FileIterator(handle)
+
+
+def wrap_static_files(application):
+    from django.conf import settings
+
+    if settings.DEBUG or not Path(settings.STATIC_ROOT).is_dir():
+        return application
+    return PrecompressedStaticFiles(application, settings.STATIC_ROOT, settings.STATIC_URL)
@@ -1,17 +1,204 @@
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
 
-from .models import AssessmentReport, Note
+from .analytics import analytics_overview, hourly_volume, repair_summary, tier_latency_summary
+from .db_routing import pinned_to_primary, replica_reads
+from .db_stats import connection_stats
+from .models import (
+    ArchivedReport,
+    AssessmentEvent,
+    AssessmentReport,
+    AssessmentRollup,
+    CompressionDictionary,
+    Note,
+    RequestProfile,
+    SearchDocument,
+    UserRiskSummary,
+)
+from .profiling import PROFILE_PARAM, profiling_token
+from .search import search_documents
+
+
+class IndexedSearchAdminMixin:
+    search_kind = ""
+    indexed_search_limit = 1000
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method != "GET" or pinned_to_primary(request):
+            return super().changelist_view(request, extra_context)
+        with replica_reads():
+            return super().changelist_view(request, extra_context)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        # One id past the limit tells us the ranked list was cut short.
+        object_ids = search_documents(search_term, kind=self.search_kind).ranked_object_ids(self.indexed_search_limit + 1)
+        if len(object_ids) > self.indexed_search_limit:
+            object_ids = object_ids[: self.indexed_search_limit]
+            self.message_user(
+                request,
+                f"Only the {self.indexed_search_limit} best full-text matches are shown; refine the search to see the rest.",
+                messages.WARNING,
+            )
+        field_matches, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=object_ids) | field_matches, may_have_duplicates
 
 
 @admin.register(Note)
-class NoteAdmin(admin.ModelAdmin):
+class NoteAdmin(IndexedSearchAdminMixin, admin.ModelAdmin):
     list_display = ("id", "title", "is_done", "created_at")
     list_filter = ("is_done", "created_at")
-    search_fields = ("title", "content")
+    search_fields = ("user__username",)
+    search_kind = SearchDocument.KIND_NOTE
 
 
 @admin.register(AssessmentReport)
-class AssessmentReportAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "created_at")
+class AssessmentReportAdmin(IndexedSearchAdminMixin, admin.ModelAdmin):
+    list_display = ("id", "user", "status", "created_at")
+    list_filter = ("status", "created_at")
+    search_fields = ("user__username",)
+    search_kind = SearchDocument.KIND_REPORT
+
+
+@admin.register(ArchivedReport)
+class ArchivedReportAdmin(IndexedSearchAdminMixin, admin.ModelAdmin):
+    list_display = ("id", "user", "created_at", "archived_at")
     list_filter = ("created_at",)
-    search_fields = ("user__username", "ai_report")
+    search_fields = ("user__username",)
+    search_kind = SearchDocument.KIND_REPORT
+    readonly_fields = [field.name for field in ArchivedReport._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(UserRiskSummary)
+class UserRiskSummaryAdmin(admin.ModelAdmin):
+    list_display = ("user", "total_reports", "latest_risk_label", "latest_report_at")
+    list_filter = ("latest_risk_label",)
+    search_fields = ("user__username",)
+    readonly_fields = [field.name for field in UserRiskSummary._meta.fields]
+
+
+@admin.register(AssessmentEvent)
+class AssessmentEventAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "tier", "model", "status", "risk_label", "latency_ms", "input_tokens", "output_tokens")
+    list_filter = ("tier", "status", "model", "risk_label")
+    date_hierarchy = "created_at"
+    readonly_fields = [field.name for field in AssessmentEvent._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(AssessmentRollup)
+class AssessmentRollupAdmin(admin.ModelAdmin):
+    change_list_template = "admin/main/assessmentrollup/change_list.html"
+    list_display = ("bucket_start", "granularity", "total", "errors", "latency_max_ms", "input_tokens", "output_tokens")
+    list_filter = ("granularity",)
+    readonly_fields = [field.name for field in AssessmentRollup._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {
+            **(extra_context or {}),
+            "analytics_windows": analytics_overview(),
+            "hourly_volume": hourly_volume(),
+            "tier_latency": tier_latency_summary(),
+            "section_repair": repair_summary(),
+            "db_connection_stats": connection_stats(),
+        }
+        return super().changelist_view(request, extra_context=extra_context)
+
+
+@admin.register(CompressionDictionary)
+class CompressionDictionaryAdmin(admin.ModelAdmin):
+    list_display = ("id", "codec", "sample_count", "created_at")
+    list_filter = ("codec",)
+    exclude = ("data",)
+    readonly_fields = ("codec", "sample_count", "created_at")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        # Stored rows reference dictionaries by id and cannot be decoded without them.
+        return False
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    change_list_template = "admin/main/requestprofile/change_list.html"
+    list_display = ("created_at", "method", "path", "status_code", "duration_ms", "query_count", "query_ms", "user")
+    list_filter = ("view_name", "status_code")
+    date_hierarchy = "created_at"
+    exclude = ("stats", "summary", "queries")
+    readonly_fields = (
+        "created_at",
+        "user",
+        "method",
+        "path",
+        "view_name",
+        "status_code",
+        "duration_ms",
+        "query_count",
+        "query_ms",
+        "download",
+        "profile_summary",
+        "query_table",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        urls = [
+            path(
+                "<int:pk>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="main_requestprofile_download",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def download_view(self, request, pk):
+        if not self.has_view_permission(request):
+            return HttpResponse(status=403)
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        response = HttpResponse(bytes(profile.stats), content_type="application/octet-stream")
+        response["Content-Disposition"] = f'attachment; filename="request-profile-{profile.pk}.prof"'
+        return response
+
+    @admin.display(description="pstats file")
+    def download(self, obj):
+        url = reverse("admin:main_requestprofile_download", args=[obj.pk])
+        return format_html('<a href="{}">request-profile-{}.prof</a>', url, obj.pk)
+
+    @admin.display(description="Top functions (cumulative)")
+    def profile_summary(self, obj):
+        return format_html('<pre style="white-space: pre; overflow-x: auto;">{}</pre>', obj.summary)
+
+    @admin.display(description="SQL queries")
+    def query_table(self, obj):
+        rows = format_html_join(
+            "",
+            "<tr><td>{}</td><td>{}</td><td><code>{}</code></td></tr>",
+            ((query["ms"], query["alias"], query["sql"]) for query in obj.queries),
+        )
+        return format_html("<table><tr><th>ms</th><th>DB</th><th>SQL</th></tr>{}</table>", rows)
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {
+            **(extra_context or {}),
+            "profiling_param": PROFILE_PARAM,
+            "profiling_token": profiling_token(request.user),
+            "profiling_token_minutes": settings.REQUEST_PROFILING_TOKEN_MAX_AGE // 60,
+        }
+        return super().changelist_view(request, extra_context=extra_context)
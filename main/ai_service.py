@@ -1,5 +1,7 @@
 import json
 import os
+import time
+from dataclasses import dataclass
 from typing import Any
 
 from .assessment_data import ASSESSMENT_QUESTIONS
@@ -112,6 +114,25 @@ At the end of every response, include exactly this sentence:
 "This assessment is for informational purposes only and does not replace professional medical evaluation. Please consult a licensed healthcare provider for diagnosis and treatment."
 """.strip()
 
+MANDATORY_DISCLAIMER = (
+    "This assessment is for informational purposes only and does not replace professional medical evaluation. "
+    "Please consult a licensed healthcare provider for diagnosis and treatment."
+)
+
+SECTION_REPAIR_PROMPT = """
+Your report is missing these sections or they are incomplete:
+{headings}
+
+Return only these sections, complete, with exactly these headings and in this order. Do not repeat any other section or the disclaimer.
+""".strip()
+
+FOLLOW_UP_PROMPT = """
+Answers to your clarifying questions:
+{answers}
+
+Update the assessment with this information and return the complete report in the required output format.
+""".strip()
+
 
 def build_assessment_payload(cleaned_data: dict[str, Any]) -> dict[str, Any]:
     question_answers = []
@@ -131,45 +152,126 @@ def build_assessment_payload(cleaned_data: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def generate_assessment_report(payload: dict[str, Any]) -> str:
+@dataclass
+class AssessmentOutcome:
+    text: str
+    model: str
+    status: str = "ok"
+    latency_ms: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    response_id: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+def _request_model(
+    input_items: list[dict[str, Any]],
+    model: str | None = None,
+    timeout: float | None = None,
+    previous_response_id: str | None = None,
+) -> AssessmentOutcome:
     api_key = os.getenv("OPENAI_API_KEY", "")
-    model = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+    model = model or os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
     if not api_key:
-        return (
-            "OpenAI API key is missing.\n"
-            "Set OPENAI_API_KEY in .env or environment variables and submit the test again."
+        return AssessmentOutcome(
+            text=(
+                "OpenAI API key is missing.\n"
+                "Set OPENAI_API_KEY in .env or environment variables and submit the test again."
+            ),
+            model=model,
+            status="error",
         )
 
     try:
         from openai import OpenAI
     except Exception:
-        return (
-            "OpenAI Python SDK is not installed.\n"
-            "Install it with: py -m pip install openai"
+        return AssessmentOutcome(
+            text=(
+                "OpenAI Python SDK is not installed.\n"
+                "Install it with: py -m pip install openai"
+            ),
+            model=model,
+            status="error",
         )
 
+    started = time.perf_counter()
     try:
-        client = OpenAI(api_key=api_key)
-        response = client.responses.create(
-            model=model,
-            input=[
-                {
-                    "role": "system",
-                    "content": [{"type": "input_text", "text": SYSTEM_PROMPT}],
-                },
-                {
-                    "role": "user",
-                    "content": [{"type": "input_text", "text": json.dumps(payload, ensure_ascii=False)}],
-                },
-            ],
-        )
+        client = OpenAI(api_key=api_key, timeout=timeout) if timeout else OpenAI(api_key=api_key)
+        request = {"model": model, "input": input_items}
+        if previous_response_id:
+            request["previous_response_id"] = previous_response_id
+        response = client.responses.create(**request)
+        latency_ms = int((time.perf_counter() - started) * 1000)
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
         output_text = getattr(response, "output_text", "")
+        response_id = getattr(response, "id", "") or ""
         if output_text:
-            return output_text
-        return "Analysis completed, but no textual response was returned."
+            return AssessmentOutcome(output_text, model, "ok", latency_ms, input_tokens, output_tokens, response_id)
+        return AssessmentOutcome(
+            "Analysis completed, but no textual response was returned.",
+            model,
+            "empty",
+            latency_ms,
+            input_tokens,
+            output_tokens,
+            response_id,
+        )
     except Exception as exc:
-        return (
-            "OpenAI analysis failed.\n"
-            "Please check API key/model/network and try again.\n"
-            f"Technical details: {exc}"
+        return AssessmentOutcome(
+            text=(
+                "OpenAI analysis failed.\n"
+                "Please check API key/model/network and try again.\n"
+                f"Technical details: {exc}"
+            ),
+            model=model,
+            status="error",
+            latency_ms=int((time.perf_counter() - started) * 1000),
         )
+
+
+def _user_message(text: str) -> dict[str, Any]:
+    return {"role": "user", "content": [{"type": "input_text", "text": text}]}
+
+
+def run_assessment(payload: dict[str, Any], model: str | None = None, timeout: float | None = None) -> AssessmentOutcome:
+    return _request_model(
+        [
+            {
+                "role": "system",
+                "content": [{"type": "input_text", "text": SYSTEM_PROMPT}],
+            },
+            _user_message(json.dumps(payload, ensure_ascii=False)),
+        ],
+        model,
+        timeout,
+    )
+
+
+def continue_assessment(
+    previous_response_id: str,
+    answers: str,
+    model: str | None = None,
+    timeout: float | None = None,
+) -> AssessmentOutcome:
+    # The system prompt and original payload are already part of the stored
+    # upstream conversation; only the new answers are sent.
+    return _request_model([_user_message(FOLLOW_UP_PROMPT.format(answers=answers))], model, timeout, previous_response_id)
+
+
+def repair_sections(
+    previous_response_id: str,
+    headings: list[str],
+    model: str | None = None,
+    timeout: float | None = None,
+) -> AssessmentOutcome:
+    prompt = SECTION_REPAIR_PROMPT.format(headings="\n".join(headings))
+    return _request_model([_user_message(prompt)], model, timeout, previous_response_id)
+
+
+def generate_assessment_report(payload: dict[str, Any]) -> str:
+    return run_assessment(payload).text
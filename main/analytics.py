@@ -0,0 +1,304 @@
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .ai_service import AssessmentOutcome
+from .model_routing import RoutingDecision
+from .models import AssessmentEvent, AssessmentRollup
+
+LATENCY_BUCKETS_MS = [500, 1000, 2000, 4000, 8000, 15000, 30000, 60000]
+
+ROLLUP_TRUNCATE = {
+    AssessmentRollup.GRANULARITY_MINUTE: {"second": 0, "microsecond": 0},
+    AssessmentRollup.GRANULARITY_HOUR: {"minute": 0, "second": 0, "microsecond": 0},
+    AssessmentRollup.GRANULARITY_DAY: {"hour": 0, "minute": 0, "second": 0, "microsecond": 0},
+}
+
+DASHBOARD_WINDOWS = [
+    ("Last hour", AssessmentRollup.GRANULARITY_MINUTE, timedelta(hours=1)),
+    ("Last 24 hours", AssessmentRollup.GRANULARITY_HOUR, timedelta(hours=24)),
+    ("Last 30 days", AssessmentRollup.GRANULARITY_DAY, timedelta(days=30)),
+]
+
+
+def latency_bucket_index(latency_ms: int) -> int:
+    for idx, upper in enumerate(LATENCY_BUCKETS_MS):
+        if latency_ms <= upper:
+            return idx
+    return len(LATENCY_BUCKETS_MS)
+
+
+def bucket_start(moment, granularity: str):
+    return moment.replace(**ROLLUP_TRUNCATE[granularity])
+
+
+def _empty_histogram() -> list[int]:
+    return [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+
+def add_tier_stats(stats: dict[str, Any], event) -> None:
+    # Per "tier|model" counters; the histogram only holds successful calls.
+    # Also used by migration 0017 to backfill daily rollups from raw events.
+    if not event.tier:
+        return
+    entry = stats.setdefault(
+        f"{event.tier}|{event.model}",
+        {"total": 0, "errors": 0, "latency_sum_ms": 0, "latency_max_ms": 0, "output_tokens": 0, "ok_histogram": _empty_histogram()},
+    )
+    entry["total"] += 1
+    if event.status == "ok":
+        entry["ok_histogram"][latency_bucket_index(event.latency_ms)] += 1
+    else:
+        entry["errors"] += 1
+    entry["latency_sum_ms"] += event.latency_ms
+    entry["latency_max_ms"] = max(entry["latency_max_ms"], event.latency_ms)
+    entry["output_tokens"] += event.output_tokens
+
+
+def add_repair_stats(stats: dict[str, Any], event) -> None:
+    # Section repair counters over successful assessments. Also used by
+    # migration 0018 to backfill daily rollups from raw events.
+    if event.status != "ok":
+        return
+    for key in ("completed", "repaired", "incomplete", "disclaimer_only", "repair_tokens", "saved_tokens"):
+        stats.setdefault(key, 0)
+    sections = stats.setdefault("sections", {})
+    stats["completed"] += 1
+    repair = event.repair
+    if not repair:
+        return
+    stats["repaired"] += 1
+    stats["incomplete"] += 0 if repair.get("complete") else 1
+    stats["disclaimer_only"] += 0 if repair.get("sections") else 1
+    for key in repair.get("sections", []):
+        sections[key] = sections.get(key, 0) + 1
+    stats["repair_tokens"] += repair.get("input_tokens", 0) + repair.get("output_tokens", 0)
+    stats["saved_tokens"] += repair.get("saved_tokens", 0)
+
+
+def _apply_event(rollup: AssessmentRollup, event: AssessmentEvent) -> None:
+    rollup.total += 1
+    if event.status != "ok":
+        rollup.errors += 1
+    rollup.latency_sum_ms += event.latency_ms
+    rollup.latency_max_ms = max(rollup.latency_max_ms, event.latency_ms)
+    histogram = rollup.latency_histogram or _empty_histogram()
+    histogram[latency_bucket_index(event.latency_ms)] += 1
+    rollup.latency_histogram = histogram
+    if event.risk_label:
+        rollup.risk_counts[event.risk_label] = rollup.risk_counts.get(event.risk_label, 0) + 1
+    rollup.input_tokens += event.input_tokens
+    rollup.output_tokens += event.output_tokens
+    add_tier_stats(rollup.tier_stats, event)
+    add_repair_stats(rollup.repair_stats, event)
+
+
+def record_assessment_event(
+    outcome: AssessmentOutcome,
+    user_id: int | None = None,
+    report_id: int | None = None,
+    risk_label: str = "",
+    routing: RoutingDecision | None = None,
+    repair: dict[str, Any] | None = None,
+) -> AssessmentEvent:
+    now = timezone.now()
+    with transaction.atomic():
+        event = AssessmentEvent.objects.create(
+            created_at=now,
+            user_id=user_id,
+            report_id=report_id,
+            model=outcome.model,
+            tier=routing.tier if routing else "",
+            routing=routing.as_dict() if routing else {},
+            repair=repair or {},
+            status=outcome.status,
+            risk_label=risk_label if outcome.ok else "",
+            latency_ms=outcome.latency_ms,
+            input_tokens=outcome.input_tokens,
+            output_tokens=outcome.output_tokens,
+        )
+        for granularity, _ in AssessmentRollup.GRANULARITY_CHOICES:
+            rollup, _ = AssessmentRollup.objects.select_for_update().get_or_create(
+                granularity=granularity,
+                bucket_start=bucket_start(now, granularity),
+            )
+            _apply_event(rollup, event)
+            rollup.save()
+    return event
+
+
+def latency_percentile(histogram: list[int], percentile: float) -> int | None:
+    total = sum(histogram)
+    if not total:
+        return None
+    threshold = total * percentile
+    running = 0
+    for idx, count in enumerate(histogram):
+        running += count
+        if running >= threshold:
+            return LATENCY_BUCKETS_MS[idx] if idx < len(LATENCY_BUCKETS_MS) else None
+    return None
+
+
+def summarize_rollups(rollups) -> dict[str, Any]:
+    histogram = _empty_histogram()
+    risk_counts: dict[str, int] = {}
+    summary = {
+        "total": 0,
+        "errors": 0,
+        "latency_sum_ms": 0,
+        "latency_max_ms": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+    }
+    for rollup in rollups:
+        summary["total"] += rollup.total
+        summary["errors"] += rollup.errors
+        summary["latency_sum_ms"] += rollup.latency_sum_ms
+        summary["latency_max_ms"] = max(summary["latency_max_ms"], rollup.latency_max_ms)
+        summary["input_tokens"] += rollup.input_tokens
+        summary["output_tokens"] += rollup.output_tokens
+        for idx, count in enumerate(rollup.latency_histogram or []):
+            histogram[idx] += count
+        for label, count in rollup.risk_counts.items():
+            risk_counts[label] = risk_counts.get(label, 0) + count
+
+    total = summary["total"]
+    summary["error_rate"] = round(summary["errors"] * 100 / total, 1) if total else 0.0
+    summary["latency_avg_ms"] = round(summary["latency_sum_ms"] / total) if total else 0
+    summary["latency_p50_ms"] = latency_percentile(histogram, 0.5)
+    summary["latency_p95_ms"] = latency_percentile(histogram, 0.95)
+    summary["risk_counts"] = sorted(risk_counts.items(), key=lambda item: -item[1])
+    summary["latency_histogram"] = [
+        {"label": f"<= {upper / 1000:g}s", "count": count}
+        for upper, count in zip(LATENCY_BUCKETS_MS, histogram)
+    ] + [{"label": f"> {LATENCY_BUCKETS_MS[-1] / 1000:g}s", "count": histogram[-1]}]
+    return summary
+
+
+def analytics_overview(now=None) -> list[dict[str, Any]]:
+    # One query for all windows; each window then picks its own granularity and span.
+    now = now or timezone.now()
+    windows = [(label, granularity, bucket_start(now - span, granularity)) for label, granularity, span in DASHBOARD_WINDOWS]
+    condition = Q()
+    for _, granularity, since in windows:
+        condition |= Q(granularity=granularity, bucket_start__gt=since)
+    rollups = list(AssessmentRollup.objects.filter(condition))
+    return [
+        {
+            "label": label,
+            "granularity": granularity,
+            **summarize_rollups(
+                rollup for rollup in rollups if rollup.granularity == granularity and rollup.bucket_start > since
+            ),
+        }
+        for label, granularity, since in windows
+    ]
+
+
+def hourly_volume(now=None, hours: int = 24) -> list[dict[str, Any]]:
+    now = now or timezone.now()
+    rollups = AssessmentRollup.objects.filter(
+        granularity=AssessmentRollup.GRANULARITY_HOUR,
+        bucket_start__gt=bucket_start(now - timedelta(hours=hours), AssessmentRollup.GRANULARITY_HOUR),
+    ).order_by("bucket_start")
+    return [
+        {"bucket_start": rollup.bucket_start, "total": rollup.total, "errors": rollup.errors}
+        for rollup in rollups
+    ]
+
+
+def _daily_rollups(now, days: int):
+    return AssessmentRollup.objects.filter(
+        granularity=AssessmentRollup.GRANULARITY_DAY,
+        bucket_start__gt=bucket_start(now - timedelta(days=days), AssessmentRollup.GRANULARITY_DAY),
+    )
+
+
+def tier_latency_summary(now=None, days: int = 7) -> list[dict[str, Any]]:
+    now = now or timezone.now()
+    merged: dict[str, dict[str, Any]] = {}
+    for stats in _daily_rollups(now, days).values_list("tier_stats", flat=True):
+        for key, entry in stats.items():
+            if key not in merged:
+                merged[key] = {**entry, "ok_histogram": list(entry["ok_histogram"])}
+                continue
+            total = merged[key]
+            for field in ("total", "errors", "latency_sum_ms", "output_tokens"):
+                total[field] += entry[field]
+            total["latency_max_ms"] = max(total["latency_max_ms"], entry["latency_max_ms"])
+            for idx, count in enumerate(entry["ok_histogram"]):
+                total["ok_histogram"][idx] += count
+    summary = []
+    for key in sorted(merged):
+        entry = merged[key]
+        tier, model = key.split("|", 1)
+        summary.append(
+            {
+                "tier": tier,
+                "model": model,
+                "total": entry["total"],
+                "errors": entry["errors"],
+                "latency_avg_ms": round(entry["latency_sum_ms"] / entry["total"]),
+                "latency_p95_ms": latency_percentile(entry["ok_histogram"], 0.95),
+                "latency_max_ms": entry["latency_max_ms"],
+                "output_tokens_avg": round(entry["output_tokens"] / entry["total"]),
+            }
+        )
+    return summary
+
+
+def repair_summary(now=None, days: int = 7) -> dict[str, Any]:
+    now = now or timezone.now()
+    totals = {"completed": 0, "repaired": 0, "incomplete": 0, "disclaimer_only": 0, "repair_tokens": 0, "saved_tokens": 0}
+    sections: dict[str, int] = {}
+    for stats in _daily_rollups(now, days).values_list("repair_stats", flat=True):
+        for key in totals:
+            totals[key] += stats.get(key, 0)
+        for key, count in stats.get("sections", {}).items():
+            sections[key] = sections.get(key, 0) + count
+    total = totals.pop("completed")
+    return {
+        "total": total,
+        **totals,
+        "repair_rate": round(totals["repaired"] * 100 / total, 1) if total else 0.0,
+        "sections": sorted(sections.items(), key=lambda item: -item[1]),
+    }
+
+
+def _delete_in_batches(queryset, batch_size: int) -> int:
+    deleted = 0
+    while True:
+        batch = list(queryset.order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not batch:
+            return deleted
+        deleted += queryset.model.objects.filter(pk__in=batch).delete()[0]
+
+
+def prune_analytics(now=None, batch_size: int | None = None) -> dict[str, int]:
+    now = now or timezone.now()
+    batch_size = batch_size or settings.ANALYTICS_PRUNE_BATCH_SIZE
+    events_before = now - timedelta(days=settings.ANALYTICS_EVENT_RETENTION_DAYS)
+    minutes_before = now - timedelta(hours=settings.ANALYTICS_MINUTE_ROLLUP_RETENTION_HOURS)
+    hours_before = now - timedelta(days=settings.ANALYTICS_HOUR_ROLLUP_RETENTION_DAYS)
+    return {
+        "events": _delete_in_batches(AssessmentEvent.objects.filter(created_at__lt=events_before), batch_size),
+        "minute_rollups": _delete_in_batches(
+            AssessmentRollup.objects.filter(
+                granularity=AssessmentRollup.GRANULARITY_MINUTE,
+                bucket_start__lt=minutes_before,
+            ),
+            batch_size,
+        ),
+        "hour_rollups": _delete_in_batches(
+            AssessmentRollup.objects.filter(
+                granularity=AssessmentRollup.GRANULARITY_HOUR,
+                bucket_start__lt=hours_before,
+            ),
+            batch_size,
+        ),
+    }
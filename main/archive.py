@@ -0,0 +1,70 @@
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .fields import stored_value
+from .models import ArchivedReport, AssessmentReport
+
+ARCHIVED_FIELDS = ("id", "user_id", "payload", "ai_report", "parent_report_id", "pdf_file", "created_at")
+
+_state = threading.local()
+
+
+@contextmanager
+def archiving_reports():
+    # Report delete signals unindex the report and rebuild the risk summary;
+    # an archived report is still searchable and still counts, so they are skipped.
+    _state.active = True
+    try:
+        yield
+    finally:
+        _state.active = False
+
+
+def is_archiving() -> bool:
+    return getattr(_state, "active", False)
+
+
+def archive_reports(older_than_days: int | None = None, batch_size: int | None = None, now=None) -> int:
+    days = settings.REPORT_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.REPORT_ARCHIVE_BATCH_SIZE
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    archived = 0
+    while True:
+        with transaction.atomic(), archiving_reports():
+            batch = list(
+                AssessmentReport.objects.select_for_update()
+                .filter(created_at__lt=cutoff, status=AssessmentReport.STATUS_READY)
+                .order_by("pk")
+                .only(*ARCHIVED_FIELDS)[:batch_size]
+            )
+            if not batch:
+                return archived
+            # Copy the stored column bytes as-is; nothing is decompressed.
+            ArchivedReport.objects.bulk_create(
+                [
+                    ArchivedReport(
+                        id=report.pk,
+                        user_id=report.user_id,
+                        payload=stored_value(report, "payload"),
+                        ai_report=stored_value(report, "ai_report"),
+                        parent_report_id=report.parent_report_id,
+                        pdf_file=report.pdf_file.name,
+                        created_at=report.created_at,
+                    )
+                    for report in batch
+                ]
+            )
+            AssessmentReport.objects.filter(pk__in=[report.pk for report in batch]).delete()
+        archived += len(batch)
+
+
+def find_user_report(user, pk: int) -> AssessmentReport | ArchivedReport | None:
+    report = AssessmentReport.objects.filter(pk=pk, user=user).first()
+    if report is None:
+        report = ArchivedReport.objects.filter(pk=pk, user=user).first()
+    return report
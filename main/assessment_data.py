@@ -45,3 +45,16 @@ ASSESSMENT_QUESTIONS = [
     "Any sore throat, ear pain, or sinus pressure?",
     "Any recent contact with sick people, travel, or infection exposure?",
 ]
+
+# Question numbers (1-based, matching the q{n} form fields) grouped for the
+# paged assessment mode.
+ASSESSMENT_SECTIONS = [
+    ("Main complaint", [1, 2, 3]),
+    ("General and respiratory", [4, 5, 6, 7, 8, 9, 10, 11]),
+    ("Head and nervous system", [12, 13, 14, 15, 16, 17, 18, 19, 20]),
+    ("Digestion", [21, 22, 23, 24, 25, 26]),
+    ("Urinary, back and joints", [27, 28, 29, 30, 31, 32]),
+    ("Skin, circulation and sensation", [33, 34, 35, 36]),
+    ("Sleep, mood and metabolism", [37, 38, 39, 40, 41, 42, 43]),
+    ("Infections and exposures", [44, 45]),
+]
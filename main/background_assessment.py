@@ -0,0 +1,117 @@
+import logging
+import threading
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .ai_service import run_assessment
+from .analytics import record_assessment_event
+from .model_routing import route_assessment
+from .models import AssessmentReport, SearchDocument
+from .red_flags import ScreenResult
+from .report_parsing import extract_risk_label, parse_assessment_sections
+from .report_repair import repair_report
+from .risk_summary import record_report
+from .search import index_object
+
+logger = logging.getLogger(__name__)
+
+
+def run_in_background(target, *args) -> None:
+    def run():
+        try:
+            target(*args)
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def start_background_assessment(
+    user, payload: dict[str, Any], screen: ScreenResult, parent_report_id: int | None = None
+) -> AssessmentReport:
+    report = AssessmentReport.objects.create(
+        user=user,
+        payload=payload,
+        ai_report="",
+        status=AssessmentReport.STATUS_PENDING,
+        red_flags=screen.as_dict(),
+        parent_report_id=parent_report_id,
+    )
+    if settings.RED_FLAG_BACKGROUND_THREAD:
+        transaction.on_commit(lambda: run_in_background(resume_pending_assessment, report.pk))
+    return report
+
+
+def is_stale(report) -> bool:
+    return timezone.now() - report.created_at > timedelta(seconds=settings.PENDING_ASSESSMENT_STALE_SECONDS)
+
+
+def resume_key(report_id: int) -> str:
+    return f"assessment:resume:{report_id}"
+
+
+def can_resume_assessment(report) -> bool:
+    # Without a background thread (serverless) nothing else finishes the report;
+    # with one, only reports whose thread died or was frozen are picked up.
+    if getattr(report, "status", "") != AssessmentReport.STATUS_PENDING:
+        return False
+    if settings.RED_FLAG_BACKGROUND_THREAD and not is_stale(report):
+        return False
+    return cache.get(resume_key(report.pk)) is None
+
+
+def resume_pending_assessment(report_id: int) -> bool:
+    # The cache entry is the claim shared by the background thread, page loads and
+    # the cron; finish_pending_assessment only records the first result if it expires.
+    if not cache.add(resume_key(report_id), True, settings.PENDING_ASSESSMENT_STALE_SECONDS):
+        return False
+    finish_pending_assessment(report_id)
+    return True
+
+
+def finish_stale_assessments() -> int:
+    cutoff = timezone.now() - timedelta(seconds=settings.PENDING_ASSESSMENT_STALE_SECONDS)
+    stale = AssessmentReport.objects.filter(status=AssessmentReport.STATUS_PENDING, created_at__lt=cutoff)
+    return sum(resume_pending_assessment(report_id) for report_id in stale.values_list("pk", flat=True))
+
+
+def finish_pending_assessment(report_id: int) -> None:
+    try:
+        report = AssessmentReport.objects.get(pk=report_id, status=AssessmentReport.STATUS_PENDING)
+        decision = route_assessment(report.payload, emergency=True)
+        outcome = run_assessment(report.payload, decision.model, decision.timeout)
+        outcome, repair = repair_report(outcome, decision.model, decision.timeout)
+        sections = parse_assessment_sections(outcome.text)
+        risk_label, _ = extract_risk_label(sections.get("risk_stratification", ""))
+        status = AssessmentReport.STATUS_READY if outcome.ok else AssessmentReport.STATUS_FAILED
+        with transaction.atomic():
+            finished = AssessmentReport.objects.filter(pk=report_id, status=AssessmentReport.STATUS_PENDING).update(
+                ai_report=outcome.text,
+                status=status,
+                response_id=outcome.response_id,
+            )
+            if not finished:
+                return
+            report.ai_report, report.status, report.response_id = outcome.text, status, outcome.response_id
+            # update() skips post_save, so the search document is refreshed here.
+            index_object(SearchDocument.KIND_REPORT, report)
+            if outcome.ok:
+                record_report(report)
+            record_assessment_event(
+                outcome,
+                user_id=report.user_id,
+                report_id=report.pk,
+                risk_label=risk_label,
+                routing=decision,
+                repair=repair,
+            )
+    except Exception:
+        logger.exception("Background assessment for report %s failed", report_id)
+        AssessmentReport.objects.filter(pk=report_id, status=AssessmentReport.STATUS_PENDING).update(
+            status=AssessmentReport.STATUS_FAILED
+        )
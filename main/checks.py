@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+CACHE_SESSION_ENGINES = {
+    "django.contrib.sessions.backends.cache",
+    "django.contrib.sessions.backends.cached_db",
+}
+
+
+@register(Tags.caches)
+def check_shared_auth_cache(app_configs, **kwargs):
+    # Cached users and sessions are invalidated with cache.delete(), which only
+    # reaches other workers when they all read the same cache.
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    modes = []
+    if settings.AUTH_USER_CACHE_TIMEOUT > 0:
+        modes.append("AUTH_USER_CACHE_TIMEOUT > 0")
+    if settings.SESSION_ENGINE in CACHE_SESSION_ENGINES:
+        modes.append(f"SESSION_ENGINE={settings.SESSION_ENGINE}")
+    if not modes:
+        return []
+    return [
+        Error(
+            f"{' and '.join(modes)}: cached sessions and users need a cache shared by every worker, "
+            f"but the default cache is {backend}.",
+            hint="Set CACHE_BACKEND to Redis, Memcached or the database cache, or turn these options off.",
+            id="main.E001",
+        )
+    ]
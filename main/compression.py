@@ -0,0 +1,160 @@
+import re
+import threading
+import zlib
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, only needed for REPORT_COMPRESSION_CODEC=zstd
+    zstandard = None
+
+# Every stored value starts with a one-byte tag so rows written under different
+# codecs or dictionaries can always be read back. Dictionary variants follow the
+# tag with the 4-byte CompressionDictionary id.
+TAG_RAW = 0
+TAG_ZLIB = 1
+TAG_ZLIB_DICT = 2
+TAG_ZSTD = 3
+TAG_ZSTD_DICT = 4
+
+CODECS = ("none", "zlib", "zstd")
+MIN_COMPRESS_BYTES = 128
+ZLIB_MAX_DICTIONARY_BYTES = 32 * 1024
+DICTIONARY_ID_BYTES = 4
+FRAGMENT_BOUNDARY = re.compile(rb"(?<=[\n,])")
+
+_dictionary_lock = threading.Lock()
+_dictionaries: dict[int, bytes] = {}
+_active_dictionaries: dict[str, tuple[int, bytes] | None] = {}
+
+
+class CompressionError(ValueError):
+    pass
+
+
+def _require_zstd() -> None:
+    if zstandard is None:
+        raise ImproperlyConfigured("REPORT_COMPRESSION_CODEC=zstd requires the zstandard package.")
+
+
+def clear_dictionary_cache() -> None:
+    with _dictionary_lock:
+        _dictionaries.clear()
+        _active_dictionaries.clear()
+
+
+def load_dictionary(dictionary_id: int) -> bytes:
+    if dictionary_id not in _dictionaries:
+        from .models import CompressionDictionary
+
+        data = CompressionDictionary.objects.filter(pk=dictionary_id).values_list("data", flat=True).first()
+        if data is None:
+            raise CompressionError(f"Compression dictionary {dictionary_id} does not exist.")
+        with _dictionary_lock:
+            _dictionaries[dictionary_id] = bytes(data)
+    return _dictionaries[dictionary_id]
+
+
+def active_dictionary(codec: str) -> tuple[int, bytes] | None:
+    if not settings.REPORT_COMPRESSION_DICTIONARY or codec == "none":
+        return None
+    if codec not in _active_dictionaries:
+        from .models import CompressionDictionary
+
+        latest = CompressionDictionary.objects.filter(codec=codec).order_by("-pk").values_list("pk", "data").first()
+        with _dictionary_lock:
+            _active_dictionaries[codec] = (latest[0], bytes(latest[1])) if latest else None
+            if latest:
+                _dictionaries[latest[0]] = bytes(latest[1])
+    return _active_dictionaries[codec]
+
+
+# `dictionary` is an (id, bytes) pair; None uses the active one for the codec
+# and False compresses without a dictionary.
+def compress(data: bytes, codec: str | None = None, level: int | None = None, dictionary=None) -> bytes:
+    codec = codec or settings.REPORT_COMPRESSION_CODEC
+    level = settings.REPORT_COMPRESSION_LEVEL if level is None else level
+    if codec not in CODECS:
+        raise ImproperlyConfigured(f"Unknown REPORT_COMPRESSION_CODEC: {codec!r}")
+    if codec == "none" or len(data) < MIN_COMPRESS_BYTES:
+        return bytes([TAG_RAW]) + data
+
+    if dictionary is None:
+        dictionary = active_dictionary(codec)
+    if codec == "zlib":
+        if dictionary:
+            compressor = zlib.compressobj(min(level, 9), zdict=dictionary[1])
+            packed = bytes([TAG_ZLIB_DICT]) + dictionary[0].to_bytes(DICTIONARY_ID_BYTES, "big")
+        else:
+            compressor = zlib.compressobj(min(level, 9))
+            packed = bytes([TAG_ZLIB])
+        packed += compressor.compress(data) + compressor.flush()
+    else:
+        _require_zstd()
+        if dictionary:
+            dict_data = zstandard.ZstdCompressionDictionary(dictionary[1])
+            compressor = zstandard.ZstdCompressor(level=level, dict_data=dict_data)
+            packed = bytes([TAG_ZSTD_DICT]) + dictionary[0].to_bytes(DICTIONARY_ID_BYTES, "big")
+        else:
+            compressor = zstandard.ZstdCompressor(level=level)
+            packed = bytes([TAG_ZSTD])
+        packed += compressor.compress(data)
+
+    # Incompressible input is kept raw rather than paying decompression on every read.
+    if len(packed) >= len(data) + 1:
+        return bytes([TAG_RAW]) + data
+    return packed
+
+
+def decompress(blob: bytes) -> bytes:
+    if not blob:
+        return b""
+    tag, body = blob[0], memoryview(blob)[1:]
+    if tag == TAG_RAW:
+        return bytes(body)
+    if tag in (TAG_ZLIB_DICT, TAG_ZSTD_DICT):
+        dictionary = load_dictionary(int.from_bytes(body[:DICTIONARY_ID_BYTES], "big"))
+        body = body[DICTIONARY_ID_BYTES:]
+    if tag == TAG_ZLIB:
+        return zlib.decompress(body)
+    if tag == TAG_ZLIB_DICT:
+        decompressor = zlib.decompressobj(zdict=dictionary)
+        return decompressor.decompress(body) + decompressor.flush()
+    if tag in (TAG_ZSTD, TAG_ZSTD_DICT):
+        _require_zstd()
+        dict_data = zstandard.ZstdCompressionDictionary(dictionary) if tag == TAG_ZSTD_DICT else None
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(bytes(body))
+    raise CompressionError(f"Unknown compression tag {tag}.")
+
+
+def train_dictionary(samples: list[bytes], codec: str, size: int) -> bytes:
+    if codec == "zstd":
+        _require_zstd()
+        return zstandard.train_dictionary(size, samples).as_bytes()
+    if codec != "zlib":
+        raise ImproperlyConfigured(f"Dictionaries are not supported for codec {codec!r}.")
+
+    # zlib has no trainer: a preset dictionary is just bytes the compressor may
+    # back-reference. Keep fragments (lines, JSON members) that recur across
+    # reports, such as section headings, question texts and boilerplate advice,
+    # with the most common last, where match distances are shortest.
+    size = min(size, ZLIB_MAX_DICTIONARY_BYTES)
+    counts = Counter(
+        fragment
+        for sample in samples
+        for fragment in set(FRAGMENT_BOUNDARY.split(sample))
+        if len(fragment.strip()) >= 8
+    )
+    picked = []
+    used = 0
+    for fragment, count in counts.most_common():
+        if count < 2:
+            break
+        if used + len(fragment) > size:
+            continue
+        picked.append(fragment)
+        used += len(fragment)
+    return b"".join(reversed(picked))
@@ -0,0 +1,176 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils import timezone
+
+from .models import ReplicaHeartbeat
+
+logger = logging.getLogger(__name__)
+
+# Cookie holding the time until which this browser reads from the primary.
+PIN_COOKIE = "db_primary_until"
+HEARTBEAT_ID = 1
+HEALTH_CACHE_KEY = "db_routing:replica_lag"
+
+_state = threading.local()
+_probe_lock = threading.Lock()
+_probe_thread: threading.Thread | None = None
+
+
+@contextmanager
+def replica_reads():
+    # Reads of app models inside this block may go to a replica.
+    previous = getattr(_state, "replica", False)
+    _state.replica, _state.healthy = True, None
+    try:
+        yield
+    finally:
+        _state.replica = previous
+
+
+def read_from_replica(view):
+    # Apply below @login_required; functools.wraps carries the attribute up.
+    view.read_from_replica = True
+    return view
+
+
+def record_heartbeat(now=None) -> None:
+    ReplicaHeartbeat.objects.using(DEFAULT_DB_ALIAS).update_or_create(
+        pk=HEARTBEAT_ID, defaults={"beat_at": now or timezone.now()}
+    )
+
+
+def replica_lag_seconds(alias: str) -> float | None:
+    # Age of the newest heartbeat the replica has replayed. The primary beats
+    # every REPLICA_HEALTH_CHECK_INTERVAL, so a healthy replica reads up to one
+    # interval; one that stopped replicating keeps ageing however quiet it is.
+    replica = ReplicaHeartbeat.objects.using(alias).filter(pk=HEARTBEAT_ID).values_list("beat_at", flat=True).first()
+    if replica is None:
+        return None
+    return max(0.0, (timezone.now() - replica).total_seconds())
+
+
+def probe_replicas() -> list[dict]:
+    # Runs outside requests (probe thread, `manage.py replica_status`); requests
+    # only read the cached result, which expires after a few missed probes so
+    # routing falls back to the primary when nothing is probing.
+    status = []
+    for alias in settings.REPLICA_DATABASES:
+        try:
+            lag, error = replica_lag_seconds(alias), ""
+        except DatabaseError as exc:
+            lag, error = None, str(exc)
+        healthy = lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+        status.append({"alias": alias, "lag_seconds": lag, "healthy": healthy, "error": error})
+    # Beat after measuring: the probe is what keeps the heartbeat current.
+    record_heartbeat()
+    cache.set(
+        HEALTH_CACHE_KEY,
+        {row["alias"]: row["lag_seconds"] for row in status},
+        settings.REPLICA_HEALTH_CHECK_INTERVAL * 3,
+    )
+    return status
+
+
+def healthy_replicas() -> list[str]:
+    lags = cache.get(HEALTH_CACHE_KEY) or {}
+    return [
+        alias
+        for alias in settings.REPLICA_DATABASES
+        if lags.get(alias) is not None and lags[alias] <= settings.REPLICA_MAX_LAG_SECONDS
+    ]
+
+
+def _probe_forever() -> None:
+    while True:
+        try:
+            probe_replicas()
+        except Exception:
+            logger.exception("Read replica probe failed")
+        finally:
+            connections.close_all()
+        time.sleep(settings.REPLICA_HEALTH_CHECK_INTERVAL)
+
+
+def start_probe_thread() -> None:
+    global _probe_thread
+    with _probe_lock:
+        if _probe_thread is None:
+            _probe_thread = threading.Thread(target=_probe_forever, name="replica-probe", daemon=True)
+            _probe_thread.start()
+
+
+def sync_sqlite_replica(alias: str) -> None:
+    # Local testing only: copy the primary SQLite file into a replica file.
+    source, target = connections[DEFAULT_DB_ALIAS], connections[alias]
+    source.ensure_connection()
+    target.ensure_connection()
+    source.connection.backup(target.connection)
+
+
+class ReadReplicaRouter:
+    # Only this app's models are routed; sessions and auth stay on the primary
+    # so logins and session writes are never read back stale.
+    app_label = "main"
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != self.app_label or not getattr(_state, "replica", False):
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        # Looked up once per request or replica_reads() block.
+        if getattr(_state, "healthy", None) is None:
+            _state.healthy = healthy_replicas()
+        return random.choice(_state.healthy) if _state.healthy else None
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.REPLICA_DATABASES
+
+
+def pinned_to_primary(request) -> bool:
+    # A cookie rather than the session: pinning must not cost a session write.
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        if settings.REPLICA_HEALTH_PROBE_THREAD:
+            start_probe_thread()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.replica, _state.wrote, _state.healthy = False, False, None
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote, _state.replica, _state.wrote = _state.wrote, False, False
+        if wrote:
+            # Read-your-writes: this browser reads from the primary until replicas catch up.
+            until = time.time() + settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                PIN_COOKIE, f"{until:.0f}", max_age=settings.REPLICA_STICKY_SECONDS, httponly=True, samesite="Lax"
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in ("GET", "HEAD") and getattr(view_func, "read_from_replica", False) and not pinned_to_primary(request):
+            _state.replica = True
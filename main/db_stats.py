@@ -0,0 +1,18 @@
+from typing import Any
+
+from django.conf import settings
+from django.db import connections
+
+
+def connection_stats(alias: str = "default") -> dict[str, Any]:
+    connection = connections[alias]
+    pool = getattr(connection, "pool", None)
+    return {
+        "alias": alias,
+        "vendor": connection.vendor,
+        "mode": getattr(settings, "DB_CONN_MODE", "default"),
+        "conn_max_age": connection.settings_dict.get("CONN_MAX_AGE", 0),
+        "health_checks": connection.settings_dict.get("CONN_HEALTH_CHECKS", False),
+        "connected": connection.connection is not None,
+        "pool": pool.get_stats() if pool is not None else None,
+    }
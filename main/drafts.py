@@ -0,0 +1,79 @@
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .forms import ClinicalAssessmentForm
+from .models import AssessmentDraft
+
+DRAFT_FIELDS = frozenset(ClinicalAssessmentForm.base_fields)
+MAX_DRAFT_VALUE_LENGTH = 5000
+
+
+class DraftError(ValueError):
+    pass
+
+
+def _expiry():
+    return timezone.now() + timedelta(hours=settings.ASSESSMENT_DRAFT_TTL_HOURS)
+
+
+def get_active_draft(user) -> AssessmentDraft | None:
+    return AssessmentDraft.objects.filter(user=user, expires_at__gt=timezone.now()).first()
+
+
+def draft_answers(user) -> dict[str, Any]:
+    draft = get_active_draft(user)
+    return dict(draft.answers) if draft else {}
+
+
+def save_draft_answers(user, changes: dict[str, Any]) -> AssessmentDraft:
+    for field, value in changes.items():
+        if field not in DRAFT_FIELDS:
+            raise DraftError(f"Unknown field: {field}")
+        if isinstance(value, str) and len(value) > MAX_DRAFT_VALUE_LENGTH:
+            raise DraftError(f"Answer for {field} is too long.")
+
+    with transaction.atomic():
+        draft, created = AssessmentDraft.objects.select_for_update().get_or_create(
+            user=user,
+            defaults={"expires_at": _expiry()},
+        )
+        if not created and draft.expires_at <= timezone.now():
+            draft.answers = {}
+        for field, value in changes.items():
+            if value in ("", None):
+                draft.answers.pop(field, None)
+            else:
+                draft.answers[field] = value
+        draft.version += 1
+        draft.expires_at = _expiry()
+        draft.save()
+    return draft
+
+
+def merge_with_draft(user, data) -> dict[str, Any]:
+    merged = draft_answers(user)
+    for field in DRAFT_FIELDS:
+        if field in data:
+            merged[field] = data.get(field)
+    return merged
+
+
+def discard_draft(user) -> None:
+    AssessmentDraft.objects.filter(user=user).delete()
+
+
+def purge_expired_drafts(batch_size: int | None = None) -> int:
+    batch_size = batch_size or settings.ASSESSMENT_DRAFT_PURGE_BATCH_SIZE
+    now = timezone.now()
+    purged = 0
+    while True:
+        batch = list(
+            AssessmentDraft.objects.filter(expires_at__lte=now).order_by("pk").values_list("pk", flat=True)[:batch_size]
+        )
+        if not batch:
+            return purged
+        purged += AssessmentDraft.objects.filter(pk__in=batch).delete()[0]
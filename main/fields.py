@@ -0,0 +1,90 @@
+import json
+
+from django import forms
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+from .compression import compress, decompress
+
+
+class StoredBlob(bytes):
+    # Compressed bytes exactly as read from the database; decoded on first access.
+    pass
+
+
+def stored_value(instance, attname: str):
+    # The loaded value without decoding it: a StoredBlob, or whatever was assigned.
+    if attname in instance.__dict__:
+        return instance.__dict__[attname]
+    return getattr(instance, attname)
+
+
+class CompressedAttribute(DeferredAttribute):
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, StoredBlob):
+            value = self.field.decode(decompress(value))
+            instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+# Stored as a compressed blob (see main.compression). Rows are decompressed only
+# when the attribute is read, and saving a row whose value was never read writes
+# the stored bytes back unchanged. Values cannot be filtered on in SQL.
+class CompressedTextField(models.Field):
+    descriptor_class = CompressedAttribute
+
+    def get_internal_type(self):
+        return "BinaryField"
+
+    def encode(self, value) -> bytes:
+        return str(value).encode("utf-8")
+
+    def decode(self, data: bytes):
+        return data.decode("utf-8")
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else StoredBlob(value)
+
+    def to_python(self, value):
+        if isinstance(value, StoredBlob):
+            return self.decode(decompress(value))
+        return value
+
+    def pre_save(self, model_instance, add):
+        # Read the raw slot so untouched values skip a decompress/recompress round trip.
+        if self.attname in model_instance.__dict__:
+            return model_instance.__dict__[self.attname]
+        return super().pre_save(model_instance, add)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if value is None:
+            return None
+        if not isinstance(value, StoredBlob):
+            value = compress(self.encode(value))
+        return connection.Database.Binary(value)
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{"form_class": forms.CharField, "widget": forms.Textarea, **kwargs})
+
+
+class CompressedJSONField(CompressedTextField):
+    empty_strings_allowed = False
+
+    def encode(self, value) -> bytes:
+        return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, data: bytes):
+        return json.loads(data) if data else None
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{"form_class": forms.JSONField, "widget": forms.Textarea, **kwargs})
@@ -0,0 +1,65 @@
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+
+from .ai_service import continue_assessment, run_assessment
+from .analytics import record_assessment_event
+from .background_assessment import start_background_assessment
+from .model_routing import route_assessment
+from .models import AssessmentReport
+from .red_flags import ScreenResult, screen_payload
+from .report_parsing import extract_risk_label, parse_assessment_sections
+from .report_repair import repair_report
+
+
+def follow_up_payload(payload: dict[str, Any], answers: str) -> dict[str, Any]:
+    # Revisions carry every follow-up so far, so a full-context run can rebuild the conversation.
+    return {**payload, "follow_up_answers": [*payload.get("follow_up_answers", []), answers]}
+
+
+def can_follow_up(report) -> bool:
+    return isinstance(report, AssessmentReport) and report.status == AssessmentReport.STATUS_READY
+
+
+def run_follow_up(report: AssessmentReport, answers: str) -> tuple[AssessmentReport, ScreenResult | None]:
+    payload = follow_up_payload(report.payload, answers)
+    screen = screen_payload(payload) if settings.RED_FLAG_PRESCREEN else None
+    if screen is not None and screen.emergency:
+        # Same as a first submission: escalate now, finish the revision in the background.
+        with transaction.atomic():
+            return start_background_assessment(report.user, payload, screen, parent_report_id=report.pk), screen
+
+    decision = route_assessment(payload)
+    outcome = None
+    if report.response_id:
+        outcome = continue_assessment(report.response_id, answers, decision.model, decision.timeout)
+    if outcome is not None and outcome.ok:
+        decision.reasons.append("follow-up chained on previous response")
+    else:
+        # No stored response, or it expired upstream: resend the whole payload.
+        outcome = run_assessment(payload, decision.model, decision.timeout)
+        decision.reasons.append("follow-up with full context")
+    outcome, repair = repair_report(outcome, decision.model, decision.timeout)
+
+    sections = parse_assessment_sections(outcome.text)
+    risk_label, _ = extract_risk_label(sections.get("risk_stratification", ""))
+    with transaction.atomic():
+        revision = AssessmentReport.objects.create(
+            user=report.user,
+            payload=payload,
+            ai_report=outcome.text,
+            status=AssessmentReport.STATUS_READY if outcome.ok else AssessmentReport.STATUS_FAILED,
+            red_flags=screen.as_dict() if screen is not None else {},
+            response_id=outcome.response_id,
+            parent_report_id=report.pk,
+        )
+        record_assessment_event(
+            outcome,
+            user_id=report.user_id,
+            report_id=revision.pk,
+            risk_label=risk_label,
+            routing=decision,
+            repair=repair,
+        )
+    return revision, screen
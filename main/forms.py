@@ -1,8 +1,10 @@
+from functools import lru_cache
+
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 
-from .assessment_data import ASSESSMENT_QUESTIONS
+from .assessment_data import ASSESSMENT_QUESTIONS, ASSESSMENT_SECTIONS
 from .models import Note
 
 
@@ -26,7 +28,14 @@ class ProfileUpdateForm(forms.ModelForm):
         fields = ("username", "first_name", "last_name", "email")
 
 
-class ClinicalAssessmentForm(forms.Form):
+class FollowUpForm(forms.Form):
+    answers = forms.CharField(
+        max_length=4000,
+        widget=forms.Textarea(attrs={"rows": 5, "placeholder": "Answer the clarifying questions from the report."}),
+    )
+
+
+class ClinicalBasicsForm(forms.Form):
     GENDER_CHOICES = [
         ("male", "Male"),
         ("female", "Female"),
@@ -48,16 +57,38 @@ class ClinicalAssessmentForm(forms.Form):
         widget=forms.Textarea(attrs={"rows": 5, "placeholder": "Optional: timeline, chronic diseases, recent surgery, pregnancy, allergies, etc."}),
     )
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        for idx, question in enumerate(ASSESSMENT_QUESTIONS, start=1):
-            self.fields[f"q{idx}"] = forms.CharField(
-                label=f"{idx}. {question}",
-                required=False,
-                widget=forms.Textarea(
-                    attrs={
-                        "rows": 3,
-                        "placeholder": "Write your answer in detail...",
-                    }
-                ),
-            )
+
+@lru_cache(maxsize=None)
+def question_fields() -> dict[str, forms.Field]:
+    fields = {}
+    for idx, question in enumerate(ASSESSMENT_QUESTIONS, start=1):
+        fields[f"q{idx}"] = forms.CharField(
+            label=f"{idx}. {question}",
+            required=False,
+            widget=forms.Textarea(
+                attrs={
+                    "rows": 3,
+                    "placeholder": "Write your answer in detail...",
+                }
+            ),
+        )
+    return fields
+
+
+# Built once at import; Form.__init__ only deep-copies base_fields per request.
+ClinicalAssessmentForm = type(
+    "ClinicalAssessmentForm",
+    (ClinicalBasicsForm,),
+    {"__module__": __name__, **question_fields()},
+)
+
+
+@lru_cache(maxsize=None)
+def assessment_section_form(section_index: int) -> type[forms.Form]:
+    _, numbers = ASSESSMENT_SECTIONS[section_index]
+    fields = question_fields()
+    return type(
+        f"ClinicalAssessmentSection{section_index + 1}Form",
+        (forms.Form,),
+        {"__module__": __name__, **{f"q{number}": fields[f"q{number}"] for number in numbers}},
+    )
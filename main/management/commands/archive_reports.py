@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main.archive import archive_reports
+
+
+class Command(BaseCommand):
+    help = (
+        "Move assessment reports older than REPORT_ARCHIVE_AFTER_DAYS from the hot table into "
+        "the archive table. Archived reports stay searchable and viewable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        archived = archive_reports(options["older_than_days"], options["batch_size"])
+        days = settings.REPORT_ARCHIVE_AFTER_DAYS if options["older_than_days"] is None else options["older_than_days"]
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} reports older than {days} days."))
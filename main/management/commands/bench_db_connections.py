@@ -0,0 +1,51 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db.backends.signals import connection_created
+
+from main.db_stats import connection_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request database latency under the configured DB_CONN_MODE by replaying "
+        "the session and user lookups every login_required view performs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+
+    def handle(self, *args, **options):
+        opened = []
+
+        def count_connection(sender, **kwargs):
+            opened.append(kwargs.get("connection"))
+
+        connection_created.connect(count_connection)
+        user_model = get_user_model()
+        timings = []
+        try:
+            for _ in range(options["requests"]):
+                started = time.perf_counter()
+                request_started.send(sender=self.__class__)
+                Session.objects.filter(session_key="benchmark").first()
+                user_model.objects.filter(pk=0).first()
+                request_finished.send(sender=self.__class__)
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            connection_created.disconnect(count_connection)
+
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1] if timings else 0
+        stats = connection_stats()
+        self.stdout.write(f"mode={stats['mode']} vendor={stats['vendor']} requests={len(timings)}")
+        self.stdout.write(
+            f"mean={statistics.mean(timings):.3f}ms p50={statistics.median(timings):.3f}ms p95={p95:.3f}ms "
+            f"connections_opened={len(opened)}"
+        )
+        if stats["pool"] is not None:
+            self.stdout.write(f"pool={stats['pool']}")
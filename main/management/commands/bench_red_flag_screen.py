@@ -0,0 +1,65 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.red_flags import compiled_matcher, compiled_question_matchers, load_corpus, screen_payload
+from main.report_storage import synthetic_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Check the red-flag pre-screen against its labeled corpus and time it on corpus "
+        "and full-length synthetic payloads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        cases = load_corpus()
+        mismatches = []
+        true_pos = false_pos = false_neg = 0
+        for case in cases:
+            expected = set(case["expected"])
+            flagged = set(screen_payload(case["payload"]).flags)
+            true_pos += len(expected & flagged)
+            false_pos += len(flagged - expected)
+            false_neg += len(expected - flagged)
+            if flagged != expected:
+                mismatches.append(f"{case['id']}: expected {sorted(expected)}, got {sorted(flagged)}")
+
+        precision = true_pos / (true_pos + false_pos) if true_pos + false_pos else 1.0
+        recall = true_pos / (true_pos + false_neg) if true_pos + false_neg else 1.0
+        self.stdout.write(
+            f"corpus: {len(cases) - len(mismatches)}/{len(cases)} cases exact, "
+            f"precision {precision:.3f}, recall {recall:.3f}"
+        )
+        for line in mismatches:
+            self.stdout.write(f"  mismatch {line}")
+
+        started = time.perf_counter()
+        compiled_matcher.cache_clear()
+        compiled_question_matchers.cache_clear()
+        compiled_matcher()
+        compiled_question_matchers()
+        self.stdout.write(f"compile: {(time.perf_counter() - started) * 1000:.2f}ms")
+
+        rng = random.Random(11)
+        workloads = {
+            "corpus": [case["payload"] for case in cases],
+            "full 45-answer": [synthetic_report(rng)[0] for _ in range(50)],
+        }
+        for name, payloads in workloads.items():
+            timings = []
+            for idx in range(options["iterations"]):
+                payload = payloads[idx % len(payloads)]
+                started = time.perf_counter_ns()
+                screen_payload(payload)
+                timings.append((time.perf_counter_ns() - started) / 1000)
+            timings.sort()
+            self.stdout.write(
+                f"{name:>15}: mean {statistics.mean(timings):.1f}us p50 {statistics.median(timings):.1f}us "
+                f"p95 {timings[int(len(timings) * 0.95) - 1]:.1f}us"
+            )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main import compression
+from main.report_storage import benchmark_variant, report_samples
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare storage size, insert throughput and read latency of report columns across "
+        "compression codecs. All benchmark rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=500)
+        parser.add_argument("--reads", type=int, default=50)
+        parser.add_argument("--synthetic", action="store_true", help="Ignore stored reports and use generated ones.")
+
+    def handle(self, *args, **options):
+        samples = report_samples(options["samples"], synthetic=options["synthetic"])
+        if not samples:
+            raise CommandError("No stored reports to benchmark; pass --synthetic to use generated ones.")
+        self.stdout.write(f"{len(samples)} {'generated' if options['synthetic'] else 'stored'} reports.")
+        variants = [("none", False), ("zlib", False), ("zlib", True)]
+        if compression.zstandard is not None:
+            variants += [("zstd", False), ("zstd", True)]
+        else:
+            self.stdout.write("zstandard is not installed; skipping zstd variants.")
+
+        for codec, use_dictionary in variants:
+            result = benchmark_variant(codec, use_dictionary, samples, options["reads"])
+            self.stdout.write(
+                f"{result['variant']:>9}: {result['stored_bytes']} bytes (ratio {result['ratio']}x, "
+                f"dictionary {result['dictionary_bytes']} bytes), "
+                f"{result['inserts_per_second']} inserts/s, decode {result['decode_us_per_report']}us/report, "
+                f"read 20 p50 {result['read_20_p50_ms']}ms p95 {result['read_20_p95_ms']}ms"
+            )
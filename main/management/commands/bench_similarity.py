@@ -0,0 +1,80 @@
+import copy
+import random
+import statistics
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from main.report_storage import SAMPLE_SENTENCES, synthetic_report
+from main.similarity import NUM_PERM, SimilarityIndex, payload_signature
+
+
+def _percentiles(timings: list[float]) -> str:
+    timings = sorted(timings)
+    return f"p50 {statistics.median(timings):.2f}ms p95 {timings[int(len(timings) * 0.95) - 1]:.2f}ms"
+
+
+def _near_duplicate(payload: dict, rng: random.Random) -> dict:
+    edited = copy.deepcopy(payload)
+    answers = edited["question_answers"]
+    for item in rng.sample(answers, 2):
+        item["answer"] = rng.choice(["Yes", "No", "Sometimes", ""])
+    edited["additional_notes"] = f"{edited['additional_notes']} {rng.choice(SAMPLE_SENTENCES)}"
+    return edited
+
+
+class Command(BaseCommand):
+    help = (
+        "Build an in-memory similarity index from synthetic signatures and compare LSH lookups "
+        "with an exhaustive scan: latency and near-duplicate recall."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reports", type=int, default=200_000)
+        parser.add_argument("--distinct", type=int, default=2_000)
+        parser.add_argument("--queries", type=int, default=200)
+
+    def handle(self, *args, **options):
+        rng = random.Random(19)
+        np_rng = np.random.default_rng(19)
+        payloads = [synthetic_report(rng)[0] for _ in range(options["distinct"])]
+
+        started = time.perf_counter()
+        base = np.stack([payload_signature(payload) for payload in payloads])
+        per_signature = (time.perf_counter() - started) * 1_000_000 / len(payloads)
+        self.stdout.write(f"signature: {per_signature:.1f}us per payload")
+
+        # Fill the index with mutated copies of the real signatures: each row
+        # replaces a quarter of its minhash values so it is related but not identical.
+        total = options["reports"]
+        signatures = base[np_rng.integers(0, len(base), total)]
+        mutate = np_rng.random(signatures.shape) < 0.25
+        signatures[mutate] = np_rng.integers(0, 1 << 32, int(mutate.sum()), dtype=np.uint64).astype(np.uint32)
+        user_ids = np_rng.integers(1, 5_000, total)
+
+        index = SimilarityIndex()
+        started = time.perf_counter()
+        index.add(np.arange(1, total + 1), user_ids, signatures)
+        index.merge()
+        self.stdout.write(f"build: {total} rows in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+        # Plant the unmodified originals of the query payloads under fresh ids.
+        sample = rng.sample(range(len(payloads)), options["queries"])
+        planted_ids = np.arange(total + 1, total + 1 + len(sample))
+        index.add(planted_ids, np.zeros(len(sample), dtype=np.int64), base[sample])
+        index.merge()
+
+        queries = [payload_signature(_near_duplicate(payloads[idx], rng)) for idx in sample]
+        for mode, exhaustive in (("lsh", False), ("exhaustive", True)):
+            timings = []
+            hits = 0
+            for planted_id, signature in zip(planted_ids.tolist(), queries):
+                started = time.perf_counter()
+                matches = index.query(signature, k=5, exhaustive=exhaustive)
+                timings.append((time.perf_counter() - started) * 1000)
+                hits += any(report_id == planted_id for report_id, _ in matches)
+            self.stdout.write(
+                f"{mode:>10}: {_percentiles(timings)}, near-duplicate recall@5 {hits / len(queries):.3f}"
+            )
+        self.stdout.write(f"memory: {(index.signatures.nbytes + index.keys.nbytes) / 1024 / 1024:.1f}MB for {NUM_PERM}-value signatures")
@@ -0,0 +1,17 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from main.db_stats import connection_stats
+
+
+class Command(BaseCommand):
+    help = "Print the active database connection mode and pool statistics."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        connections[options["database"]].ensure_connection()
+        self.stdout.write(json.dumps(connection_stats(options["database"]), indent=2, default=str))
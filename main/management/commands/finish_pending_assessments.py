@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main.background_assessment import finish_stale_assessments
+
+
+class Command(BaseCommand):
+    help = (
+        "Finish emergency reports still pending after PENDING_ASSESSMENT_STALE_SECONDS, e.g. when the "
+        "background thread was frozen or the process restarted. Run from cron."
+    )
+
+    def handle(self, *args, **options):
+        finished = finish_stale_assessments()
+        seconds = settings.PENDING_ASSESSMENT_STALE_SECONDS
+        self.stdout.write(self.style.SUCCESS(f"Finished {finished} pending reports older than {seconds}s."))
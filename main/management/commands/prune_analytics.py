@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from main.analytics import prune_analytics
+
+
+class Command(BaseCommand):
+    help = "Delete raw assessment events and fine-grained rollups past their retention window."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        deleted = prune_analytics(batch_size=options["batch_size"])
+        summary = ", ".join(f"{count} {name}" for name, count in deleted.items())
+        self.stdout.write(self.style.SUCCESS(f"Pruned {summary}."))
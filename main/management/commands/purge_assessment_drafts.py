@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from main.drafts import purge_expired_drafts
+
+
+class Command(BaseCommand):
+    help = "Delete expired assessment drafts in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        purged = purge_expired_drafts(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} expired drafts."))
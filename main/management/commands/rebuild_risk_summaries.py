@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from main.models import AssessmentReport
+from main.risk_summary import rebuild_risk_summary
+
+
+class Command(BaseCommand):
+    help = "Recompute per-user risk dashboard aggregates from stored assessment reports."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user-id", type=int, action="append", dest="user_ids")
+
+    def handle(self, *args, **options):
+        user_ids = options["user_ids"] or (
+            AssessmentReport.objects.order_by().values_list("user_id", flat=True).distinct()
+        )
+        rebuilt = 0
+        for user_id in user_ids:
+            rebuild_risk_summary(user_id)
+            rebuilt += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} risk summaries."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from main.similarity import rebuild_signatures
+
+
+class Command(BaseCommand):
+    help = "Recompute similarity signatures for all hot and archived assessment reports."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        indexed = rebuild_signatures(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Computed {indexed} report signatures."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from main.report_storage import recompress_reports
+
+
+class Command(BaseCommand):
+    help = "Rewrite stored report text and payloads with the current REPORT_COMPRESSION_* settings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, **options):
+        rewritten = recompress_reports(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Recompressed {rewritten} reports."))
@@ -0,0 +1,36 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main.db_routing import probe_replicas, sync_sqlite_replica
+
+
+class Command(BaseCommand):
+    help = (
+        "Probe lag and health for each configured read replica and publish the result to the cache "
+        "used for routing. With --watch, keep probing every REPLICA_HEALTH_CHECK_INTERVAL seconds. "
+        "With --sync-sqlite, first copy the primary SQLite database into each replica file (local testing only)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sync-sqlite", action="store_true")
+        parser.add_argument("--watch", action="store_true")
+
+    def handle(self, *args, **options):
+        if not settings.REPLICA_DATABASES:
+            raise CommandError("No replicas configured; set DB_REPLICAS.")
+        if options["sync_sqlite"]:
+            for alias in settings.REPLICA_DATABASES:
+                if not settings.DATABASES[alias]["ENGINE"].endswith("sqlite3"):
+                    raise CommandError(f"{alias} is not a SQLite database.")
+                sync_sqlite_replica(alias)
+                self.stdout.write(f"Copied primary into {alias}.")
+        while True:
+            for row in probe_replicas():
+                lag = "unknown" if row["lag_seconds"] is None else f"{row['lag_seconds']:.1f}s"
+                state = self.style.SUCCESS("healthy") if row["healthy"] else self.style.ERROR("falling back to primary")
+                self.stdout.write(f"{row['alias']}: lag {lag}, {state}{' (' + row['error'] + ')' if row['error'] else ''}")
+            if not options["watch"]:
+                return
+            time.sleep(settings.REPLICA_HEALTH_CHECK_INTERVAL)
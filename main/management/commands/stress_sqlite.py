@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from main.sqlite_stress import run_sqlite_stress
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent report writers and history readers against a scratch SQLite file "
+        "to compare the default and tuned SQLite profiles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profile", choices=["default", "tuned", "both"], default="both")
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--seconds", type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        profiles = ["default", "tuned"] if options["profile"] == "both" else [options["profile"]]
+        for profile in profiles:
+            result = run_sqlite_stress(profile, options["writers"], options["readers"], options["seconds"])
+            self.stdout.write(
+                f"{profile:>8}: {result['writes_per_second']} writes/s "
+                f"({result['writes']} ok, {result['write_errors']} locked), "
+                f"write p95 {result['write_p95_ms']}ms, "
+                f"reads {result['reads']} p50 {result['read_p50_ms']}ms "
+                f"p95 {result['read_p95_ms']}ms max {result['read_max_ms']}ms"
+            )
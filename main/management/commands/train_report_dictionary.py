@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.compression import CODECS
+from main.report_storage import MIN_DICTIONARY_SAMPLES, report_samples, train_report_dictionary
+
+
+class Command(BaseCommand):
+    help = (
+        "Train a shared compression dictionary from recent assessment reports. It is used for new "
+        "writes when REPORT_COMPRESSION_DICTIONARY is enabled; run recompress_reports to apply it to existing rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--codec", choices=[codec for codec in CODECS if codec != "none"], default="zlib")
+        parser.add_argument("--samples", type=int, default=1000)
+        parser.add_argument("--size", type=int, default=None, help="Dictionary size in bytes.")
+        parser.add_argument("--min-samples", type=int, default=MIN_DICTIONARY_SAMPLES)
+        parser.add_argument(
+            "--synthetic", action="store_true", help="Train on generated reports instead of stored ones (testing only)."
+        )
+
+    def handle(self, *args, **options):
+        samples = report_samples(options["samples"], synthetic=options["synthetic"])
+        if len(samples) < options["min_samples"]:
+            raise CommandError(
+                f"Only {len(samples)} stored reports to train on (need {options['min_samples']}); "
+                "lower --min-samples or wait for more reports."
+            )
+        try:
+            dictionary = train_report_dictionary(options["codec"], samples, options["size"])
+        except Exception as exc:
+            raise CommandError(f"Dictionary training failed: {exc}") from exc
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Saved {dictionary.codec} dictionary #{dictionary.pk} "
+                f"({len(dictionary.data)} bytes from {dictionary.sample_count} samples)."
+            )
+        )
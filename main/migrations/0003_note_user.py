@@ -7,17 +7,18 @@ def assign_existing_notes_to_owner(apps, schema_editor):
     app_label, model_name = settings.AUTH_USER_MODEL.split(".")
     User = apps.get_model(app_label, model_name)
     Note = apps.get_model("main", "Note")
+    db_alias = schema_editor.connection.alias
 
-    owner = User.objects.order_by("id").first()
+    owner = User.objects.using(db_alias).order_by("id").first()
     if owner is None:
         username = "legacy_owner"
         i = 1
-        while User.objects.filter(username=username).exists():
+        while User.objects.using(db_alias).filter(username=username).exists():
             i += 1
             username = f"legacy_owner_{i}"
-        owner = User.objects.create(username=username, password=make_password(None))
+        owner = User.objects.using(db_alias).create(username=username, password=make_password(None))
 
-    Note.objects.filter(user__isnull=True).update(user=owner)
+    Note.objects.using(db_alias).filter(user__isnull=True).update(user=owner)
 
 
 class Migration(migrations.Migration):
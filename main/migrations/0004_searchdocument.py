@@ -0,0 +1,104 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE main_searchdocument_fts USING fts5(
+        title, body,
+        content='main_searchdocument', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER main_searchdocument_ai AFTER INSERT ON main_searchdocument BEGIN
+        INSERT INTO main_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER main_searchdocument_ad AFTER DELETE ON main_searchdocument BEGIN
+        INSERT INTO main_searchdocument_fts(main_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER main_searchdocument_au AFTER UPDATE ON main_searchdocument BEGIN
+        INSERT INTO main_searchdocument_fts(main_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO main_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS main_searchdocument_au",
+    "DROP TRIGGER IF EXISTS main_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS main_searchdocument_ai",
+    "DROP TABLE IF EXISTS main_searchdocument_fts",
+]
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE main_searchdocument ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX main_searchdocument_vector_gin ON main_searchdocument USING gin (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS main_searchdocument_vector_gin",
+    "ALTER TABLE main_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run_statements(schema_editor, statements_by_vendor):
+    for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_fulltext_index(apps, schema_editor):
+    _run_statements(schema_editor, {"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD})
+
+
+def drop_fulltext_index(apps, schema_editor):
+    _run_statements(schema_editor, {"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRES_BACKWARD})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0003_note_user"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(choices=[("note", "Note"), ("report", "Assessment report")], max_length=16)),
+                ("object_id", models.BigIntegerField()),
+                ("title", models.CharField(max_length=255)),
+                ("body", models.TextField(blank=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_documents",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("kind", "object_id"), name="main_searchdocument_unique_object"),
+                ],
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
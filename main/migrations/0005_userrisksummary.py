@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-18 23:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0004_searchdocument'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRiskSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_reports', models.PositiveIntegerField(default=0)),
+                ('risk_counts', models.JSONField(default=dict)),
+                ('timeline', models.JSONField(default=dict)),
+                ('top_conditions', models.JSONField(default=dict)),
+                ('latest_risk_label', models.CharField(blank=True, max_length=32)),
+                ('latest_risk_score', models.PositiveSmallIntegerField(default=0)),
+                ('latest_report_id', models.BigIntegerField(blank=True, null=True)),
+                ('latest_report_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='risk_summary', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 6.0 on 2026-10-18 23:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_userrisksummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssessmentEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('report_id', models.BigIntegerField(blank=True, null=True)),
+                ('model', models.CharField(max_length=64)),
+                ('status', models.CharField(max_length=16)),
+                ('risk_label', models.CharField(blank=True, max_length=32)),
+                ('latency_ms', models.PositiveIntegerField(default=0)),
+                ('input_tokens', models.PositiveIntegerField(default=0)),
+                ('output_tokens', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AssessmentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour'), ('day', 'Day')], max_length=8)),
+                ('bucket_start', models.DateTimeField()),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('errors', models.PositiveIntegerField(default=0)),
+                ('latency_sum_ms', models.BigIntegerField(default=0)),
+                ('latency_max_ms', models.PositiveIntegerField(default=0)),
+                ('latency_histogram', models.JSONField(default=list)),
+                ('risk_counts', models.JSONField(default=dict)),
+                ('input_tokens', models.BigIntegerField(default=0)),
+                ('output_tokens', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-bucket_start'],
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'bucket_start'), name='main_assessmentrollup_unique_bucket')],
+            },
+        ),
+    ]
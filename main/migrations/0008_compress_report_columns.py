@@ -0,0 +1,109 @@
+# Generated by Django 6.0 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+import main.fields
+
+BATCH_SIZE = 200
+
+
+def _copy_in_batches(apps, schema_editor, pairs):
+    AssessmentReport = apps.get_model("main", "AssessmentReport")
+    db_alias = schema_editor.connection.alias
+    sources = [source for source, _ in pairs]
+    last_pk = 0
+    while True:
+        batch = list(
+            AssessmentReport.objects.using(db_alias)
+            .filter(pk__gt=last_pk)
+            .order_by("pk")
+            .only("pk", *sources)[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        for report in batch:
+            for source, target in pairs:
+                setattr(report, target, getattr(report, source))
+        AssessmentReport.objects.using(db_alias).bulk_update(batch, [target for _, target in pairs])
+        last_pk = batch[-1].pk
+
+
+def compress_reports(apps, schema_editor):
+    _copy_in_batches(apps, schema_editor, [("ai_report", "ai_report_compressed"), ("payload", "payload_compressed")])
+
+
+def decompress_reports(apps, schema_editor):
+    _copy_in_batches(apps, schema_editor, [("ai_report_compressed", "ai_report"), ("payload_compressed", "payload")])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_assessmentdraft'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompressionDictionary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codec', models.CharField(max_length=8)),
+                ('data', models.BinaryField()),
+                ('sample_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'compression dictionaries',
+            },
+        ),
+        migrations.AddField(
+            model_name='assessmentreport',
+            name='ai_report_compressed',
+            field=main.fields.CompressedTextField(default=''),
+        ),
+        migrations.AddField(
+            model_name='assessmentreport',
+            name='payload_compressed',
+            field=main.fields.CompressedJSONField(default=dict),
+        ),
+        # Defaults on the old columns only matter when migrating backwards.
+        migrations.AlterField(
+            model_name='assessmentreport',
+            name='ai_report',
+            field=models.TextField(default=''),
+        ),
+        migrations.AlterField(
+            model_name='assessmentreport',
+            name='payload',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.RunPython(compress_reports, decompress_reports),
+        migrations.RemoveField(
+            model_name='assessmentreport',
+            name='ai_report',
+        ),
+        migrations.RemoveField(
+            model_name='assessmentreport',
+            name='payload',
+        ),
+        migrations.RenameField(
+            model_name='assessmentreport',
+            old_name='ai_report_compressed',
+            new_name='ai_report',
+        ),
+        migrations.RenameField(
+            model_name='assessmentreport',
+            old_name='payload_compressed',
+            new_name='payload',
+        ),
+        migrations.AlterField(
+            model_name='assessmentreport',
+            name='ai_report',
+            field=main.fields.CompressedTextField(),
+        ),
+        migrations.AlterField(
+            model_name='assessmentreport',
+            name='payload',
+            field=main.fields.CompressedJSONField(),
+        ),
+    ]
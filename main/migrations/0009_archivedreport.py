@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-19 10:05
+
+import django.db.models.deletion
+import main.fields
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_compress_report_columns'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedReport',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('payload', main.fields.CompressedJSONField()),
+                ('ai_report', main.fields.CompressedTextField()),
+                ('pdf_file', models.FileField(blank=True, upload_to='assessment_reports/%Y/%m/%d/')),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='main_archived_user_created')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_archivedreport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentreport',
+            name='red_flags',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='assessmentreport',
+            name='status',
+            field=models.CharField(choices=[('ready', 'Ready'), ('pending', 'Pending'), ('failed', 'Failed')], default='ready', max_length=16),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_assessmentreport_status_red_flags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentevent',
+            name='routing',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='assessmentevent',
+            name='tier',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+    ]
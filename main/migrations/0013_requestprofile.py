@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-19 14:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_reportsignature'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('method', models.CharField(max_length=8)),
+                ('path', models.CharField(max_length=255)),
+                ('view_name', models.CharField(blank=True, max_length=128)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+                ('query_count', models.PositiveIntegerField(default=0)),
+                ('query_ms', models.PositiveIntegerField(default=0)),
+                ('stats', models.BinaryField()),
+                ('summary', models.TextField(blank=True)),
+                ('queries', models.JSONField(blank=True, default=list)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_requestprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedreport',
+            name='parent_report_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='assessmentreport',
+            name='parent_report_id',
+            field=models.BigIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='assessmentreport',
+            name='response_id',
+            field=models.CharField(blank=True, max_length=128),
+        ),
+    ]
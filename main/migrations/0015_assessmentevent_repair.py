@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_report_follow_up'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentevent',
+            name='repair',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
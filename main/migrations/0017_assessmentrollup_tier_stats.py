@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-19 18:05
+
+from django.db import migrations, models
+
+from main.analytics import add_tier_stats, bucket_start
+
+
+def backfill_daily_tier_stats(apps, schema_editor):
+    # Rebuild day rollups from the raw events still retained; minute and hour
+    # rollups only gain tier stats from new events.
+    AssessmentEvent = apps.get_model("main", "AssessmentEvent")
+    AssessmentRollup = apps.get_model("main", "AssessmentRollup")
+    db_alias = schema_editor.connection.alias
+    stats_by_day = {}
+    events = AssessmentEvent.objects.using(db_alias).exclude(tier="").only("created_at", "tier", "model", "status", "latency_ms", "output_tokens")
+    for event in events.iterator(chunk_size=1000):
+        add_tier_stats(stats_by_day.setdefault(bucket_start(event.created_at, "day"), {}), event)
+    for day, stats in stats_by_day.items():
+        AssessmentRollup.objects.using(db_alias).filter(granularity="day", bucket_start=day).update(tier_stats=stats)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0016_replicaheartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentrollup',
+            name='tier_stats',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.RunPython(backfill_daily_tier_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+from main.analytics import add_repair_stats, bucket_start
+
+
+def backfill_daily_repair_stats(apps, schema_editor):
+    # Rebuild day rollups from the raw events still retained; minute and hour
+    # rollups only gain repair stats from new events.
+    AssessmentEvent = apps.get_model("main", "AssessmentEvent")
+    AssessmentRollup = apps.get_model("main", "AssessmentRollup")
+    db_alias = schema_editor.connection.alias
+    stats_by_day = {}
+    events = AssessmentEvent.objects.using(db_alias).filter(status="ok").only("created_at", "status", "repair")
+    for event in events.iterator(chunk_size=1000):
+        add_repair_stats(stats_by_day.setdefault(bucket_start(event.created_at, "day"), {}), event)
+    for day, stats in stats_by_day.items():
+        AssessmentRollup.objects.using(db_alias).filter(granularity="day", bucket_start=day).update(repair_stats=stats)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0017_assessmentrollup_tier_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentrollup',
+            name='repair_stats',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.RunPython(backfill_daily_repair_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.conf import settings
+
+TIER_FAST = "fast"
+TIER_STANDARD = "standard"
+TIER_THOROUGH = "thorough"
+
+
+@dataclass
+class RoutingDecision:
+    tier: str
+    model: str
+    timeout: int
+    answered: int = 0
+    text_chars: int = 0
+    reasons: list[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"answered": self.answered, "text_chars": self.text_chars, "reasons": self.reasons}
+
+
+def payload_complexity(payload: dict[str, Any]) -> tuple[int, int]:
+    answers = [str(item.get("answer") or "").strip() for item in payload.get("question_answers", [])]
+    answered = sum(1 for answer in answers if answer)
+    text_chars = sum(len(answer) for answer in answers) + len(str(payload.get("additional_notes") or "").strip())
+    return answered, text_chars
+
+
+def _decision(tier: str, answered: int, text_chars: int, reasons: list[str]) -> RoutingDecision:
+    config = settings.ASSESSMENT_MODEL_TIERS[tier]
+    return RoutingDecision(tier, config["model"], config["timeout"], answered, text_chars, reasons)
+
+
+def route_assessment(payload: dict[str, Any], emergency: bool = False) -> RoutingDecision:
+    answered, text_chars = payload_complexity(payload)
+    if not settings.ASSESSMENT_MODEL_ROUTING:
+        return _decision(TIER_STANDARD, answered, text_chars, ["routing disabled"])
+    if emergency:
+        return _decision(TIER_THOROUGH, answered, text_chars, ["red-flag pre-screen"])
+
+    reasons = []
+    if answered >= settings.ROUTING_THOROUGH_MIN_ANSWERS:
+        reasons.append(f"{answered} answers")
+    if text_chars >= settings.ROUTING_THOROUGH_MIN_CHARS:
+        reasons.append(f"{text_chars} chars of text")
+    if reasons:
+        return _decision(TIER_THOROUGH, answered, text_chars, reasons)
+    if answered <= settings.ROUTING_FAST_MAX_ANSWERS and text_chars <= settings.ROUTING_FAST_MAX_CHARS:
+        return _decision(TIER_FAST, answered, text_chars, [f"{answered} answers, {text_chars} chars"])
+    return _decision(TIER_STANDARD, answered, text_chars, [f"{answered} answers, {text_chars} chars"])
@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.db import models
 
+from .fields import CompressedJSONField, CompressedTextField
+
 
 class Note(models.Model):
     user = models.ForeignKey(
@@ -22,13 +24,28 @@ class Note(models.Model):
 
 
 class AssessmentReport(models.Model):
+    STATUS_READY = "ready"
+    STATUS_PENDING = "pending"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_READY, "Ready"),
+        (STATUS_PENDING, "Pending"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="assessment_reports",
     )
-    payload = models.JSONField()
-    ai_report = models.TextField()
+    payload = CompressedJSONField()
+    ai_report = CompressedTextField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_READY)
+    red_flags = models.JSONField(default=dict, blank=True)
+    # Upstream Responses API id, used to chain follow-up answers onto this report.
+    response_id = models.CharField(max_length=128, blank=True)
+    # Set on follow-up revisions; a plain id so the link survives archiving.
+    parent_report_id = models.BigIntegerField(null=True, blank=True, db_index=True)
     pdf_file = models.FileField(upload_to="assessment_reports/%Y/%m/%d/", blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -37,3 +54,219 @@ class AssessmentReport(models.Model):
 
     def __str__(self) -> str:
         return f"AssessmentReport #{self.pk} for {self.user}"
+
+
+# Reports moved out of the hot table by `manage.py archive_reports`. Rows keep
+# the original report id and the stored (already compressed) column bytes.
+class ArchivedReport(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_reports",
+    )
+    payload = CompressedJSONField()
+    ai_report = CompressedTextField()
+    parent_report_id = models.BigIntegerField(null=True, blank=True)
+    pdf_file = models.FileField(upload_to="assessment_reports/%Y/%m/%d/", blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="main_archived_user_created"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Archived report #{self.pk} for {self.user}"
+
+
+class SearchDocument(models.Model):
+    KIND_NOTE = "note"
+    KIND_REPORT = "report"
+    KIND_CHOICES = [
+        (KIND_NOTE, "Note"),
+        (KIND_REPORT, "Assessment report"),
+    ]
+
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="search_documents",
+    )
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="main_searchdocument_unique_object"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} #{self.object_id}"
+
+
+class UserRiskSummary(models.Model):
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="risk_summary",
+    )
+    total_reports = models.PositiveIntegerField(default=0)
+    risk_counts = models.JSONField(default=dict)
+    timeline = models.JSONField(default=dict)
+    top_conditions = models.JSONField(default=dict)
+    latest_risk_label = models.CharField(max_length=32, blank=True)
+    latest_risk_score = models.PositiveSmallIntegerField(default=0)
+    latest_report_id = models.BigIntegerField(null=True, blank=True)
+    latest_report_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Risk summary for {self.user}"
+
+
+class AssessmentEvent(models.Model):
+    created_at = models.DateTimeField(db_index=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    report_id = models.BigIntegerField(null=True, blank=True)
+    model = models.CharField(max_length=64)
+    tier = models.CharField(max_length=16, blank=True)
+    routing = models.JSONField(default=dict, blank=True)
+    # Filled when the report needed missing or malformed sections regenerated.
+    repair = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=16)
+    risk_label = models.CharField(max_length=32, blank=True)
+    latency_ms = models.PositiveIntegerField(default=0)
+    input_tokens = models.PositiveIntegerField(default=0)
+    output_tokens = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"{self.model} {self.status} at {self.created_at:%Y-%m-%d %H:%M}"
+
+
+class AssessmentRollup(models.Model):
+    GRANULARITY_MINUTE = "minute"
+    GRANULARITY_HOUR = "hour"
+    GRANULARITY_DAY = "day"
+    GRANULARITY_CHOICES = [
+        (GRANULARITY_MINUTE, "Minute"),
+        (GRANULARITY_HOUR, "Hour"),
+        (GRANULARITY_DAY, "Day"),
+    ]
+
+    granularity = models.CharField(max_length=8, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+    total = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    latency_sum_ms = models.BigIntegerField(default=0)
+    latency_max_ms = models.PositiveIntegerField(default=0)
+    latency_histogram = models.JSONField(default=list)
+    risk_counts = models.JSONField(default=dict)
+    input_tokens = models.BigIntegerField(default=0)
+    output_tokens = models.BigIntegerField(default=0)
+    # "tier|model" -> counters and a histogram of successful latencies.
+    tier_stats = models.JSONField(default=dict)
+    # Section repair counters over successful assessments (see analytics.add_repair_stats).
+    repair_stats = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ["-bucket_start"]
+        constraints = [
+            models.UniqueConstraint(fields=["granularity", "bucket_start"], name="main_assessmentrollup_unique_bucket"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.granularity} {self.bucket_start:%Y-%m-%d %H:%M}"
+
+
+class AssessmentDraft(models.Model):
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="assessment_draft",
+    )
+    answers = models.JSONField(default=dict)
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        return f"Assessment draft for {self.user}"
+
+
+class CompressionDictionary(models.Model):
+    codec = models.CharField(max_length=8)
+    data = models.BinaryField()
+    sample_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = "compression dictionaries"
+
+    def __str__(self) -> str:
+        return f"{self.codec} dictionary #{self.pk} ({len(self.data)} bytes)"
+
+
+class ReportSignature(models.Model):
+    # Keyed by report id rather than a foreign key so archived reports keep theirs.
+    report_id = models.BigIntegerField(unique=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    scheme = models.CharField(max_length=32)
+    signature = models.BinaryField()
+
+    def __str__(self) -> str:
+        return f"{self.scheme} signature for report #{self.report_id}"
+
+
+class RequestProfile(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    method = models.CharField(max_length=8)
+    path = models.CharField(max_length=255)
+    view_name = models.CharField(max_length=128, blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.PositiveIntegerField(default=0)
+    query_count = models.PositiveIntegerField(default=0)
+    query_ms = models.PositiveIntegerField(default=0)
+    # marshal-encoded pstats data, loadable with pstats.Stats(path) or snakeviz.
+    stats = models.BinaryField()
+    summary = models.TextField(blank=True)
+    queries = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"{self.method} {self.path} at {self.created_at:%Y-%m-%d %H:%M}"
+
+
+class ReplicaHeartbeat(models.Model):
+    # Single row bumped on the primary; its replayed copy on a replica gives the lag.
+    beat_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"Heartbeat at {self.beat_at:%Y-%m-%d %H:%M:%S}"
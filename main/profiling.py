@@ -0,0 +1,110 @@
+import cProfile
+import io
+import marshal
+import pstats
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .models import RequestProfile
+
+PROFILE_PARAM = "_profile"
+PROFILE_HEADER = "HTTP_X_PROFILE_TOKEN"
+PROFILE_ID_HEADER = "X-Profile-Id"
+TOKEN_SALT = "main.profiling"
+SQL_MAX_CHARS = 2000
+
+
+def profiling_token(user) -> str:
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(str(user.pk))
+
+
+def token_allows(token: str, user) -> bool:
+    if not (user.is_authenticated and user.is_staff):
+        return False
+    try:
+        value = signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=settings.REQUEST_PROFILING_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    # Tokens are per staff member; a leaked link does not work for anyone else.
+    return value == str(user.pk)
+
+
+class QueryCapture:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.queries: list[dict] = []
+        self.count = 0
+        self.total_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.total_ms += elapsed_ms
+            if len(self.queries) < self.limit:
+                self.queries.append(
+                    {
+                        "alias": context["connection"].alias,
+                        "sql": sql[:SQL_MAX_CHARS],
+                        "ms": round(elapsed_ms, 3),
+                        "many": many,
+                    }
+                )
+
+
+def profile_request(request, get_response):
+    capture = QueryCapture(settings.REQUEST_PROFILING_MAX_QUERIES)
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(capture))
+        profiler.enable()
+        try:
+            response = get_response(request)
+        finally:
+            profiler.disable()
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    summary = io.StringIO()
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(settings.REQUEST_PROFILING_SUMMARY_ROWS)
+    match = request.resolver_match
+    profile = RequestProfile.objects.create(
+        user=request.user,
+        method=request.method,
+        path=request.get_full_path()[:255],
+        view_name=(match.view_name if match else "")[:128],
+        status_code=response.status_code,
+        duration_ms=round(duration_ms),
+        query_count=capture.count,
+        query_ms=round(capture.total_ms),
+        stats=marshal.dumps(stats.stats),
+        summary=summary.getvalue(),
+        queries=capture.queries,
+    )
+    response[PROFILE_ID_HEADER] = str(profile.pk)
+    return response
+
+
+class RequestProfilingMiddleware:
+    # Untriggered requests pay one dictionary lookup; with REQUEST_PROFILING off
+    # the middleware is dropped from the stack entirely.
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = request.GET.get(PROFILE_PARAM) or request.META.get(PROFILE_HEADER)
+        if not token or not token_allows(token, request.user):
+            return self.get_response(request)
+        return profile_request(request, self.get_response)
@@ -0,0 +1,170 @@
+import logging
+import re
+import sys
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.base import Node
+from django.urls import URLPattern, resolve, reverse
+
+logger = logging.getLogger(__name__)
+
+APP_ROOT = Path(__file__).resolve().parent
+WHITESPACE_RE = re.compile(r"\s+")
+# Transaction control is not counted: savepoints only appear when a view's
+# atomic block nests inside another (as in TestCase), and only SQLite sends
+# BEGIN through the cursor, so counting either makes budgets depend on the
+# test case type or the backend.
+TRANSACTION_RE = re.compile(r"^(BEGIN\b|(RELEASE |ROLLBACK TO )?SAVEPOINT )", re.IGNORECASE)
+MAX_LOCATIONS = 3
+
+
+class QueryBudgetError(AssertionError):
+    pass
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    max_queries: int
+    max_repeats: int | None = None
+
+
+def query_budget(max_queries: int, max_repeats: int | None = None):
+    # Apply below @login_required and friends; functools.wraps carries the
+    # attribute up to the outermost wrapper.
+    def decorator(view):
+        view.query_budget = QueryBudget(max_queries, max_repeats)
+        return view
+
+    return decorator
+
+
+def budget_for(view) -> QueryBudget:
+    budget = getattr(view, "query_budget", None)
+    if budget is None:
+        budget = QueryBudget(settings.QUERY_BUDGET_DEFAULT)
+    if budget.max_repeats is None:
+        budget = QueryBudget(budget.max_queries, settings.QUERY_BUDGET_MAX_REPEATS)
+    return budget
+
+
+def _caller_location() -> str:
+    # Innermost template node being rendered, then the innermost frame in app code.
+    template = code = ""
+    frame = sys._getframe(2)
+    while frame is not None and not (template and code):
+        node = frame.f_locals.get("self")
+        # type() rather than isinstance(): a lazy `self` (request.user) would be evaluated.
+        if not template and issubclass(type(node), Node) and getattr(node, "origin", None) and getattr(node, "token", None):
+            template = f"{node.origin.template_name or node.origin.name}:{node.token.lineno}"
+        filename = frame.f_code.co_filename
+        if not code and filename.startswith(str(APP_ROOT)) and filename != __file__:
+            code = f"{Path(filename).relative_to(APP_ROOT.parent)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return " via ".join(part for part in (template, code) if part) or "unknown"
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.statements: Counter[str] = Counter()
+        self.locations: dict[str, Counter[str]] = {}
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        statement = WHITESPACE_RE.sub(" ", sql).strip()
+        if TRANSACTION_RE.match(statement):
+            return execute(sql, params, many, context)
+        self.count += 1
+        self.statements[statement] += 1
+        self.locations.setdefault(statement, Counter())[_caller_location()] += 1
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def capture(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    def report(self, label: str, budget: QueryBudget) -> "BudgetReport":
+        repeated = [
+            RepeatedQuery(statement, count, [location for location, _ in self.locations[statement].most_common(MAX_LOCATIONS)])
+            for statement, count in self.statements.most_common()
+            if count > budget.max_repeats
+        ]
+        return BudgetReport(label, budget, self.count, repeated)
+
+
+@dataclass
+class RepeatedQuery:
+    sql: str
+    count: int
+    locations: list[str]
+
+
+@dataclass
+class BudgetReport:
+    label: str
+    budget: QueryBudget
+    count: int
+    repeated: list[RepeatedQuery] = field(default_factory=list)
+
+    @property
+    def problems(self) -> list[str]:
+        problems = []
+        if self.count > self.budget.max_queries:
+            problems.append(f"{self.label}: {self.count} queries, budget {self.budget.max_queries}")
+        for query in self.repeated:
+            problems.append(
+                f"{self.label}: possible N+1, ran {query.count}x from {', '.join(query.locations)}: {query.sql[:200]}"
+            )
+        return problems
+
+
+class QueryBudgetMiddleware:
+    # Development and test aid: recording a stack per query is not free, so the
+    # middleware is dropped from the stack unless QUERY_BUDGET_ENABLED is on.
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with recorder.capture():
+            response = self.get_response(request)
+        match = request.resolver_match
+        if match is None:
+            return response
+        report = recorder.report(f"{request.method} {match.view_name}", budget_for(match.func))
+        for problem in report.problems:
+            logger.warning(problem)
+        if report.problems and settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetError("\n".join(report.problems))
+        return response
+
+
+def url_budget_problems(client, urlpatterns, url_kwargs: dict[str, dict]) -> list[str]:
+    # Requests every named pattern with the client's session and checks it
+    # against the view's declared budget. Views without one are reported too.
+    problems = []
+    for pattern in urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+        if pattern.pattern.converters and pattern.name not in url_kwargs:
+            problems.append(f"{pattern.name}: no sample URL arguments")
+            continue
+        url = reverse(pattern.name, kwargs=url_kwargs.get(pattern.name))
+        view = resolve(url).func
+        if getattr(view, "query_budget", None) is None and view.__module__.startswith(__package__):
+            problems.append(f"{pattern.name}: no @query_budget declared")
+        recorder = QueryRecorder()
+        with recorder.capture():
+            client.get(url)
+        problems.extend(recorder.report(f"GET {pattern.name}", budget_for(view)).problems)
+    return problems
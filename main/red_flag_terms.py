@@ -0,0 +1,200 @@
+# Term lists for the local red-flag pre-screen (main.red_flags). Bump the
+# version whenever a list changes; it is stored with every screened report.
+RED_FLAG_TERMS_VERSION = "2026.10.1"
+
+# Concepts are matched as whole-token phrases after lowercasing and dropping
+# apostrophes ("can't" -> "cant").
+RED_FLAG_CONCEPTS = {
+    "chest_pain": [
+        "chest pain",
+        "chest pressure",
+        "chest tightness",
+        "crushing chest",
+        "pain in my chest",
+        "pressure in my chest",
+        "tightness in my chest",
+    ],
+    "radiation_arm_jaw": [
+        "arm",
+        "arms",
+        "jaw",
+        "shoulder",
+        "radiates",
+        "radiating",
+        "spreads",
+        "spreading",
+    ],
+    "severe_dyspnea": [
+        "severe shortness of breath",
+        "cant breathe",
+        "cannot breathe",
+        "unable to breathe",
+        "struggling to breathe",
+        "gasping for air",
+        "short of breath at rest",
+        "breathless at rest",
+        "blue lips",
+        "lips turning blue",
+    ],
+    "stroke_sign": [
+        "facial droop",
+        "face drooping",
+        "face is drooping",
+        "drooping face",
+        "slurred speech",
+        "slurring my words",
+        "slurring words",
+        "one sided weakness",
+        "weakness on one side",
+        "numbness on one side",
+        "cant move my arm",
+        "cannot move my arm",
+        "cant lift my arm",
+        "cannot lift my arm",
+    ],
+    "neuro_deficit": [
+        "sudden weakness",
+        "sudden numbness",
+        "sudden vision loss",
+        "suddenly lost vision",
+        "sudden confusion",
+        "cant speak",
+        "cannot speak",
+        "unable to speak",
+        "seizure",
+        "seizures",
+        "worst headache of my life",
+        "thunderclap headache",
+    ],
+    "loss_of_consciousness": [
+        "passed out",
+        "fainted",
+        "blacked out",
+        "lost consciousness",
+        "loss of consciousness",
+        "unconscious",
+        "collapsed",
+    ],
+    "severe_dehydration": [
+        "severely dehydrated",
+        "severe dehydration",
+        "cant keep fluids down",
+        "cannot keep fluids down",
+        "cant keep water down",
+        "cannot keep water down",
+        "not urinating",
+        "no urine",
+    ],
+    "fever": [
+        "fever",
+        "febrile",
+        "high temperature",
+    ],
+    "stiff_neck": [
+        "stiff neck",
+        "neck stiffness",
+        "neck is stiff",
+        "cant bend my neck",
+        "cannot bend my neck",
+    ],
+    "abdominal_guarding": [
+        "rigid abdomen",
+        "rigid stomach",
+        "abdomen is rigid",
+        "stomach is rigid",
+        "board like abdomen",
+        "abdominal guarding",
+    ],
+    "suicidal_ideation": [
+        "suicidal",
+        "suicide",
+        "kill myself",
+        "end my life",
+        "want to die",
+        "better off dead",
+        "hurt myself",
+        "harm myself",
+    ],
+    "anaphylaxis": [
+        "anaphylaxis",
+        "anaphylactic",
+        "throat closing",
+        "throat is closing",
+        "throat swelling",
+        "tongue swelling",
+        "swollen tongue",
+        "lips swelling",
+        "swollen lips",
+    ],
+}
+
+# (flag, required concepts, scope). Multi-concept flags need every concept
+# un-negated in the same answer ("field") or anywhere in the payload.
+RED_FLAG_RULES = [
+    ("chest_pain_radiating", ("chest_pain", "radiation_arm_jaw"), "field"),
+    ("severe_shortness_of_breath", ("severe_dyspnea",), "field"),
+    ("stroke_signs", ("stroke_sign",), "field"),
+    ("neurological_deficit", ("neuro_deficit",), "field"),
+    ("loss_of_consciousness", ("loss_of_consciousness",), "field"),
+    ("severe_dehydration", ("severe_dehydration",), "field"),
+    ("fever_with_stiff_neck", ("fever", "stiff_neck"), "payload"),
+    ("severe_abdominal_guarding", ("abdominal_guarding",), "field"),
+    ("suicidal_ideation", ("suicidal_ideation",), "field"),
+    ("anaphylaxis", ("anaphylaxis",), "field"),
+]
+
+RED_FLAG_LABELS = {
+    "chest_pain_radiating": "Chest pain radiating to the arm or jaw",
+    "severe_shortness_of_breath": "Severe shortness of breath",
+    "stroke_signs": "Possible stroke signs",
+    "neurological_deficit": "Sudden neurological deficit",
+    "loss_of_consciousness": "Loss of consciousness",
+    "severe_dehydration": "Severe dehydration",
+    "fever_with_stiff_neck": "High fever with stiff neck",
+    "severe_abdominal_guarding": "Severe abdominal guarding",
+    "suicidal_ideation": "Thoughts of suicide or self-harm",
+    "anaphylaxis": "Possible severe allergic reaction",
+}
+
+# Questions whose wording already names the concept. An answer counts as that
+# concept when it starts with a clear "yes" or matches one of the question's
+# phrases below (un-negated); anything vaguer ("unsure", "a little hoarse")
+# does not escalate on its own.
+QUESTION_CONCEPTS = {
+    4: "fever",
+    7: "chest_pain",
+    13: "neuro_deficit",
+    17: "stroke_sign",
+    18: "stroke_sign",
+}
+
+QUESTION_TERMS = {
+    # Temperatures are tokenized on the decimal point: "39.5" -> "39", ".", "5".
+    4: ["chills", "rigors", "shivering", "night sweats", "burning up", "38", "39", "40", "41", "101", "102", "103", "104"],
+    7: ["pressure", "tightness", "tight", "crushing", "squeezing", "heaviness", "heavy"],
+    13: ["sudden", "suddenly", "thunderclap", "worst headache", "came on in seconds", "out of nowhere"],
+    17: [
+        "slurred",
+        "slurring",
+        "jumbled",
+        "garbled",
+        "cant find my words",
+        "cant get my words out",
+        "trouble speaking",
+        "difficulty speaking",
+        "cant speak",
+        "cannot speak",
+    ],
+    18: ["weak", "weakness", "numb", "numbness", "droop", "drooping", "cant lift", "cannot lift", "cant move", "paralysed", "paralyzed"],
+}
+
+NEGATION_CUES = frozenset(
+    {
+        "no", "not", "never", "none", "without", "denies", "deny", "denied", "nor",
+        "dont", "doesnt", "didnt", "havent", "hasnt", "hadnt", "isnt", "arent", "wasnt", "werent",
+        "negative",
+    }
+)
+# A negation cue stops applying at sentence punctuation or these words.
+SCOPE_TERMINATORS = frozenset({".", ";", "!", "?", "but", "however", "although", "though", "except", "yet"})
+NEGATION_WINDOW = 6
@@ -0,0 +1,189 @@
+import json
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from .ai_service import build_assessment_payload
+from .red_flag_terms import (
+    NEGATION_CUES,
+    NEGATION_WINDOW,
+    QUESTION_CONCEPTS,
+    QUESTION_TERMS,
+    RED_FLAG_CONCEPTS,
+    RED_FLAG_LABELS,
+    RED_FLAG_RULES,
+    RED_FLAG_TERMS_VERSION,
+    SCOPE_TERMINATORS,
+)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+|[.;!?,]")
+APOSTROPHES_RE = re.compile(r"['’]")
+AFFIRMATIVE_REPLIES = frozenset({"yes", "yeah", "yep", "y"})
+CORPUS_PATH = Path(__file__).with_name("red_flag_corpus.json")
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(APOSTROPHES_RE.sub("", text.lower()))
+
+
+class TokenAutomaton:
+    # Aho-Corasick over word tokens: one pass finds every phrase from every
+    # concept, regardless of how many phrases there are.
+    def __init__(self, phrases: dict[str, list[str]]):
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.output: list[list[tuple[str, int]]] = [[]]
+        for concept, terms in phrases.items():
+            for term in terms:
+                self._add(tokenize(term), concept)
+        self._link()
+
+    def _add(self, tokens: list[str], concept: str) -> None:
+        node = 0
+        for token in tokens:
+            nxt = self.goto[node].get(token)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[node][token] = nxt
+            node = nxt
+        self.output[node].append((concept, len(tokens)))
+
+    def _link(self) -> None:
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(token, 0)
+                self.fail[child] = target if target != child else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, tokens: list[str]) -> list[tuple[str, int, int]]:
+        matches = []
+        node = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        for end, token in enumerate(tokens):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for concept, length in output[node]:
+                matches.append((concept, end - length + 1, end + 1))
+        return matches
+
+
+@lru_cache(maxsize=None)
+def compiled_matcher(version: str = RED_FLAG_TERMS_VERSION) -> TokenAutomaton:
+    return TokenAutomaton(RED_FLAG_CONCEPTS)
+
+
+@lru_cache(maxsize=None)
+def compiled_question_matchers(version: str = RED_FLAG_TERMS_VERSION) -> dict[int, TokenAutomaton]:
+    return {question: TokenAutomaton({QUESTION_CONCEPTS[question]: terms}) for question, terms in QUESTION_TERMS.items()}
+
+
+def is_negated(tokens: list[str], start: int) -> bool:
+    for idx in range(start - 1, max(-1, start - 1 - NEGATION_WINDOW), -1):
+        token = tokens[idx]
+        if token in SCOPE_TERMINATORS:
+            return False
+        if token in NEGATION_CUES:
+            return True
+    return False
+
+
+def is_affirmative_reply(tokens: list[str]) -> bool:
+    return bool(tokens) and tokens[0] in AFFIRMATIVE_REPLIES
+
+
+@dataclass
+class RedFlagHit:
+    flag: str
+    field: str
+    evidence: list[str]
+
+    @property
+    def label(self) -> str:
+        return RED_FLAG_LABELS.get(self.flag, self.flag)
+
+
+@dataclass
+class ScreenResult:
+    version: str
+    hits: list[RedFlagHit] = field(default_factory=list)
+    negated: list[tuple[str, str, str]] = field(default_factory=list)
+
+    @property
+    def emergency(self) -> bool:
+        return bool(self.hits)
+
+    @property
+    def flags(self) -> list[str]:
+        return sorted({hit.flag for hit in self.hits})
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"version": self.version, "flags": self.flags}
+
+
+def payload_fields(payload: dict[str, Any]) -> list[tuple[str, int | None, str]]:
+    fields = [("additional_notes", None, payload.get("additional_notes") or "")]
+    for idx, item in enumerate(payload.get("question_answers", []), start=1):
+        fields.append((f"q{idx}", idx, str(item.get("answer") or "")))
+    for idx, answers in enumerate(payload.get("follow_up_answers", []), start=1):
+        fields.append((f"follow_up{idx}", None, str(answers or "")))
+    return fields
+
+
+def screen_payload(payload: dict[str, Any]) -> ScreenResult:
+    matcher = compiled_matcher()
+    question_matchers = compiled_question_matchers()
+    result = ScreenResult(version=RED_FLAG_TERMS_VERSION)
+    # concept -> {field name: [evidence]}
+    found: dict[str, dict[str, list[str]]] = {}
+
+    for name, question, text in payload_fields(payload):
+        if not text.strip():
+            continue
+        tokens = tokenize(text)
+        matches = matcher.find(tokens)
+        if question in question_matchers:
+            if is_affirmative_reply(tokens):
+                evidence = found.setdefault(QUESTION_CONCEPTS[question], {}).setdefault(name, [])
+                evidence.append(f"answered yes to question {question}")
+            matches += question_matchers[question].find(tokens)
+        for concept, start, end in matches:
+            phrase = " ".join(tokens[start:end])
+            if is_negated(tokens, start):
+                result.negated.append((concept, name, phrase))
+                continue
+            found.setdefault(concept, {}).setdefault(name, []).append(phrase)
+
+    for flag, concepts, scope in RED_FLAG_RULES:
+        if not all(concept in found for concept in concepts):
+            continue
+        if scope == "field":
+            shared = set.intersection(*(set(found[concept]) for concept in concepts))
+            for name in sorted(shared):
+                evidence = [phrase for concept in concepts for phrase in found[concept][name]]
+                result.hits.append(RedFlagHit(flag, name, evidence))
+        else:
+            names = sorted({name for concept in concepts for name in found[concept]})
+            evidence = [phrase for concept in concepts for phrases in found[concept].values() for phrase in phrases]
+            result.hits.append(RedFlagHit(flag, ",".join(names), evidence))
+    return result
+
+
+def load_corpus(path: Path = CORPUS_PATH) -> list[dict[str, Any]]:
+    cases = json.loads(path.read_text(encoding="utf-8"))
+    for case in cases:
+        answers = {f"q{number}": text for number, text in case.get("answers", {}).items()}
+        case["payload"] = build_assessment_payload({"additional_notes": case.get("notes", ""), **answers})
+    return cases
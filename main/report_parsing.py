@@ -0,0 +1,133 @@
+import re
+
+
+SECTION_ALIASES = {
+    "clinical summary": "clinical_summary",
+    "most likely conditions (ranked)": "most_likely_conditions",
+    "risk stratification": "risk_stratification",
+    "recommended diagnostic tests": "recommended_diagnostic_tests",
+    "recommended next steps (by urgency)": "recommended_next_steps",
+    "what to monitor": "what_to_monitor",
+    "red flags requiring immediate escalation": "red_flags",
+    "general supportive advice": "general_supportive_advice",
+    "what not to do": "what_not_to_do",
+}
+
+# Headings exactly as the system prompt asks for them, in report order.
+SECTION_TITLES = {
+    "clinical_summary": "Clinical Summary",
+    "most_likely_conditions": "Most Likely Conditions (Ranked)",
+    "risk_stratification": "Risk Stratification",
+    "recommended_diagnostic_tests": "Recommended Diagnostic Tests",
+    "recommended_next_steps": "Recommended Next Steps (by urgency)",
+    "what_to_monitor": "What to Monitor",
+    "red_flags": "Red Flags Requiring Immediate Escalation",
+    "general_supportive_advice": "General Supportive Advice",
+    "what_not_to_do": "What NOT to Do",
+}
+
+
+def section_heading(key: str) -> str:
+    return f"## {list(SECTION_TITLES).index(key) + 1}) {SECTION_TITLES[key]}"
+
+
+def _normalize_heading(line: str) -> str:
+    cleaned = re.sub(r"^#{1,6}\s*", "", line).strip()
+    cleaned = re.sub(r"^\d+\)\s*", "", cleaned).strip().lower()
+    return cleaned
+
+
+def _clean_markdown_for_display(text: str) -> str:
+    cleaned_lines = []
+    for line in text.splitlines():
+        line = re.sub(r"^\s*#{1,6}\s*", "", line)
+        cleaned_lines.append(line.rstrip())
+    return "\n".join(cleaned_lines).strip()
+
+
+def split_report_sections(report: str) -> tuple[str, dict[str, str]]:
+    # Raw markdown per recognised section, plus any text before the first one.
+    preamble: list[str] = []
+    bodies: dict[str, str] = {}
+    current_key = None
+    bucket: list[str] = []
+
+    for raw_line in report.splitlines():
+        line = raw_line.rstrip()
+        if line.lstrip().startswith("#"):
+            heading = _normalize_heading(line)
+            next_key = SECTION_ALIASES.get(heading)
+            if next_key:
+                if current_key is not None:
+                    bodies[current_key] = "\n".join(bucket)
+                current_key = next_key
+                bucket = []
+                continue
+        if current_key is not None:
+            bucket.append(line)
+        else:
+            preamble.append(line)
+
+    if current_key is not None:
+        bodies[current_key] = "\n".join(bucket)
+
+    return "\n".join(preamble).strip(), bodies
+
+
+def parse_assessment_sections(report: str) -> dict[str, str]:
+    _, bodies = split_report_sections(report)
+    return {key: _clean_markdown_for_display(bodies.get(key, "")) for key in SECTION_ALIASES.values()}
+
+
+def extract_risk_label(risk_text: str) -> tuple[str, int]:
+    lower = risk_text.lower()
+    if "emergency" in lower:
+        return "Emergency", 95
+    if "high" in lower:
+        return "High Risk", 82
+    if "moderate" in lower:
+        return "Moderate Risk", 65
+    if "low" in lower:
+        return "Low Risk", 35
+    return "Unclear", 50
+
+
+def extract_condition_cards(conditions_text: str) -> list[dict[str, str | int]]:
+    chunks = [chunk.strip() for chunk in re.split(r"\n\s*\n", conditions_text.strip()) if chunk.strip()]
+    cards = []
+    for chunk in chunks:
+        lines = [line.strip() for line in chunk.splitlines() if line.strip()]
+        if not lines:
+            continue
+        title = re.sub(r"^[-*]\s*", "", lines[0])
+        title = re.sub(r"^\d+[.)]\s*", "", title)
+        confidence = 50
+        joined = " ".join(lines)
+        if re.search(r"\bhigh\b", joined, re.IGNORECASE):
+            confidence = 82
+        elif re.search(r"\bmedium\b|\bmoderate\b", joined, re.IGNORECASE):
+            confidence = 60
+        elif re.search(r"\blow\b", joined, re.IGNORECASE):
+            confidence = 35
+        percent_match = re.search(r"(\d{1,3})\s*%", joined)
+        if percent_match:
+            confidence = max(0, min(100, int(percent_match.group(1))))
+
+        details = _clean_markdown_for_display("\n".join(lines[1:]))
+        cards.append(
+            {
+                "title": title,
+                "details": details,
+                "confidence": confidence,
+            }
+        )
+
+    if not cards and conditions_text.strip():
+        cards.append(
+            {
+                "title": "Differential Assessment",
+                "details": conditions_text.strip(),
+                "confidence": 50,
+            }
+        )
+    return cards[:5]
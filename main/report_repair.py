@@ -0,0 +1,86 @@
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from django.conf import settings
+
+from .ai_service import MANDATORY_DISCLAIMER, AssessmentOutcome, repair_sections
+from .report_parsing import SECTION_TITLES, extract_risk_label, section_heading, split_report_sections
+
+
+@dataclass
+class ReportValidation:
+    missing: list[str] = field(default_factory=list)
+    malformed: list[str] = field(default_factory=list)
+    disclaimer_missing: bool = False
+
+    @property
+    def sections(self) -> list[str]:
+        return [key for key in SECTION_TITLES if key in self.missing or key in self.malformed]
+
+    @property
+    def needs_repair(self) -> bool:
+        return bool(self.sections or self.disclaimer_missing)
+
+    @property
+    def is_clarification(self) -> bool:
+        # INSUFFICIENT_DATA_POLICY: the model asked questions instead of writing a report.
+        return len(self.missing) == len(SECTION_TITLES)
+
+
+def validate_report(text: str) -> ReportValidation:
+    _, bodies = split_report_sections(text)
+    validation = ReportValidation(disclaimer_missing=MANDATORY_DISCLAIMER not in text)
+    for key in SECTION_TITLES:
+        body = bodies.get(key, "").replace(MANDATORY_DISCLAIMER, "").strip()
+        if not body:
+            validation.missing.append(key)
+    risk = bodies.get("risk_stratification", "")
+    if "risk_stratification" not in validation.missing and extract_risk_label(risk)[0] == "Unclear":
+        validation.malformed.append("risk_stratification")
+    return validation
+
+
+def splice_sections(text: str, repair_text: str, keys: list[str]) -> str:
+    preamble, bodies = split_report_sections(text)
+    _, repaired = split_report_sections(repair_text)
+    for key in keys:
+        if repaired.get(key, "").strip():
+            bodies[key] = repaired[key]
+    parts = [preamble] if preamble else []
+    for key in SECTION_TITLES:
+        body = bodies.get(key, "").replace(MANDATORY_DISCLAIMER, "").strip()
+        if body:
+            parts.append(f"{section_heading(key)}\n{body}")
+    parts.append(MANDATORY_DISCLAIMER)
+    return "\n\n".join(parts)
+
+
+def repair_report(outcome: AssessmentOutcome, model: str | None = None, timeout: float | None = None) -> tuple[AssessmentOutcome, dict[str, Any]]:
+    if not settings.REPORT_SECTION_REPAIR or not outcome.ok:
+        return outcome, {}
+    validation = validate_report(outcome.text)
+    if validation.is_clarification or not validation.needs_repair:
+        return outcome, {}
+
+    text, response_id = outcome.text, outcome.response_id
+    info = {
+        "sections": validation.sections,
+        "disclaimer": validation.disclaimer_missing,
+        "input_tokens": 0,
+        "output_tokens": 0,
+    }
+    if validation.sections and outcome.response_id:
+        # Chained on the original response, so only the gap is generated.
+        repair = repair_sections(outcome.response_id, [section_heading(key) for key in validation.sections], model, timeout)
+        info["input_tokens"], info["output_tokens"] = repair.input_tokens, repair.output_tokens
+        if repair.ok:
+            text = splice_sections(text, repair.text, validation.sections)
+            response_id = repair.response_id or response_id
+    if MANDATORY_DISCLAIMER not in text:
+        text = f"{text.rstrip()}\n\n{MANDATORY_DISCLAIMER}"
+
+    info["complete"] = not validate_report(text).needs_repair
+    # What re-running the whole assessment would have cost, less what the repair cost.
+    full_tokens = outcome.input_tokens + outcome.output_tokens
+    info["saved_tokens"] = max(0, full_tokens - info["input_tokens"] - info["output_tokens"])
+    return replace(outcome, text=text, response_id=response_id), info
@@ -0,0 +1,171 @@
+import random
+import statistics
+import time
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from .ai_service import MANDATORY_DISCLAIMER, build_assessment_payload
+from .assessment_data import ASSESSMENT_QUESTIONS
+from .compression import clear_dictionary_cache, compress, decompress, train_dictionary
+from .fields import CompressedJSONField, StoredBlob
+from .models import AssessmentReport, CompressionDictionary
+
+DEFAULT_DICTIONARY_BYTES = {"zlib": 32 * 1024, "zstd": 64 * 1024}
+# Fewer real reports than this make a dictionary that mostly fits the few.
+MIN_DICTIONARY_SAMPLES = 100
+
+SAMPLE_CONDITIONS = [
+    "Viral upper respiratory infection",
+    "Seasonal allergic rhinitis",
+    "Tension-type headache",
+    "Gastroesophageal reflux",
+    "Iron deficiency anemia",
+    "Community-acquired pneumonia",
+    "Urinary tract infection",
+    "Generalized anxiety",
+]
+SAMPLE_SENTENCES = [
+    "Symptoms have been present for several days without clear progression.",
+    "Monitor temperature twice daily and record any new symptoms.",
+    "Seek urgent care if breathing becomes difficult or chest pain develops.",
+    "Maintain hydration and rest; avoid heavy exertion until symptoms settle.",
+    "A complete blood count and basic metabolic panel are reasonable first tests.",
+    "Do not start antibiotics without a clinician's assessment.",
+    "Reported sleep disruption may be contributing to fatigue.",
+]
+SAMPLE_DISCLAIMER = MANDATORY_DISCLAIMER
+
+
+def synthetic_report(rng: random.Random) -> tuple[dict[str, Any], str]:
+    answers = {f"q{idx}": rng.choice(["Yes", "No", "Sometimes", ""]) for idx in range(1, len(ASSESSMENT_QUESTIONS) + 1)}
+    payload = build_assessment_payload(
+        {
+            "age": rng.randint(18, 90),
+            "gender": rng.choice(["male", "female"]),
+            "symptom_duration": rng.choice(["1-3 days", "4-7 days", "1-4 weeks"]),
+            "additional_notes": " ".join(rng.sample(SAMPLE_SENTENCES, 2)),
+            **answers,
+        }
+    )
+    headings = [
+        "Clinical Summary",
+        "Most Likely Conditions (Ranked)",
+        "Risk Stratification",
+        "Recommended Diagnostic Tests",
+        "Recommended Next Steps (by urgency)",
+        "What to Monitor",
+        "Red Flags Requiring Immediate Escalation",
+        "General Supportive Advice",
+        "What NOT to Do",
+    ]
+    sections = []
+    for idx, heading in enumerate(headings, start=1):
+        if idx == 2:
+            body = "\n".join(
+                f"{rank}. {condition}\nConfidence: {rng.choice(['Low', 'Medium', 'High'])}\n"
+                f"Reasoning: {rng.choice(SAMPLE_SENTENCES)}"
+                for rank, condition in enumerate(rng.sample(SAMPLE_CONDITIONS, 3), start=1)
+            )
+        elif idx == 3:
+            body = f"{rng.choice(['Low Risk', 'Moderate Risk', 'High Risk'])}\n{rng.choice(SAMPLE_SENTENCES)}"
+        else:
+            body = "\n".join(f"- {sentence}" for sentence in rng.sample(SAMPLE_SENTENCES, rng.randint(3, 6)))
+        sections.append(f"## {idx}) {heading}\n{body}")
+    return payload, "\n\n".join(sections + [SAMPLE_DISCLAIMER])
+
+
+def report_samples(limit: int, synthetic: bool = False, seed: int = 7) -> list[tuple[dict[str, Any], str]]:
+    # Real rows only, possibly fewer than `limit`; generated reports only when asked for.
+    if synthetic:
+        rng = random.Random(seed)
+        return [synthetic_report(rng) for _ in range(limit)]
+    reports = AssessmentReport.objects.order_by("-pk").only("payload", "ai_report")[:limit]
+    return [(report.payload, report.ai_report) for report in reports]
+
+
+def _sample_bytes(samples) -> list[bytes]:
+    json_field = CompressedJSONField()
+    blobs = []
+    for payload, text in samples:
+        blobs.append(text.encode("utf-8"))
+        blobs.append(json_field.encode(payload))
+    return blobs
+
+
+def train_report_dictionary(codec: str, samples, size: int | None = None) -> CompressionDictionary:
+    data = train_dictionary(_sample_bytes(samples), codec, size or DEFAULT_DICTIONARY_BYTES[codec])
+    dictionary = CompressionDictionary.objects.create(codec=codec, data=data, sample_count=len(samples))
+    clear_dictionary_cache()
+    return dictionary
+
+
+def recompress_reports(batch_size: int = 200) -> int:
+    rewritten = 0
+    last_pk = 0
+    while True:
+        batch = list(AssessmentReport.objects.filter(pk__gt=last_pk).order_by("pk").only("pk", "payload", "ai_report")[:batch_size])
+        if not batch:
+            return rewritten
+        for report in batch:
+            # Reading decodes the stored blob, so the update re-encodes with the current settings.
+            report.payload = report.payload
+            report.ai_report = report.ai_report
+        AssessmentReport.objects.bulk_update(batch, ["payload", "ai_report"])
+        rewritten += len(batch)
+        last_pk = batch[-1].pk
+
+
+def benchmark_variant(codec: str, use_dictionary: bool, samples, reads: int = 50) -> dict[str, Any]:
+    user_model = get_user_model()
+    json_field = CompressedJSONField()
+    raw_blobs = _sample_bytes(samples)
+    raw_bytes = sum(len(blob) for blob in raw_blobs)
+    with transaction.atomic():
+        # The codec and dictionary go to compress() directly; the fields then
+        # store the bytes as given instead of re-encoding with the settings.
+        dictionary = train_report_dictionary(codec, samples) if use_dictionary else None
+        choice = (dictionary.pk, bytes(dictionary.data)) if dictionary else False
+        user = user_model.objects.create_user(username=f"compression-bench-{time.monotonic_ns()}")
+        insert_started = time.perf_counter()
+        reports = [
+            AssessmentReport(
+                user=user,
+                payload=StoredBlob(compress(json_field.encode(payload), codec=codec, dictionary=choice)),
+                ai_report=StoredBlob(compress(text.encode("utf-8"), codec=codec, dictionary=choice)),
+            )
+            for payload, text in samples
+        ]
+        AssessmentReport.objects.bulk_create(reports, batch_size=200)
+        insert_seconds = time.perf_counter() - insert_started
+        stored = [blob for report in reports for blob in (report.__dict__["ai_report"], report.__dict__["payload"])]
+
+        decode_started = time.perf_counter()
+        for blob in stored:
+            decompress(blob)
+        decode_us = (time.perf_counter() - decode_started) * 1_000_000 / len(samples)
+
+        read_timings = []
+        for _ in range(reads):
+            started = time.perf_counter()
+            for report in AssessmentReport.objects.filter(user=user)[:20]:
+                report.ai_report, report.payload
+            read_timings.append((time.perf_counter() - started) * 1000)
+        transaction.set_rollback(True)
+    clear_dictionary_cache()
+
+    stored_bytes = sum(len(blob) for blob in stored)
+    read_timings.sort()
+    return {
+        "variant": f"{codec}+dict" if use_dictionary else codec,
+        "dictionary_bytes": len(dictionary.data) if dictionary else 0,
+        "raw_bytes": raw_bytes,
+        "stored_bytes": stored_bytes,
+        "ratio": round(raw_bytes / stored_bytes, 2) if stored_bytes else 0.0,
+        "inserts_per_second": round(len(samples) / insert_seconds, 1) if insert_seconds else 0.0,
+        "decode_us_per_report": round(decode_us, 1),
+        "read_20_p50_ms": round(statistics.median(read_timings), 3),
+        "read_20_p95_ms": round(read_timings[int(len(read_timings) * 0.95) - 1], 3),
+    }
+
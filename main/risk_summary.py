@@ -0,0 +1,116 @@
+import heapq
+from datetime import timedelta
+from typing import Any
+
+from django.db import transaction
+
+from .models import ArchivedReport, AssessmentReport, UserRiskSummary
+from .report_parsing import extract_condition_cards, extract_risk_label, parse_assessment_sections
+
+RISK_LEVELS = ["Low Risk", "Moderate Risk", "High Risk", "Emergency", "Unclear"]
+MAX_TIMELINE_BUCKETS = 52
+MAX_TRACKED_CONDITIONS = 25
+DASHBOARD_CONDITIONS = 5
+
+
+def timeline_bucket(created_at) -> str:
+    day = created_at.date()
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+def report_risk_facts(report: AssessmentReport) -> dict[str, Any]:
+    sections = parse_assessment_sections(report.ai_report)
+    risk_label, risk_score = extract_risk_label(sections.get("risk_stratification", ""))
+    conditions = [
+        str(card["title"]).strip()[:80]
+        for card in extract_condition_cards(sections.get("most_likely_conditions", ""))
+        if str(card["title"]).strip()
+    ]
+    return {"risk_label": risk_label, "risk_score": risk_score, "conditions": conditions}
+
+
+def _apply_report(summary: UserRiskSummary, report: AssessmentReport) -> None:
+    facts = report_risk_facts(report)
+    label = facts["risk_label"]
+
+    summary.total_reports += 1
+    summary.risk_counts[label] = summary.risk_counts.get(label, 0) + 1
+
+    bucket = summary.timeline.setdefault(timeline_bucket(report.created_at), {})
+    bucket[label] = bucket.get(label, 0) + 1
+    for stale_key in sorted(summary.timeline)[:-MAX_TIMELINE_BUCKETS]:
+        del summary.timeline[stale_key]
+
+    for condition in facts["conditions"]:
+        summary.top_conditions[condition] = summary.top_conditions.get(condition, 0) + 1
+    if len(summary.top_conditions) > MAX_TRACKED_CONDITIONS:
+        kept = sorted(summary.top_conditions.items(), key=lambda item: (-item[1], item[0]))[:MAX_TRACKED_CONDITIONS]
+        summary.top_conditions = dict(kept)
+
+    if summary.latest_report_at is None or report.created_at >= summary.latest_report_at:
+        summary.latest_risk_label = label
+        summary.latest_risk_score = facts["risk_score"]
+        summary.latest_report_id = report.pk
+        summary.latest_report_at = report.created_at
+
+
+def record_report(report: AssessmentReport) -> None:
+    with transaction.atomic():
+        summary, _ = UserRiskSummary.objects.select_for_update().get_or_create(user_id=report.user_id)
+        _apply_report(summary, report)
+        summary.save()
+
+
+def rebuild_risk_summary(user_id: int) -> UserRiskSummary:
+    with transaction.atomic():
+        summary, _ = UserRiskSummary.objects.select_for_update().get_or_create(user_id=user_id)
+        summary.total_reports = 0
+        summary.risk_counts = {}
+        summary.timeline = {}
+        summary.top_conditions = {}
+        summary.latest_risk_label = ""
+        summary.latest_risk_score = 0
+        summary.latest_report_id = None
+        summary.latest_report_at = None
+        hot = AssessmentReport.objects.filter(user_id=user_id).order_by("created_at", "pk")
+        archived = ArchivedReport.objects.filter(user_id=user_id).order_by("created_at", "pk")
+        reports = heapq.merge(
+            archived.iterator(chunk_size=200),
+            hot.iterator(chunk_size=200),
+            key=lambda report: (report.created_at, report.pk),
+        )
+        for report in reports:
+            _apply_report(summary, report)
+        summary.save()
+    return summary
+
+
+def dashboard_context(summary: UserRiskSummary | None) -> dict[str, Any]:
+    if summary is None:
+        return {"summary": None, "risk_levels": RISK_LEVELS, "risk_rows": [], "timeline_rows": [], "condition_rows": []}
+
+    total = summary.total_reports or 1
+    risk_rows = [
+        {
+            "label": label,
+            "count": summary.risk_counts.get(label, 0),
+            "percent": round(summary.risk_counts.get(label, 0) * 100 / total),
+        }
+        for label in RISK_LEVELS
+    ]
+    timeline_rows = [
+        {
+            "week": week,
+            "total": sum(counts.values()),
+            "levels": [counts.get(label, 0) for label in RISK_LEVELS],
+        }
+        for week, counts in sorted(summary.timeline.items(), reverse=True)
+    ]
+    condition_rows = sorted(summary.top_conditions.items(), key=lambda item: (-item[1], item[0]))[:DASHBOARD_CONDITIONS]
+    return {
+        "summary": summary,
+        "risk_levels": RISK_LEVELS,
+        "risk_rows": risk_rows,
+        "timeline_rows": timeline_rows,
+        "condition_rows": [{"title": title, "count": count} for title, count in condition_rows],
+    }
@@ -0,0 +1,203 @@
+import re
+from typing import Any
+
+from django.db import connection
+from django.db.models import Q
+from django.urls import reverse
+
+from .models import ArchivedReport, AssessmentReport, Note, SearchDocument
+
+MAX_QUERY_TERMS = 8
+SNIPPET_RADIUS = 90
+
+KIND_URL_NAMES = {
+    SearchDocument.KIND_NOTE: "note_update",
+    SearchDocument.KIND_REPORT: "report_detail",
+}
+
+
+def note_document(note: Note) -> dict[str, str]:
+    return {"title": note.title, "body": note.content}
+
+
+def report_document(report: AssessmentReport) -> dict[str, str]:
+    payload = report.payload or {}
+    answers = [
+        item.get("answer", "")
+        for item in payload.get("question_answers", [])
+        if item.get("answer")
+    ]
+    parts = [report.ai_report, payload.get("additional_notes", ""), *answers]
+    return {
+        "title": f"Assessment report #{report.pk}",
+        "body": "\n".join(part for part in parts if part),
+    }
+
+
+def index_object(kind: str, obj: Any) -> None:
+    builder = note_document if kind == SearchDocument.KIND_NOTE else report_document
+    SearchDocument.objects.update_or_create(
+        kind=kind,
+        object_id=obj.pk,
+        defaults={"user_id": obj.user_id, **builder(obj)},
+    )
+
+
+def remove_object(kind: str, object_id: int) -> None:
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def query_terms(query: str) -> list[str]:
+    return re.findall(r"\w+", query.lower())[:MAX_QUERY_TERMS]
+
+
+def build_match_expression(terms: list[str], vendor: str) -> str:
+    if vendor == "postgresql":
+        return " & ".join(f"{term}:*" for term in terms)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def make_snippet(body: str, terms: list[str]) -> str:
+    lower = body.lower()
+    positions = [pos for pos in (lower.find(term) for term in terms) if pos >= 0]
+    start = max(0, min(positions) - SNIPPET_RADIUS) if positions else 0
+    end = min(len(body), start + SNIPPET_RADIUS * 2)
+    snippet = " ".join(body[start:end].split())
+    if start > 0:
+        snippet = "..." + snippet
+    if end < len(body):
+        snippet += "..."
+    return snippet
+
+
+class SearchResults:
+    def __init__(self, query: str, user_id: int | None = None, kind: str | None = None):
+        self.terms = query_terms(query)
+        self.user_id = user_id
+        self.kind = kind
+        self.vendor = connection.vendor
+        self._count: int | None = None
+
+    def _filters(self, alias: str) -> tuple[str, list[Any]]:
+        clauses = []
+        params: list[Any] = []
+        if self.user_id is not None:
+            clauses.append(f"{alias}.user_id = %s")
+            params.append(self.user_id)
+        if self.kind:
+            clauses.append(f"{alias}.kind = %s")
+            params.append(self.kind)
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+    def _fallback_queryset(self):
+        queryset = SearchDocument.objects.all()
+        if self.user_id is not None:
+            queryset = queryset.filter(user_id=self.user_id)
+        if self.kind:
+            queryset = queryset.filter(kind=self.kind)
+        for term in self.terms:
+            queryset = queryset.filter(Q(title__icontains=term) | Q(body__icontains=term))
+        return queryset.order_by("-updated_at")
+
+    def count(self) -> int:
+        if self._count is not None:
+            return self._count
+        if not self.terms:
+            self._count = 0
+        elif self.vendor == "sqlite":
+            extra, params = self._filters("d")
+            self._count = self._scalar(
+                "SELECT COUNT(*) FROM main_searchdocument_fts "
+                "JOIN main_searchdocument d ON d.id = main_searchdocument_fts.rowid "
+                f"WHERE main_searchdocument_fts MATCH %s{extra}",
+                [build_match_expression(self.terms, self.vendor), *params],
+            )
+        elif self.vendor == "postgresql":
+            extra, params = self._filters("d")
+            self._count = self._scalar(
+                "SELECT COUNT(*) FROM main_searchdocument d "
+                f"WHERE d.search_vector @@ to_tsquery('english', %s){extra}",
+                [build_match_expression(self.terms, self.vendor), *params],
+            )
+        else:
+            self._count = self._fallback_queryset().count()
+        return self._count
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        offset = key.start or 0
+        limit = (key.stop if key.stop is not None else self.count()) - offset
+        if limit <= 0 or not self.terms:
+            return []
+        return [self._hit(row) for row in self._fetch(offset, limit)]
+
+    def ranked_object_ids(self, limit: int) -> list[int]:
+        return [row[2] for row in self._fetch(0, limit)] if self.terms else []
+
+    def _fetch(self, offset: int, limit: int) -> list[tuple]:
+        if self.vendor == "sqlite":
+            extra, params = self._filters("d")
+            return self._rows(
+                "SELECT d.kind, d.title, d.object_id, d.body, "
+                "-bm25(main_searchdocument_fts, 5.0, 1.0) AS score "
+                "FROM main_searchdocument_fts "
+                "JOIN main_searchdocument d ON d.id = main_searchdocument_fts.rowid "
+                f"WHERE main_searchdocument_fts MATCH %s{extra} "
+                "ORDER BY score DESC, d.id DESC LIMIT %s OFFSET %s",
+                [build_match_expression(self.terms, self.vendor), *params, limit, offset],
+            )
+        if self.vendor == "postgresql":
+            extra, params = self._filters("d")
+            return self._rows(
+                "SELECT d.kind, d.title, d.object_id, d.body, "
+                "ts_rank_cd(d.search_vector, query) AS score "
+                "FROM main_searchdocument d, to_tsquery('english', %s) query "
+                f"WHERE d.search_vector @@ query{extra} "
+                "ORDER BY score DESC, d.id DESC LIMIT %s OFFSET %s",
+                [build_match_expression(self.terms, self.vendor), *params, limit, offset],
+            )
+        queryset = self._fallback_queryset()[offset:offset + limit]
+        return [(doc.kind, doc.title, doc.object_id, doc.body, 0.0) for doc in queryset]
+
+    def _hit(self, row: tuple) -> dict[str, Any]:
+        kind, title, object_id, body, rank = row
+        return {
+            "kind": kind,
+            "title": title,
+            "object_id": object_id,
+            "snippet": make_snippet(body, self.terms),
+            "rank": rank,
+            "url": reverse(KIND_URL_NAMES[kind], args=[object_id]),
+        }
+
+    @staticmethod
+    def _rows(sql: str, params: list[Any]) -> list[tuple]:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    @classmethod
+    def _scalar(cls, sql: str, params: list[Any]) -> int:
+        return cls._rows(sql, params)[0][0]
+
+
+def search_documents(query: str, user_id: int | None = None, kind: str | None = None) -> SearchResults:
+    return SearchResults(query, user_id=user_id, kind=kind)
+
+
+def rebuild_index(batch_size: int = 500) -> int:
+    indexed = 0
+    sources = (
+        (SearchDocument.KIND_NOTE, Note),
+        (SearchDocument.KIND_REPORT, AssessmentReport),
+        (SearchDocument.KIND_REPORT, ArchivedReport),
+    )
+    for kind, model in sources:
+        for obj in model.objects.order_by("pk").iterator(chunk_size=batch_size):
+            index_object(kind, obj)
+            indexed += 1
+    return indexed
@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .archive import is_archiving
+from .auth_backends import invalidate_cached_user
+from .models import ArchivedReport, AssessmentReport, Note, SearchDocument, UserRiskSummary
+from .risk_summary import rebuild_risk_summary, record_report
+from .search import index_object, remove_object
+from .similarity import index_report_signature, remove_report_signature
+
+
+@receiver(post_save, sender=Note)
+def index_note(sender, instance, **kwargs):
+    index_object(SearchDocument.KIND_NOTE, instance)
+
+
+@receiver(post_delete, sender=Note)
+def unindex_note(sender, instance, **kwargs):
+    remove_object(SearchDocument.KIND_NOTE, instance.pk)
+
+
+@receiver(post_save, sender=AssessmentReport)
+def index_report(sender, instance, **kwargs):
+    index_object(SearchDocument.KIND_REPORT, instance)
+
+
+# Archived reports stay indexed and counted, so deleting one cleans up the same way.
+@receiver(post_delete, sender=AssessmentReport)
+@receiver(post_delete, sender=ArchivedReport)
+def unindex_report(sender, instance, **kwargs):
+    if is_archiving():
+        return
+    remove_object(SearchDocument.KIND_REPORT, instance.pk)
+
+
+@receiver(post_save, sender=AssessmentReport)
+def update_report_signature(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or "payload" in update_fields:
+        index_report_signature(instance)
+
+
+@receiver(post_delete, sender=AssessmentReport)
+@receiver(post_delete, sender=ArchivedReport)
+def remove_report_signature_after_delete(sender, instance, **kwargs):
+    if is_archiving():
+        return
+    remove_report_signature(instance.pk)
+
+
+@receiver(post_save, sender=AssessmentReport)
+def update_risk_summary(sender, instance, created, **kwargs):
+    # Pending reports are recorded once their background assessment finishes.
+    if created and instance.status == AssessmentReport.STATUS_READY:
+        record_report(instance)
+
+
+@receiver(post_delete, sender=AssessmentReport)
+@receiver(post_delete, sender=ArchivedReport)
+def rebuild_risk_summary_after_delete(sender, instance, **kwargs):
+    if is_archiving():
+        return
+    user_id = instance.user_id
+
+    def rebuild():
+        if UserRiskSummary.objects.filter(user_id=user_id).exists():
+            rebuild_risk_summary(user_id)
+
+    transaction.on_commit(rebuild)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def drop_cached_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def drop_cached_user_on_logout(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_cached_user(user.pk)
@@ -0,0 +1,261 @@
+import hashlib
+import re
+import threading
+from typing import Any
+
+import numpy as np
+from django.db import transaction
+
+from .models import ArchivedReport, AssessmentReport, ReportSignature
+
+# MinHash over hashed payload features, split into LSH bands for lookup.
+# Changing any of these requires `manage.py rebuild_similarity_index`.
+SIGNATURE_SCHEME = "minhash64-v1"
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+MIN_SIMILARITY = 0.3
+# Rows appended since the last merge are scanned directly; past this many the
+# sorted band arrays are rebuilt.
+MERGE_THRESHOLD = 2048
+
+_MERSENNE_61 = np.uint64((1 << 61) - 1)
+_LOW_32 = np.uint64(0xFFFFFFFF)
+_BAND_MULTIPLIER = np.uint64(0x100000001B3)
+_rng = np.random.default_rng(20261019)
+# a < 2**31 and hashed features < 2**32 keep a * x + b inside uint64.
+PERM_A = _rng.integers(1, 1 << 31, NUM_PERM, dtype=np.uint64)
+PERM_B = _rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from had has have i in is it its my of on or so that the this to was "
+    "were with me im ive very some".split()
+)
+
+
+def _age_band(age) -> str:
+    try:
+        return f"age:{int(age) // 10 * 10}"
+    except (TypeError, ValueError):
+        return "age:unknown"
+
+
+def payload_features(payload: dict[str, Any]) -> set[str]:
+    features = {
+        _age_band(payload.get("age")),
+        f"gender:{payload.get('gender') or ''}",
+        f"duration:{payload.get('symptom_duration') or ''}",
+    }
+    texts = [("notes", str(payload.get("additional_notes") or ""))]
+    for idx, item in enumerate(payload.get("question_answers", []), start=1):
+        answer = str(item.get("answer") or "").strip()
+        if answer:
+            features.add(f"q{idx}")
+            texts.append((f"q{idx}", answer))
+    for prefix, text in texts:
+        tokens = [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+        features.update(f"{prefix}:{token}" for token in tokens)
+        # Unprefixed bigrams match the same wording given under a different question.
+        features.update(f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+    return features
+
+
+def minhash_signature(features: set[str]) -> np.ndarray:
+    if not features:
+        return np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint32)
+    hashed = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=4).digest(), "little") for feature in features),
+        dtype=np.uint64,
+        count=len(features),
+    )
+    permuted = (hashed[:, None] * PERM_A + PERM_B) % _MERSENNE_61
+    return (permuted & _LOW_32).min(axis=0).astype(np.uint32)
+
+
+def payload_signature(payload: dict[str, Any]) -> np.ndarray:
+    return minhash_signature(payload_features(payload))
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    bands = signatures.reshape(-1, BANDS, ROWS_PER_BAND).astype(np.uint64)
+    keys = np.zeros(bands.shape[:2], dtype=np.uint64)
+    for row in range(ROWS_PER_BAND):
+        keys = (keys * _BAND_MULTIPLIER) ^ bands[:, :, row]
+    return keys
+
+
+class SimilarityIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        self.report_ids = np.empty(0, dtype=np.int64)
+        self.user_ids = np.empty(0, dtype=np.int64)
+        self.signatures = np.empty((0, NUM_PERM), dtype=np.uint32)
+        self.keys = np.empty((0, BANDS), dtype=np.uint64)
+        self.alive = np.empty(0, dtype=bool)
+        self.rows: dict[int, int] = {}
+        self.sorted_rows = 0
+        self.band_order: list[np.ndarray] = []
+        self.band_sorted: list[np.ndarray] = []
+        self.last_pk = 0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add(self, report_ids, user_ids, signatures: np.ndarray) -> None:
+        report_ids = np.asarray(report_ids, dtype=np.int64)
+        start = len(self.report_ids)
+        for offset, report_id in enumerate(report_ids.tolist()):
+            previous = self.rows.get(report_id)
+            if previous is not None:
+                self.alive[previous] = False
+            self.rows[report_id] = start + offset
+        self.report_ids = np.concatenate([self.report_ids, report_ids])
+        self.user_ids = np.concatenate([self.user_ids, np.asarray(user_ids, dtype=np.int64)])
+        self.signatures = np.concatenate([self.signatures, signatures.astype(np.uint32)])
+        self.keys = np.concatenate([self.keys, band_keys(signatures)])
+        self.alive = np.concatenate([self.alive, np.ones(len(report_ids), dtype=bool)])
+        if len(self.report_ids) - self.sorted_rows > MERGE_THRESHOLD:
+            self.merge()
+
+    def merge(self) -> None:
+        if not self.alive.all():
+            keep = np.flatnonzero(self.alive)
+            self.report_ids = self.report_ids[keep]
+            self.user_ids = self.user_ids[keep]
+            self.signatures = self.signatures[keep]
+            self.keys = self.keys[keep]
+            self.alive = self.alive[keep]
+            self.rows = {report_id: row for row, report_id in enumerate(self.report_ids.tolist())}
+        self.band_order = [np.argsort(self.keys[:, band], kind="stable") for band in range(BANDS)]
+        self.band_sorted = [self.keys[order, band] for band, order in enumerate(self.band_order)]
+        self.sorted_rows = len(self.report_ids)
+
+    def refresh(self) -> None:
+        # Other processes write signatures too; pick up anything newer than the last row seen.
+        rows = list(
+            ReportSignature.objects.filter(pk__gt=self.last_pk, scheme=SIGNATURE_SCHEME)
+            .order_by("pk")
+            .values_list("pk", "report_id", "user_id", "signature")
+        )
+        if not rows:
+            return
+        self.add(
+            [row[1] for row in rows],
+            [row[2] for row in rows],
+            np.frombuffer(b"".join(bytes(row[3]) for row in rows), dtype=np.uint32).reshape(-1, NUM_PERM),
+        )
+        self.last_pk = rows[-1][0]
+
+    def candidates(self, signature: np.ndarray) -> np.ndarray:
+        query_keys = band_keys(signature.reshape(1, -1))[0]
+        found = []
+        for band, (order, sorted_keys) in enumerate(zip(self.band_order, self.band_sorted)):
+            left = np.searchsorted(sorted_keys, query_keys[band], side="left")
+            right = np.searchsorted(sorted_keys, query_keys[band], side="right")
+            if right > left:
+                found.append(order[left:right])
+        tail = self.keys[self.sorted_rows:]
+        if len(tail):
+            found.append(self.sorted_rows + np.flatnonzero((tail == query_keys).any(axis=1)))
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+    def query(
+        self,
+        signature: np.ndarray,
+        k: int = 5,
+        user_id: int | None = None,
+        exclude_report_id: int | None = None,
+        min_similarity: float = MIN_SIMILARITY,
+        exhaustive: bool = False,
+    ) -> list[tuple[int, float]]:
+        rows = np.arange(len(self.report_ids)) if exhaustive else self.candidates(signature)
+        rows = rows[self.alive[rows]]
+        if user_id is not None:
+            rows = rows[self.user_ids[rows] == user_id]
+        if exclude_report_id is not None:
+            rows = rows[self.report_ids[rows] != exclude_report_id]
+        if not len(rows):
+            return []
+        scores = (self.signatures[rows] == signature).mean(axis=1)
+        keep = scores >= min_similarity
+        rows, scores = rows[keep], scores[keep]
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [(int(self.report_ids[rows[idx]]), float(scores[idx])) for idx in top]
+
+
+_index = SimilarityIndex()
+
+
+def shared_index() -> SimilarityIndex:
+    return _index
+
+
+def index_report_signature(report) -> ReportSignature:
+    signature = payload_signature(report.payload)
+    # Replace rather than update so the new row gets a higher pk and every
+    # process's incremental refresh sees it.
+    with transaction.atomic():
+        ReportSignature.objects.filter(report_id=report.pk).delete()
+        return ReportSignature.objects.create(
+            report_id=report.pk,
+            user_id=report.user_id,
+            scheme=SIGNATURE_SCHEME,
+            signature=signature.tobytes(),
+        )
+
+
+def remove_report_signature(report_id: int) -> None:
+    ReportSignature.objects.filter(report_id=report_id).delete()
+
+
+def similar_report_ids(report, k: int = 5, user_id: int | None = None) -> list[tuple[int, float]]:
+    stored = ReportSignature.objects.filter(report_id=report.pk, scheme=SIGNATURE_SCHEME).values_list("signature", flat=True).first()
+    signature = np.frombuffer(bytes(stored), dtype=np.uint32) if stored else payload_signature(report.payload)
+    index = shared_index()
+    with index.lock:
+        index.refresh()
+        # Ask for extra rows: reports deleted by another process may still be in memory.
+        return index.query(signature, k=k * 2, user_id=user_id, exclude_report_id=report.pk)
+
+
+def similar_cases(report, user, k: int = 5) -> list[dict[str, Any]]:
+    matches = similar_report_ids(report, k=k, user_id=user.pk)
+    if not matches:
+        return []
+    ids = [report_id for report_id, _ in matches]
+    created = dict(AssessmentReport.objects.filter(pk__in=ids, user=user).values_list("pk", "created_at"))
+    created.update(ArchivedReport.objects.filter(pk__in=ids, user=user).values_list("pk", "created_at"))
+    return [
+        {"id": report_id, "created_at": created[report_id], "similarity": round(score * 100)}
+        for report_id, score in matches
+        if report_id in created
+    ][:k]
+
+
+def rebuild_signatures(batch_size: int = 500) -> int:
+    ReportSignature.objects.all().delete()
+    indexed = 0
+    for model in (AssessmentReport, ArchivedReport):
+        batch = []
+        for report in model.objects.order_by("pk").only("pk", "user_id", "payload").iterator(chunk_size=batch_size):
+            batch.append(
+                ReportSignature(
+                    report_id=report.pk,
+                    user_id=report.user_id,
+                    scheme=SIGNATURE_SCHEME,
+                    signature=payload_signature(report.payload).tobytes(),
+                )
+            )
+            if len(batch) >= batch_size:
+                ReportSignature.objects.bulk_create(batch)
+                indexed += len(batch)
+                batch = []
+        ReportSignature.objects.bulk_create(batch)
+        indexed += len(batch)
+    with _index.lock:
+        _index.clear()
+    return indexed
@@ -0,0 +1,114 @@
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import OperationalError, connections, transaction
+
+from .models import AssessmentReport
+
+STRESS_ALIAS = "sqlite_stress"
+SAMPLE_REPORT = "## 3) Risk Stratification\nModerate Risk\n" + "Clinical reasoning text. " * 200
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _register_database(path: Path, profile: str) -> None:
+    options = dict(settings.SQLITE_TUNED_OPTIONS) if profile == "tuned" else {}
+    raw = {"ENGINE": "django.db.backends.sqlite3", "NAME": str(path), "OPTIONS": options}
+    configured = connections.configure_settings({"default": connections.settings["default"], STRESS_ALIAS: raw})
+    connections.settings[STRESS_ALIAS] = configured[STRESS_ALIAS]
+
+
+def _unregister_database() -> None:
+    connections[STRESS_ALIAS].close()
+    connections.settings.pop(STRESS_ALIAS, None)
+    if hasattr(connections._connections, STRESS_ALIAS):
+        delattr(connections._connections, STRESS_ALIAS)
+
+
+def run_sqlite_stress(profile: str = "tuned", writers: int = 4, readers: int = 4, seconds: float = 5.0) -> dict[str, Any]:
+    workdir = Path(tempfile.mkdtemp(prefix="sqlite-stress-"))
+    _register_database(workdir / "stress.sqlite3", profile)
+    try:
+        call_command("migrate", database=STRESS_ALIAS, verbosity=0)
+        user = get_user_model().objects.db_manager(STRESS_ALIAS).create_user(username="sqlite-stress")
+
+        deadline = time.perf_counter() + seconds
+        lock = threading.Lock()
+        results = {"writes": 0, "write_errors": 0, "read_latencies_ms": [], "write_latencies_ms": []}
+
+        def writer():
+            try:
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        # Read-then-write, like the report save path that also
+                        # updates per-user aggregates in the same transaction.
+                        with transaction.atomic(using=STRESS_ALIAS):
+                            AssessmentReport.objects.using(STRESS_ALIAS).filter(user_id=user.pk).exists()
+                            AssessmentReport.objects.using(STRESS_ALIAS).bulk_create(
+                                [AssessmentReport(user_id=user.pk, payload={"age": 40}, ai_report=SAMPLE_REPORT)]
+                            )
+                    except OperationalError:
+                        with lock:
+                            results["write_errors"] += 1
+                        continue
+                    elapsed = (time.perf_counter() - started) * 1000
+                    with lock:
+                        results["writes"] += 1
+                        results["write_latencies_ms"].append(elapsed)
+            finally:
+                connections[STRESS_ALIAS].close()
+
+        def reader():
+            try:
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        list(AssessmentReport.objects.using(STRESS_ALIAS).filter(user_id=user.pk)[:20])
+                    except OperationalError:
+                        continue
+                    elapsed = (time.perf_counter() - started) * 1000
+                    with lock:
+                        results["read_latencies_ms"].append(elapsed)
+            finally:
+                connections[STRESS_ALIAS].close()
+
+        threads = [threading.Thread(target=writer) for _ in range(writers)]
+        threads += [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        reads = results["read_latencies_ms"]
+        writes = results["write_latencies_ms"]
+        return {
+            "profile": profile,
+            "writers": writers,
+            "readers": readers,
+            "seconds": seconds,
+            "writes": results["writes"],
+            "write_errors": results["write_errors"],
+            "writes_per_second": round(results["writes"] / seconds, 1),
+            "write_p95_ms": round(_percentile(writes, 0.95), 2),
+            "reads": len(reads),
+            "read_p50_ms": round(statistics.median(reads), 2) if reads else 0.0,
+            "read_p95_ms": round(_percentile(reads, 0.95), 2),
+            "read_max_ms": round(max(reads), 2) if reads else 0.0,
+        }
+    finally:
+        _unregister_database()
+        shutil.rmtree(workdir, ignore_errors=True)
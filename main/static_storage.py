@@ -0,0 +1,53 @@
+import gzip
+from pathlib import Path
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".mjs", ".json", ".map", ".svg", ".txt", ".html", ".xml", ".ico"}
+MIN_COMPRESS_SIZE = 256
+
+
+def precompress_file(path: Path) -> list[Path]:
+    data = path.read_bytes()
+    if path.suffix.lower() not in COMPRESSIBLE_EXTENSIONS or len(data) < MIN_COMPRESS_SIZE:
+        return []
+    written = []
+    encoders = [(".gz", lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        encoders.append((".br", lambda raw: brotli.compress(raw, quality=11)))
+    for suffix, encode in encoders:
+        compressed = encode(data)
+        if len(compressed) < len(data):
+            target = path.with_name(path.name + suffix)
+            target.write_bytes(compressed)
+            written.append(target)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # Templates keep rendering if a referenced asset is missing from the manifest
+    # (or was never collected): the unhashed URL is used instead of raising.
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            if self.manifest_strict:
+                raise
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+        if not dry_run:
+            for hashed_name in sorted(hashed_names):
+                precompress_file(Path(self.path(hashed_name)))
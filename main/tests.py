@@ -1,8 +1,69 @@
+import gzip
+import json
+import marshal
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
+
+from config.static_serving import IMMUTABLE_CACHE_CONTROL, PrecompressedStaticFiles, choose_encoding
 
-from .models import Note
+from .admin import NoteAdmin
+from .ai_service import AssessmentOutcome, build_assessment_payload
+from .archive import archive_reports
+from .auth_backends import user_cache_key
+from .background_assessment import can_resume_assessment, finish_pending_assessment, resume_pending_assessment
+from .checks import check_shared_auth_cache
+from .db_routing import probe_replicas, record_heartbeat, sync_sqlite_replica
+from .db_stats import connection_stats
+from .sqlite_stress import run_sqlite_stress
+from .static_storage import precompress_file
+from .drafts import purge_expired_drafts
+from .assessment_data import ASSESSMENT_QUESTIONS, ASSESSMENT_SECTIONS
+from .forms import ClinicalAssessmentForm, assessment_section_form
+from .analytics import analytics_overview, prune_analytics, record_assessment_event, repair_summary, tier_latency_summary
+from .compression import TAG_RAW, TAG_ZLIB, TAG_ZLIB_DICT, clear_dictionary_cache
+from .fields import StoredBlob
+from .model_routing import route_assessment
+from .models import (
+    ArchivedReport,
+    AssessmentDraft,
+    AssessmentEvent,
+    AssessmentReport,
+    AssessmentRollup,
+    CompressionDictionary,
+    Note,
+    ReplicaHeartbeat,
+    ReportSignature,
+    RequestProfile,
+    SearchDocument,
+    UserRiskSummary,
+)
+from . import urls as main_urls
+from . import views
+from .profiling import PROFILE_ID_HEADER, profiling_token
+from .query_budget import QueryBudget, QueryBudgetError, QueryRecorder, url_budget_problems
+from .red_flags import load_corpus, screen_payload
+from .report_parsing import SECTION_TITLES, parse_assessment_sections, section_heading
+from .report_repair import repair_report, validate_report
+from .report_storage import SAMPLE_DISCLAIMER, recompress_reports, report_samples, synthetic_report, train_report_dictionary
+from .risk_summary import rebuild_risk_summary
+from .search import search_documents
+from .similarity import shared_index, similar_cases
 
 
 class NoteIsolationTests(TestCase):
@@ -40,3 +101,1084 @@ class NoteIsolationTests(TestCase):
         self.assertEqual(response.status_code, 302)
         created = Note.objects.get(title="new")
         self.assertEqual(created.user_id, self.user1.id)
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.user1 = user_model.objects.create_user(username="user1", password="pass12345")
+        self.user2 = user_model.objects.create_user(username="user2", password="pass12345")
+
+    def test_index_follows_save_and_delete(self):
+        note = Note.objects.create(user=self.user1, title="Migraine log", content="throbbing headache at night")
+        self.assertEqual(search_documents("headache", user_id=self.user1.id).count(), 1)
+
+        note.content = "persistent cough"
+        note.save()
+        self.assertEqual(search_documents("headache", user_id=self.user1.id).count(), 0)
+        self.assertEqual(search_documents("cough", user_id=self.user1.id).count(), 1)
+
+        note.delete()
+        self.assertFalse(SearchDocument.objects.exists())
+
+    def test_results_are_ranked_and_scoped_to_user(self):
+        Note.objects.create(user=self.user1, title="Fever", content="fever fever fever and chills")
+        AssessmentReport.objects.create(
+            user=self.user1,
+            payload={"question_answers": [{"question": "Fever?", "answer": "mild fever"}]},
+            ai_report="## 3) Risk Stratification\nLow Risk",
+        )
+        Note.objects.create(user=self.user2, title="Other", content="fever")
+
+        hits = search_documents("fever", user_id=self.user1.id)[0:10]
+
+        self.assertEqual(len(hits), 2)
+        self.assertEqual(hits[0]["kind"], SearchDocument.KIND_NOTE)
+        self.assertGreaterEqual(hits[0]["rank"], hits[1]["rank"])
+
+    def test_search_view_paginates(self):
+        for idx in range(25):
+            Note.objects.create(user=self.user1, title=f"Rash {idx}", content="itchy rash")
+
+        self.client.login(username="user1", password="pass12345")
+        response = self.client.get(reverse("search"), {"q": "rash", "page": 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["page_obj"].paginator.count, 25)
+        self.assertEqual(len(response.context["page_obj"].object_list), 5)
+
+    def test_admin_search_warns_when_matches_are_capped(self):
+        for idx in range(3):
+            Note.objects.create(user=self.user1, title=f"Rash {idx}", content="itchy rash")
+        admin_user = get_user_model().objects.create_superuser(username="admin", password="pass12345")
+        self.client.force_login(admin_user)
+        url = reverse("admin:main_note_changelist")
+
+        with mock.patch.object(NoteAdmin, "indexed_search_limit", 2):
+            capped = self.client.get(url, {"q": "rash"})
+        with mock.patch.object(NoteAdmin, "indexed_search_limit", 3):
+            complete = self.client.get(url, {"q": "rash"})
+
+        self.assertEqual(capped.context["cl"].result_count, 2)
+        self.assertContains(capped, "Only the 2 best full-text matches are shown")
+        self.assertEqual(complete.context["cl"].result_count, 3)
+        self.assertNotContains(complete, "best full-text matches")
+
+
+def _sample_report(risk: str = "Moderate Risk", condition: str = "Viral infection") -> str:
+    return (
+        "## 1) Clinical Summary\nSummary.\n\n"
+        f"## 2) Most Likely Conditions (Ranked)\n1. {condition}\nConfidence: Medium\n\n"
+        f"## 3) Risk Stratification\n{risk}\n"
+    )
+
+
+class RiskSummaryTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="user1", password="pass12345")
+
+    def test_summary_is_updated_incrementally_on_save(self):
+        AssessmentReport.objects.create(user=self.user, payload={}, ai_report=_sample_report("Low Risk"))
+        AssessmentReport.objects.create(user=self.user, payload={}, ai_report=_sample_report("Emergency", "Stroke"))
+
+        summary = UserRiskSummary.objects.get(user=self.user)
+        self.assertEqual(summary.total_reports, 2)
+        self.assertEqual(summary.risk_counts, {"Low Risk": 1, "Emergency": 1})
+        self.assertEqual(summary.latest_risk_label, "Emergency")
+        self.assertEqual(summary.top_conditions, {"Viral infection": 1, "Stroke": 1})
+        self.assertEqual(sum(sum(bucket.values()) for bucket in summary.timeline.values()), 2)
+
+    def test_rebuild_matches_incremental_state(self):
+        for risk in ("Low Risk", "High Risk", "High Risk"):
+            AssessmentReport.objects.create(user=self.user, payload={}, ai_report=_sample_report(risk))
+        incremental = UserRiskSummary.objects.get(user=self.user)
+
+        rebuilt = rebuild_risk_summary(self.user.id)
+
+        self.assertEqual(rebuilt.risk_counts, incremental.risk_counts)
+        self.assertEqual(rebuilt.timeline, incremental.timeline)
+        self.assertEqual(rebuilt.latest_report_id, incremental.latest_report_id)
+
+    def test_dashboard_query_count_does_not_grow_with_history(self):
+        for _ in range(15):
+            AssessmentReport.objects.create(user=self.user, payload={}, ai_report=_sample_report())
+
+        self.client.login(username="user1", password="pass12345")
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("risk_dashboard"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["summary"].total_reports, 15)
+
+
+def _assessment_post_data(**overrides) -> dict[str, str]:
+    data = {"age": "34", "gender": "female", "symptom_duration": "1-3d", "additional_notes": ""}
+    data.update(overrides)
+    return data
+
+
+class AssessmentAnalyticsTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="user1", password="pass12345")
+
+    def test_event_updates_minute_hour_and_day_rollups(self):
+        record_assessment_event(AssessmentOutcome("ok", "gpt-test", "ok", 1200, 900, 400), self.user.id, None, "Low Risk")
+        record_assessment_event(AssessmentOutcome("boom", "gpt-test", "error", 300), self.user.id)
+
+        self.assertEqual(AssessmentRollup.objects.count(), 3)
+        for rollup in AssessmentRollup.objects.all():
+            self.assertEqual((rollup.total, rollup.errors), (2, 1))
+            self.assertEqual(rollup.risk_counts, {"Low Risk": 1})
+            self.assertEqual(rollup.input_tokens, 900)
+
+        with self.assertNumQueries(1):
+            windows = analytics_overview()
+        self.assertEqual([window["total"] for window in windows], [2, 2, 2])
+        self.assertEqual(windows[0]["error_rate"], 50.0)
+        self.assertEqual(windows[0]["latency_p95_ms"], 2000)
+
+    @override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_RAISE=True)
+    def test_rollup_admin_page_has_no_repeated_queries(self):
+        record_assessment_event(AssessmentOutcome("ok", "gpt-test", "ok", 1200), self.user.id, None, "Low Risk")
+        admin = get_user_model().objects.create_superuser(username="admin", password="pass12345")
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse("admin:main_assessmentrollup_changelist"))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_prune_deletes_expired_events_in_batches(self):
+        old = timezone.now() - timedelta(days=120)
+        for _ in range(5):
+            AssessmentEvent.objects.create(created_at=old, model="gpt-test", status="ok")
+        AssessmentRollup.objects.create(granularity=AssessmentRollup.GRANULARITY_HOUR, bucket_start=old)
+        AssessmentRollup.objects.create(granularity=AssessmentRollup.GRANULARITY_DAY, bucket_start=old)
+        record_assessment_event(AssessmentOutcome("ok", "gpt-test"))
+
+        deleted = prune_analytics(batch_size=2)
+
+        self.assertEqual(deleted["events"], 5)
+        self.assertEqual(deleted["hour_rollups"], 1)
+        self.assertEqual(AssessmentEvent.objects.count(), 1)
+        self.assertTrue(AssessmentRollup.objects.filter(granularity=AssessmentRollup.GRANULARITY_DAY, bucket_start=old).exists())
+
+    def test_failed_assessment_is_recorded_as_error_event(self):
+        self.client.login(username="user1", password="pass12345")
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": ""}):
+            response = self.client.post(reverse("assessment_test"), _assessment_post_data())
+
+        self.assertEqual(response.status_code, 200)
+        event = AssessmentEvent.objects.get()
+        self.assertEqual(event.status, "error")
+        self.assertEqual(event.report_id, response.context["assessment"].pk)
+
+    def test_admin_dashboard_renders_rollups(self):
+        admin_user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pass12345")
+        record_assessment_event(AssessmentOutcome("ok", "gpt-test", "ok", 800), self.user.id, None, "High Risk")
+
+        self.client.force_login(admin_user)
+        response = self.client.get(reverse("admin:main_assessmentrollup_changelist"))
+
+        self.assertContains(response, "Assessment analytics")
+        self.assertContains(response, "High Risk: 1")
+
+
+class ClinicalAssessmentFormTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="user1", password="pass12345")
+        self.client.login(username="user1", password="pass12345")
+
+    def test_question_fields_are_declared_once_on_the_class(self):
+        self.assertIn("q45", ClinicalAssessmentForm.base_fields)
+        form = ClinicalAssessmentForm()
+        self.assertEqual(len(form.fields), len(ASSESSMENT_QUESTIONS) + 4)
+        self.assertIsNot(form.fields["q1"], ClinicalAssessmentForm.base_fields["q1"])
+        self.assertIs(assessment_section_form(0), assessment_section_form(0))
+
+    def test_paged_mode_renders_one_section_per_step(self):
+        response = self.client.get(reverse("assessment_step", args=[1]))
+
+        self.assertEqual(list(response.context["form"].fields), [f"q{n}" for n in ASSESSMENT_SECTIONS[0][1]])
+
+    @override_settings(ASSESSMENT_FORM_MODE="paged")
+    def test_paged_mode_redirects_single_page_form(self):
+        response = self.client.get(reverse("assessment_test"))
+
+        self.assertRedirects(response, reverse("assessment_step", args=[0]))
+
+    def test_paged_answers_are_kept_server_side_and_submitted(self):
+        self.client.post(reverse("assessment_step", args=[0]), _assessment_post_data(age="50"))
+        self.client.post(reverse("assessment_step", args=[1]), {"q1": "Headache"})
+        response = self.client.get(reverse("assessment_step", args=[1]))
+        self.assertEqual(response.context["form"].initial["q1"], "Headache")
+
+        last_step = len(ASSESSMENT_SECTIONS)
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": ""}):
+            response = self.client.post(reverse("assessment_step", args=[last_step]), {})
+
+        self.assertTemplateUsed(response, "main/assessment_result.html")
+        payload = AssessmentReport.objects.get().payload
+        self.assertEqual(payload["age"], 50)
+        self.assertEqual(payload["question_answers"][0]["answer"], "Headache")
+
+
+class AssessmentDraftTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="user1", password="pass12345")
+        self.client.login(username="user1", password="pass12345")
+
+    def test_delta_updates_store_only_non_empty_answers(self):
+        url = reverse("assessment_draft")
+        self.client.post(url, {"field": "q1", "value": "Cough for a week"})
+        self.client.post(url, {"field": "q2", "value": "Monday"})
+        response = self.client.post(url, {"field": "q2", "value": ""})
+
+        self.assertEqual(response.json()["version"], 3)
+        self.assertEqual(AssessmentDraft.objects.get(user=self.user).answers, {"q1": "Cough for a week"})
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.post(reverse("assessment_draft"), {"field": "is_staff", "value": "1"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(AssessmentDraft.objects.exists())
+
+    def test_draft_is_restored_and_merged_at_submit(self):
+        url = reverse("assessment_draft")
+        self.client.post(url, {"field": "q3", "value": "Getting worse"})
+        response = self.client.get(reverse("assessment_test"))
+        self.assertTrue(response.context["draft_restored"])
+        self.assertEqual(response.context["form"].initial["q3"], "Getting worse")
+
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": ""}):
+            self.client.post(reverse("assessment_test"), _assessment_post_data())
+
+        payload = AssessmentReport.objects.get().payload
+        self.assertEqual(payload["question_answers"][2]["answer"], "Getting worse")
+        self.assertFalse(AssessmentDraft.objects.exists())
+
+    def test_expired_drafts_are_ignored_and_purged(self):
+        AssessmentDraft.objects.create(
+            user=self.user,
+            answers={"q1": "stale"},
+            expires_at=timezone.now() - timedelta(hours=1),
+        )
+
+        response = self.client.get(reverse("assessment_test"))
+        self.assertFalse(response.context["draft_restored"])
+        self.assertEqual(purge_expired_drafts(batch_size=1), 1)
+
+
+class DatabaseConnectionStatsTests(TestCase):
+    def test_stats_report_mode_without_pool_on_sqlite(self):
+        stats = connection_stats()
+
+        self.assertEqual(stats["vendor"], "sqlite")
+        self.assertIsNone(stats["pool"])
+
+
+class SqliteTunedProfileTests(unittest.TestCase):
+    # Runs against its own scratch SQLite file, outside the test database.
+    def test_tuned_profile_absorbs_concurrent_read_then_write_transactions(self):
+        result = run_sqlite_stress("tuned", writers=3, readers=2, seconds=0.5)
+
+        self.assertGreater(result["writes"], 0)
+        self.assertGreater(result["reads"], 0)
+        self.assertEqual(result["write_errors"], 0)
+
+
+FAST_AUTH_SETTINGS = {
+    "SESSION_ENGINE": "django.contrib.sessions.backends.cache",
+    "AUTHENTICATION_BACKENDS": ["main.auth_backends.CachedModelBackend"],
+    "AUTH_USER_CACHE_TIMEOUT": 300,
+}
+
+
+class SessionAuthFastPathTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="user1", password="pass12345")
+
+    def test_default_backend_costs_session_and_user_queries(self):
+        self.client.login(username="user1", password="pass12345")
+
+        with self.assertNumQueries(3):
+            self.client.get(reverse("note_list"))
+
+    @override_settings(**FAST_AUTH_SETTINGS)
+    def test_cached_session_and_user_skip_both_queries(self):
+        self.client.login(username="user1", password="pass12345")
+        self.client.get(reverse("note_list"))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("note_list"))
+
+        self.assertEqual(response.context["user"], self.user)
+
+    @override_settings(**FAST_AUTH_SETTINGS)
+    def test_profile_edit_refreshes_cached_user(self):
+        self.client.login(username="user1", password="pass12345")
+        self.client.get(reverse("profile"))
+        self.client.post(reverse("profile"), {"action": "profile", "username": "renamed", "email": ""})
+
+        response = self.client.get(reverse("profile"))
+
+        self.assertEqual(response.context["user"].username, "renamed")
+
+    @override_settings(**FAST_AUTH_SETTINGS)
+    def test_password_change_logs_out_other_sessions(self):
+        other_client = self.client_class()
+        other_client.login(username="user1", password="pass12345")
+        self.client.login(username="user1", password="pass12345")
+        other_client.get(reverse("note_list"))
+
+        self.client.post(
+            reverse("profile"),
+            {"action": "password", "old_password": "pass12345", "new_password1": "N3w-pass-987", "new_password2": "N3w-pass-987"},
+        )
+
+        self.assertEqual(self.client.get(reverse("note_list")).status_code, 200)
+        self.assertEqual(other_client.get(reverse("note_list")).status_code, 302)
+
+    @override_settings(**FAST_AUTH_SETTINGS)
+    def test_logout_drops_cached_user(self):
+        self.client.login(username="user1", password="pass12345")
+        self.client.get(reverse("note_list"))
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+
+        self.client.post(reverse("logout"))
+
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+    def test_process_local_cache_is_refused_for_cached_auth(self):
+        local = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        shared = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "cache_table"}}
+
+        with override_settings(CACHES=local):
+            self.assertEqual(check_shared_auth_cache(None), [])
+            with override_settings(**FAST_AUTH_SETTINGS):
+                self.assertEqual([error.id for error in check_shared_auth_cache(None)], ["main.E001"])
+        with override_settings(CACHES=shared, **FAST_AUTH_SETTINGS):
+            self.assertEqual(check_shared_auth_cache(None), [])
+
+
+class PrecompressedStaticFilesTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.asset = self.root / "css" / "site.0123456789ab.css"
+        self.asset.parent.mkdir()
+        self.asset.write_text("body { color: #0f1f4d; }\n" * 50)
+        self.fallback_calls = []
+        self.app = PrecompressedStaticFiles(self.fallback, self.root, "static/")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def fallback(self, environ, start_response):
+        self.fallback_calls.append(environ["PATH_INFO"])
+        start_response("404 Not Found", [])
+        return [b""]
+
+    def request(self, path, accept_encoding=""):
+        captured = {}
+
+        def start_response(status, headers):
+            captured["status"] = status
+            captured["headers"] = dict(headers)
+
+        environ = {"REQUEST_METHOD": "GET", "PATH_INFO": path, "HTTP_ACCEPT_ENCODING": accept_encoding}
+        body = b"".join(self.app(environ, start_response))
+        return captured, body
+
+    def test_precompressed_variant_is_served_with_immutable_headers(self):
+        written = precompress_file(self.asset)
+        self.assertIn(self.asset.with_name(self.asset.name + ".gz"), written)
+
+        response, body = self.request("/static/css/site.0123456789ab.css", "gzip, deflate")
+
+        self.assertEqual(response["headers"]["Content-Encoding"], "gzip")
+        self.assertEqual(response["headers"]["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(gzip.decompress(body), self.asset.read_bytes())
+
+    def test_encodings_refused_with_q_zero_are_not_served(self):
+        precompress_file(self.asset)
+
+        response, body = self.request("/static/css/site.0123456789ab.css", "gzip;q=0, br;q=0")
+
+        self.assertNotIn("Content-Encoding", response["headers"])
+        self.assertEqual(body, self.asset.read_bytes())
+        self.assertEqual(choose_encoding("br;q=0.5, gzip", ["br", "gzip"]), "gzip")
+        self.assertEqual(choose_encoding("*;q=0.1, br;q=0", ["br", "gzip"]), "gzip")
+
+    def test_file_is_closed_without_a_file_wrapper(self):
+        response = self.app({"REQUEST_METHOD": "GET", "PATH_INFO": "/static/css/site.0123456789ab.css"}, lambda *args: None)
+        self.assertEqual(b"".join(response), self.asset.read_bytes())
+
+        response.close()
+
+        self.assertTrue(response.handle.closed)
+
+    def test_unknown_and_escaping_paths_fall_through_to_django(self):
+        self.request("/static/missing.css")
+        self.request("/static/../etc/passwd")
+
+        self.assertEqual(self.fallback_calls, ["/static/missing.css", "/static/../etc/passwd"])
+
+
+class ManifestStaticTemplateTests(TestCase):
+    # STORAGES is chosen from DEBUG at import time, so the production storage is
+    # switched in explicitly here.
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        storages = {
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+            "staticfiles": {"BACKEND": "main.static_storage.CompressedManifestStaticFilesStorage"},
+        }
+        override = override_settings(DEBUG=False, STATIC_ROOT=self.tmp.name, STORAGES=storages)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(self.tmp.cleanup)
+        user_model = get_user_model()
+        user_model.objects.create_user(username="user1", password="pass12345")
+
+    def test_pages_render_with_hashed_static_urls(self):
+        call_command("collectstatic", interactive=False, verbosity=0)
+        self.client.login(username="user1", password="pass12345")
+
+        home = self.client.get(reverse("home"))
+        form = self.client.get(reverse("assessment_test"))
+
+        self.assertEqual(home.status_code, 200)
+        self.assertRegex(home.content.decode(), r"/static/images/Fatima\.[0-9a-f]{12}\.PNG")
+        self.assertEqual(form.status_code, 200)
+
+    def test_uncollected_assets_fall_back_to_plain_urls(self):
+        response = self.client.get(reverse("home"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "/static/images/Fatima.PNG")
+
+
+class CompressedReportFieldTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="user1", password="pass12345")
+        self.addCleanup(clear_dictionary_cache)
+
+    def stored_column(self, report_id: int) -> bytes:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT ai_report FROM main_assessmentreport WHERE id = %s", [report_id])
+            return bytes(cursor.fetchone()[0])
+
+    def test_report_text_is_compressed_and_decoded_lazily(self):
+        text = _sample_report() * 20
+        report = AssessmentReport.objects.create(user=self.user, payload={"age": 40}, ai_report=text)
+
+        stored = self.stored_column(report.pk)
+        self.assertEqual(stored[0], TAG_ZLIB)
+        self.assertLess(len(stored), len(text))
+
+        loaded = AssessmentReport.objects.get(pk=report.pk)
+        self.assertIsInstance(loaded.__dict__["ai_report"], StoredBlob)
+        self.assertEqual(loaded.ai_report, text)
+        self.assertEqual(loaded.payload, {"age": 40})
+
+    def test_saving_untouched_row_keeps_stored_bytes(self):
+        report = AssessmentReport.objects.create(user=self.user, payload={}, ai_report=_sample_report() * 20)
+        stored = self.stored_column(report.pk)
+
+        loaded = AssessmentReport.objects.get(pk=report.pk)
+        loaded.pdf_file = "assessment_reports/report.pdf"
+        loaded.save()
+
+        self.assertEqual(self.stored_column(report.pk), stored)
+
+    @override_settings(REPORT_COMPRESSION_CODEC="none")
+    def test_codec_none_stores_raw_text(self):
+        report = AssessmentReport.objects.create(user=self.user, payload={}, ai_report=_sample_report() * 20)
+
+        self.assertEqual(self.stored_column(report.pk)[0], TAG_RAW)
+        self.assertEqual(AssessmentReport.objects.get(pk=report.pk).ai_report, _sample_report() * 20)
+
+    def test_recompress_applies_trained_dictionary(self):
+        samples = report_samples(50, synthetic=True)
+        reports = [
+            AssessmentReport.objects.create(user=self.user, payload=payload, ai_report=text)
+            for payload, text in samples[:5]
+        ]
+        plain_size = len(self.stored_column(reports[0].pk))
+        train_report_dictionary("zlib", samples)
+
+        with override_settings(REPORT_COMPRESSION_DICTIONARY=True):
+            self.assertEqual(recompress_reports(batch_size=2), 5)
+        clear_dictionary_cache()
+
+        stored = self.stored_column(reports[0].pk)
+        self.assertEqual(stored[0], TAG_ZLIB_DICT)
+        self.assertLess(len(stored), plain_size)
+        self.assertEqual(AssessmentReport.objects.get(pk=reports[0].pk).ai_report, samples[0][1])
+
+
+    def test_dictionary_training_uses_stored_reports_only(self):
+        for payload, text in report_samples(3, synthetic=True):
+            AssessmentReport.objects.create(user=self.user, payload=payload, ai_report=text)
+
+        self.assertEqual(len(report_samples(1000)), 3)
+        with self.assertRaisesMessage(CommandError, "Only 3 stored reports"):
+            call_command("train_report_dictionary", stdout=StringIO())
+        self.assertFalse(CompressionDictionary.objects.exists())
+
+        call_command("train_report_dictionary", "--min-samples", "3", stdout=StringIO())
+        self.assertEqual(CompressionDictionary.objects.get().sample_count, 3)
+
+class ReportArchiveTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="user1", password="pass12345")
+        self.old = AssessmentReport.objects.create(user=self.user, payload={"age": 51}, ai_report=_sample_report("High Risk"))
+        self.recent = AssessmentReport.objects.create(user=self.user, payload={}, ai_report=_sample_report("Low Risk"))
+        AssessmentReport.objects.filter(pk=self.old.pk).update(created_at=timezone.now() - timedelta(days=400))
+
+    def test_old_reports_move_to_archive_with_index_and_summary_intact(self):
+        self.assertEqual(archive_reports(older_than_days=365, batch_size=1), 1)
+
+        self.assertEqual(list(AssessmentReport.objects.values_list("pk", flat=True)), [self.recent.pk])
+        archived = ArchivedReport.objects.get(pk=self.old.pk)
+        self.assertEqual(archived.payload, {"age": 51})
+        self.assertIn("High Risk", archived.ai_report)
+        self.assertTrue(SearchDocument.objects.filter(kind=SearchDocument.KIND_REPORT, object_id=self.old.pk).exists())
+        self.assertEqual(UserRiskSummary.objects.get(user=self.user).total_reports, 2)
+        self.assertEqual(rebuild_risk_summary(self.user.id).risk_counts, {"High Risk": 1, "Low Risk": 1})
+
+    def test_deleting_an_archived_report_cleans_up_index_and_summary(self):
+        archive_reports(older_than_days=365)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ArchivedReport.objects.get(pk=self.old.pk).delete()
+
+        self.assertFalse(SearchDocument.objects.filter(kind=SearchDocument.KIND_REPORT, object_id=self.old.pk).exists())
+        self.assertFalse(ReportSignature.objects.filter(report_id=self.old.pk).exists())
+        self.assertEqual(UserRiskSummary.objects.get(user=self.user).total_reports, 1)
+
+    def test_report_detail_falls_back_to_archive(self):
+        archive_reports(older_than_days=365)
+        self.client.login(username="user1", password="pass12345")
+
+        response = self.client.get(reverse("report_detail", args=[self.old.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["is_archived"])
+        self.assertEqual(response.context["risk_label"], "High Risk")
+
+    def test_archived_reports_stay_private(self):
+        archive_reports(older_than_days=365)
+        get_user_model().objects.create_user(username="user2", password="pass12345")
+        self.client.login(username="user2", password="pass12345")
+
+        response = self.client.get(reverse("report_detail", args=[self.old.pk]))
+
+        self.assertEqual(response.status_code, 404)
+
+
+class RedFlagPrescreenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="user1", password="pass12345")
+        self.client.login(username="user1", password="pass12345")
+
+    def test_labeled_corpus(self):
+        for case in load_corpus():
+            with self.subTest(case=case["id"]):
+                self.assertEqual(screen_payload(case["payload"]).flags, sorted(case["expected"]))
+
+    def test_emergency_page_is_shown_before_the_model_finishes(self):
+        outcome = AssessmentOutcome(_sample_report("Emergency", "Acute coronary syndrome"), "gpt-test", "ok", 4000)
+        data = _assessment_post_data(q7="Crushing pressure spreading to my left arm and jaw")
+        with mock.patch("main.background_assessment.run_in_background") as background:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse("assessment_test"), data)
+
+        self.assertTemplateUsed(response, "main/emergency_escalation.html")
+        report = AssessmentReport.objects.get()
+        self.assertEqual(report.status, AssessmentReport.STATUS_PENDING)
+        self.assertEqual(report.red_flags["flags"], ["chest_pain_radiating"])
+        self.assertFalse(UserRiskSummary.objects.filter(user=self.user).exists())
+
+        target, report_id = background.call_args.args
+        with mock.patch("main.background_assessment.run_assessment", return_value=outcome):
+            target(report_id)
+
+        report.refresh_from_db()
+        self.assertEqual(report.status, AssessmentReport.STATUS_READY)
+        self.assertEqual(UserRiskSummary.objects.get(user=self.user).latest_risk_label, "Emergency")
+        self.assertEqual(AssessmentEvent.objects.get().report_id, report.pk)
+
+    @override_settings(RED_FLAG_BACKGROUND_THREAD=False)
+    def test_without_a_thread_the_report_page_finishes_the_assessment(self):
+        outcome = AssessmentOutcome(_sample_report("Emergency", "Acute coronary syndrome"), "gpt-test", "ok", 4000)
+        data = _assessment_post_data(q7="Crushing pressure spreading to my left arm and jaw")
+        with mock.patch("main.background_assessment.run_in_background") as background:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse("assessment_test"), data)
+        background.assert_not_called()
+        report = AssessmentReport.objects.get()
+
+        response = self.client.get(reverse("report_detail", args=[report.pk]))
+        self.assertContains(response, reverse("report_resume", args=[report.pk]))
+
+        with mock.patch("main.background_assessment.run_assessment", return_value=outcome) as run:
+            self.client.post(reverse("report_resume", args=[report.pk]))
+            self.client.post(reverse("report_resume", args=[report.pk]))
+
+        run.assert_called_once()
+        report.refresh_from_db()
+        self.assertEqual(report.status, AssessmentReport.STATUS_READY)
+
+    def test_stale_pending_reports_are_finished_by_the_command(self):
+        outcome = AssessmentOutcome(_sample_report("Emergency", "Meningitis"), "gpt-test", "ok", 4000)
+        fresh = AssessmentReport.objects.create(user=self.user, payload={}, ai_report="", status=AssessmentReport.STATUS_PENDING)
+        stale = AssessmentReport.objects.create(user=self.user, payload={}, ai_report="", status=AssessmentReport.STATUS_PENDING)
+        AssessmentReport.objects.filter(pk=stale.pk).update(created_at=timezone.now() - timedelta(minutes=10))
+
+        with mock.patch("main.background_assessment.run_assessment", return_value=outcome):
+            call_command("finish_pending_assessments", stdout=StringIO())
+
+        self.assertEqual(AssessmentReport.objects.get(pk=stale.pk).status, AssessmentReport.STATUS_READY)
+        self.assertEqual(AssessmentReport.objects.get(pk=fresh.pk).status, AssessmentReport.STATUS_PENDING)
+
+    def test_a_racing_finish_records_the_report_once(self):
+        outcome = AssessmentOutcome(_sample_report("Emergency", "Meningitis"), "gpt-test", "ok", 4000)
+        report = AssessmentReport.objects.create(user=self.user, payload={}, ai_report="", status=AssessmentReport.STATUS_PENDING)
+        AssessmentReport.objects.filter(pk=report.pk).update(created_at=timezone.now() - timedelta(minutes=10))
+        report.refresh_from_db()
+        resumable = []
+
+        def model(*args):
+            # A page load or the cron arrives while the thread waits on the model.
+            if not resumable:
+                resumable.append(can_resume_assessment(report))
+                finish_pending_assessment(report.pk)
+            return outcome
+
+        with mock.patch("main.background_assessment.run_assessment", side_effect=model):
+            resume_pending_assessment(report.pk)
+
+        self.assertEqual(resumable, [False])
+        self.assertEqual(AssessmentReport.objects.get(pk=report.pk).status, AssessmentReport.STATUS_READY)
+        self.assertEqual(UserRiskSummary.objects.get(user=self.user).total_reports, 1)
+        self.assertEqual(AssessmentEvent.objects.count(), 1)
+        self.assertEqual(search_documents("meningitis", user_id=self.user.id).count(), 1)
+
+    def test_routine_answers_use_the_normal_flow(self):
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": ""}):
+            response = self.client.post(reverse("assessment_test"), _assessment_post_data(q7="No"))
+
+        self.assertTemplateUsed(response, "main/assessment_result.html")
+        report = AssessmentReport.objects.get()
+        self.assertEqual(report.red_flags["flags"], [])
+        # Without an API key the model call fails, so the report is not offered as ready.
+        self.assertEqual(report.status, AssessmentReport.STATUS_FAILED)
+        self.assertFalse(UserRiskSummary.objects.filter(user=self.user).exists())
+
+
+class ModelRoutingTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="user1", password="pass12345")
+        self.client.login(username="user1", password="pass12345")
+
+    def payload(self, answers: int, text: str = "Mild cough") -> dict:
+        return build_assessment_payload({f"q{idx}": text for idx in range(1, answers + 1)})
+
+    def test_tier_follows_answers_text_and_risk(self):
+        self.assertEqual(route_assessment(self.payload(3)).tier, "fast")
+        self.assertEqual(route_assessment(self.payload(15)).tier, "standard")
+        self.assertEqual(route_assessment(self.payload(40)).tier, "thorough")
+        self.assertEqual(route_assessment(self.payload(5, "x" * 1000)).tier, "thorough")
+        self.assertEqual(route_assessment(self.payload(3), emergency=True).tier, "thorough")
+        with override_settings(ASSESSMENT_MODEL_ROUTING=False):
+            self.assertEqual(route_assessment(self.payload(3)).tier, "standard")
+
+    @override_settings(ASSESSMENT_MODEL_TIERS={
+        "fast": {"model": "fast-model", "timeout": 5},
+        "standard": {"model": "standard-model", "timeout": 30},
+        "thorough": {"model": "thorough-model", "timeout": 60},
+    })
+    def test_decision_and_latency_are_recorded_per_tier(self):
+        outcome = AssessmentOutcome(_sample_report("Low Risk"), "fast-model", "ok", 900)
+        with mock.patch("main.views.run_assessment", return_value=outcome) as run:
+            self.client.post(reverse("assessment_test"), _assessment_post_data(q1="Sore throat"))
+
+        self.assertEqual(run.call_args.args[1:], ("fast-model", 5))
+        event = AssessmentEvent.objects.get()
+        self.assertEqual(event.tier, "fast")
+        self.assertEqual(event.routing["answered"], 1)
+
+        record_assessment_event(AssessmentOutcome("", "standard-model", "error", 30000), routing=route_assessment(self.payload(15)))
+        with self.assertNumQueries(1):
+            summary = tier_latency_summary()
+        self.assertEqual(
+            [(row["tier"], row["total"], row["errors"], row["latency_p95_ms"]) for row in summary],
+            [("fast", 1, 0, 1000), ("standard", 1, 1, None)],
+        )
+
+
+class SimilarReportTests(TestCase):
+    def setUp(self):
+        # The index lives in process memory; test rollbacks can reuse primary keys.
+        shared_index().clear()
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="user1", password="pass12345")
+        self.other = user_model.objects.create_user(username="user2", password="pass12345")
+
+    def report(self, user, notes: str, **answers) -> AssessmentReport:
+        payload = build_assessment_payload({"age": 44, "additional_notes": notes, **answers})
+        return AssessmentReport.objects.create(user=user, payload=payload, ai_report=_sample_report())
+
+    def test_near_duplicate_ranks_first_and_other_users_are_excluded(self):
+        current = self.report(self.user, "Dry cough and sore throat after a cold", q1="Yes", q4="Low fever")
+        near = self.report(self.user, "Dry cough and sore throat after a cold week", q1="Yes", q4="Low fever")
+        self.report(self.user, "Lower back pain after lifting boxes", q9="Sometimes")
+        self.report(self.other, "Dry cough and sore throat after a cold", q1="Yes", q4="Low fever")
+
+        cases = similar_cases(current, self.user)
+
+        self.assertEqual(cases[0]["id"], near.pk)
+        self.assertGreater(cases[0]["similarity"], 60)
+        self.assertTrue(all(case["id"] != current.pk for case in cases))
+
+    def test_signature_follows_payload_edits_and_survives_archiving(self):
+        current = self.report(self.user, "Dry cough and sore throat", q1="Yes")
+        old = self.report(self.user, "Lower back pain after lifting", q9="Sometimes")
+        self.assertEqual(similar_cases(current, self.user), [])
+
+        old.payload = current.payload
+        old.save()
+        self.assertEqual(ReportSignature.objects.filter(report_id=old.pk).count(), 1)
+        self.assertEqual([case["id"] for case in similar_cases(current, self.user)], [old.pk])
+
+        AssessmentReport.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=400))
+        archive_reports(older_than_days=365)
+        self.client.login(username="user1", password="pass12345")
+        response = self.client.get(reverse("report_detail", args=[current.pk]))
+
+        self.assertEqual([case["id"] for case in response.context["similar_cases"]], [old.pk])
+        self.assertContains(response, reverse("report_detail", args=[old.pk]))
+
+    def test_deleted_report_drops_out(self):
+        current = self.report(self.user, "Dry cough and sore throat", q1="Yes")
+        near = self.report(self.user, "Dry cough and sore throat", q1="Yes")
+        self.assertEqual(len(similar_cases(current, self.user)), 1)
+
+        near.delete()
+
+        self.assertFalse(ReportSignature.objects.filter(report_id=near.pk).exists())
+        self.assertEqual(similar_cases(current, self.user), [])
+
+
+class RequestProfilingTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.staff = user_model.objects.create_user(username="staff", password="pass12345", is_staff=True, is_superuser=True)
+        self.user = user_model.objects.create_user(username="user1", password="pass12345")
+        self.report = AssessmentReport.objects.create(user=self.staff, payload={}, ai_report=_sample_report())
+        self.url = reverse("report_detail", args=[self.report.pk])
+
+    def test_untriggered_and_invalid_requests_are_not_profiled(self):
+        self.client.login(username="staff", password="pass12345")
+        self.assertNotIn(PROFILE_ID_HEADER, self.client.get(self.url).headers)
+        self.client.get(self.url, {"_profile": "forged:token"})
+        self.client.get(self.url, {"_profile": profiling_token(self.user)})
+
+        self.client.login(username="user1", password="pass12345")
+        self.client.get(reverse("profile"), {"_profile": profiling_token(self.user)})
+
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_signed_request_stores_downloadable_profile_with_sql(self):
+        self.client.login(username="staff", password="pass12345")
+
+        response = self.client.get(self.url, HTTP_X_PROFILE_TOKEN=profiling_token(self.staff))
+
+        self.assertEqual(response.status_code, 200)
+        profile = RequestProfile.objects.get(pk=response.headers[PROFILE_ID_HEADER])
+        self.assertEqual((profile.view_name, profile.status_code, profile.user), ("report_detail", 200, self.staff))
+        self.assertGreater(profile.query_count, 0)
+        self.assertTrue(any("main_assessmentreport" in query["sql"] for query in profile.queries))
+        self.assertIn("report_detail", profile.summary)
+
+        download = self.client.get(reverse("admin:main_requestprofile_download", args=[profile.pk]))
+        stats = marshal.loads(download.content)
+        self.assertTrue(any(name == "report_detail" for _, _, name in stats))
+        self.assertEqual(self.client.get(reverse("admin:main_requestprofile_change", args=[profile.pk])).status_code, 200)
+        self.assertContains(self.client.get(reverse("admin:main_requestprofile_changelist")), "_profile=")
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="user1", password="pass12345")
+        for idx in range(25):
+            AssessmentReport.objects.create(user=self.user, payload={"additional_notes": f"cough {idx}"}, ai_report=_sample_report())
+            Note.objects.create(user=self.user, title=f"Note {idx}", content="Cough")
+        self.report = AssessmentReport.objects.first()
+        self.note = Note.objects.first()
+        self.client.login(username="user1", password="pass12345")
+
+    def test_every_url_stays_within_its_budget(self):
+        url_kwargs = {
+            "report_detail": {"pk": self.report.pk},
+            "report_follow_up": {"pk": self.report.pk},
+            "report_resume": {"pk": self.report.pk},
+            "assessment_step": {"step": 1},
+            "note_update": {"pk": self.note.pk},
+            "note_delete": {"pk": self.note.pk},
+        }
+
+        self.assertEqual(url_budget_problems(self.client, main_urls.urlpatterns, url_kwargs), [])
+
+    def test_assessment_submission_stays_within_its_budget(self):
+        outcome = AssessmentOutcome(_sample_report("Low Risk"), "gpt-test", "ok", 900)
+        recorder = QueryRecorder()
+        with mock.patch("main.views.run_assessment", return_value=outcome), recorder.capture():
+            self.client.post(reverse("assessment_test"), _assessment_post_data(q1="Sore throat"))
+
+        self.assertEqual(recorder.report("assessment_test", views.assessment_test.query_budget).problems, [])
+
+    def test_repeated_queries_are_attributed_to_their_source(self):
+        recorder = QueryRecorder()
+        with recorder.capture():
+            usernames = [note.user.username for note in Note.objects.all()]
+
+        report = recorder.report("notes", QueryBudget(30, max_repeats=2))
+        self.assertEqual(len(usernames), 25)
+        self.assertEqual(report.count, 26)
+        self.assertEqual(len(report.repeated), 1)
+        self.assertEqual(report.repeated[0].count, 25)
+        self.assertIn("main/tests.py", report.repeated[0].locations[0])
+
+    @override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_RAISE=True)
+    def test_middleware_raises_when_a_view_exceeds_its_budget(self):
+        with mock.patch.object(views.report_detail, "query_budget", QueryBudget(1)):
+            with self.assertRaisesMessage(QueryBudgetError, "GET report_detail"):
+                self.client.get(reverse("report_detail", args=[self.report.pk]))
+
+
+class ReportFollowUpTests(TestCase):
+    def setUp(self):
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(username="user1", password="pass12345")
+        self.report = AssessmentReport.objects.create(
+            user=self.user,
+            payload=build_assessment_payload({"q1": "Cough"}),
+            ai_report="Please answer: do you have a fever?",
+            response_id="resp_1",
+        )
+        self.client.login(username="user1", password="pass12345")
+        self.url = reverse("report_follow_up", args=[self.report.pk])
+
+    def test_follow_up_chains_on_previous_response(self):
+        outcome = AssessmentOutcome(_sample_report("Low Risk"), "gpt-test", "ok", 700, 120, 800, "resp_2")
+        with mock.patch("main.follow_up.continue_assessment", return_value=outcome) as chained, mock.patch(
+            "main.follow_up.run_assessment"
+        ) as full:
+            response = self.client.post(self.url, {"answers": "No fever, cough is dry"})
+
+        revision = AssessmentReport.objects.get(parent_report_id=self.report.pk)
+        self.assertRedirects(response, reverse("report_detail", args=[revision.pk]))
+        self.assertEqual(chained.call_args.args[:2], ("resp_1", "No fever, cough is dry"))
+        full.assert_not_called()
+        self.assertEqual(revision.response_id, "resp_2")
+        self.assertEqual(revision.payload["follow_up_answers"], ["No fever, cough is dry"])
+        self.assertIn("follow-up chained on previous response", AssessmentEvent.objects.get(report_id=revision.pk).routing["reasons"])
+
+        detail = self.client.get(reverse("report_detail", args=[self.report.pk]))
+        self.assertEqual([item.pk for item in detail.context["revisions"]], [revision.pk])
+
+    def test_missing_or_expired_response_falls_back_to_full_payload(self):
+        failed = AssessmentOutcome("OpenAI analysis failed.", "gpt-test", "error")
+        outcome = AssessmentOutcome(_sample_report("Low Risk"), "gpt-test", "ok", 900, response_id="resp_3")
+        with mock.patch("main.follow_up.continue_assessment", return_value=failed), mock.patch(
+            "main.follow_up.run_assessment", return_value=outcome
+        ) as full:
+            self.client.post(self.url, {"answers": "No fever"})
+
+        payload = full.call_args.args[0]
+        self.assertEqual(payload["follow_up_answers"], ["No fever"])
+        self.assertEqual(payload["question_answers"][0]["answer"], "Cough")
+        self.assertEqual(AssessmentReport.objects.get(parent_report_id=self.report.pk).response_id, "resp_3")
+
+    def test_failed_follow_up_is_saved_as_failed(self):
+        failed = AssessmentOutcome("OpenAI analysis failed.", "gpt-test", "error")
+        with mock.patch("main.follow_up.continue_assessment", return_value=failed), mock.patch(
+            "main.follow_up.run_assessment", return_value=failed
+        ):
+            self.client.post(self.url, {"answers": "No fever"})
+
+        revision = AssessmentReport.objects.get(parent_report_id=self.report.pk)
+        self.assertEqual(revision.status, AssessmentReport.STATUS_FAILED)
+        follow_up = self.client.post(reverse("report_follow_up", args=[revision.pk]), {"answers": "Still coughing"})
+        self.assertEqual(follow_up.status_code, 404)
+
+    def test_red_flag_follow_up_shows_the_escalation_page(self):
+        with mock.patch("main.background_assessment.run_in_background") as background, mock.patch(
+            "main.follow_up.continue_assessment"
+        ) as chained:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(self.url, {"answers": "Now I have crushing chest pain spreading to my jaw"})
+
+        self.assertTemplateUsed(response, "main/emergency_escalation.html")
+        chained.assert_not_called()
+        background.assert_called_once()
+        revision = AssessmentReport.objects.get(parent_report_id=self.report.pk)
+        self.assertEqual(revision.status, AssessmentReport.STATUS_PENDING)
+        self.assertEqual(revision.red_flags["flags"], ["chest_pain_radiating"])
+
+    def test_other_users_and_pending_reports_cannot_be_followed_up(self):
+        AssessmentReport.objects.filter(pk=self.report.pk).update(status=AssessmentReport.STATUS_PENDING)
+        self.assertEqual(self.client.post(self.url, {"answers": "No fever"}).status_code, 404)
+
+        get_user_model().objects.create_user(username="user2", password="pass12345")
+        self.client.login(username="user2", password="pass12345")
+        AssessmentReport.objects.filter(pk=self.report.pk).update(status=AssessmentReport.STATUS_READY)
+        self.assertEqual(self.client.post(self.url, {"answers": "No fever"}).status_code, 404)
+        self.assertFalse(AssessmentReport.objects.filter(parent_report_id=self.report.pk).exists())
+
+
+class ReportSectionRepairTests(TestCase):
+    def setUp(self):
+        self.complete = synthetic_report(random.Random(3))[1]
+        self.partial = "\n\n".join(
+            f"{section_heading(key)}\nText for {key}."
+            for key in SECTION_TITLES
+            if key not in ("risk_stratification", "what_not_to_do")
+        )
+
+    def test_validation_flags_missing_malformed_and_clarifying_replies(self):
+        self.assertFalse(validate_report(self.complete).needs_repair)
+
+        validation = validate_report(self.partial)
+        self.assertEqual(validation.sections, ["risk_stratification", "what_not_to_do"])
+        self.assertTrue(validation.disclaimer_missing)
+
+        unclear = "\n\n".join(
+            f"{section_heading(key)}\n{'Not sure yet.' if key == 'risk_stratification' else 'Details.'}" for key in SECTION_TITLES
+        )
+        self.assertEqual(validate_report(unclear).malformed, ["risk_stratification"])
+        self.assertTrue(validate_report("Before I assess this, how long have you had the fever?").is_clarification)
+
+    def test_only_missing_sections_are_requested_and_spliced_in_order(self):
+        outcome = AssessmentOutcome(self.partial, "gpt-test", "ok", 5000, 1500, 1200, "resp_1")
+        repair = AssessmentOutcome(
+            f"{section_heading('risk_stratification')}\nModerate Risk\n\n{section_heading('what_not_to_do')}\n- Do not delay care.",
+            "gpt-test", "ok", 800, 1600, 90, "resp_2",
+        )
+        with mock.patch("main.report_repair.repair_sections", return_value=repair) as requested:
+            repaired, info = repair_report(outcome, "gpt-test", 30)
+
+        self.assertEqual(requested.call_args.args[:2], ("resp_1", ["## 3) Risk Stratification", "## 9) What NOT to Do"]))
+        sections = parse_assessment_sections(repaired.text)
+        self.assertTrue(all(sections.values()))
+        self.assertEqual(sections["risk_stratification"], "Moderate Risk")
+        self.assertTrue(repaired.text.endswith(SAMPLE_DISCLAIMER))
+        self.assertEqual(repaired.text.count(SAMPLE_DISCLAIMER), 1)
+        self.assertEqual(repaired.response_id, "resp_2")
+        self.assertEqual(info["saved_tokens"], 1500 + 1200 - 1600 - 90)
+        self.assertTrue(info["complete"])
+
+    def test_repairs_are_recorded_and_summarised(self):
+        user = get_user_model().objects.create_user(username="user1", password="pass12345")
+        self.client.login(username="user1", password="pass12345")
+        outcome = AssessmentOutcome(self.complete.replace(SAMPLE_DISCLAIMER, ""), "gpt-test", "ok", 900, 1000, 700, "resp_1")
+        with mock.patch("main.views.run_assessment", return_value=outcome), mock.patch("main.report_repair.repair_sections") as requested:
+            self.client.post(reverse("assessment_test"), _assessment_post_data(q1="Sore throat"))
+
+        requested.assert_not_called()
+        self.assertTrue(AssessmentReport.objects.get(user=user).ai_report.endswith(SAMPLE_DISCLAIMER))
+        self.assertEqual(AssessmentEvent.objects.get().repair["saved_tokens"], 1700)
+        with self.assertNumQueries(1):
+            summary = repair_summary()
+        self.assertEqual((summary["total"], summary["repaired"], summary["disclaimer_only"], summary["saved_tokens"]), (1, 1, 1, 1700))
+
+
+@override_settings(
+    REPLICA_DATABASES=["replica1"],
+    REPLICA_HEALTH_PROBE_THREAD=False,
+    QUERY_BUDGET_ENABLED=True,
+    QUERY_BUDGET_RAISE=True,
+)
+class ReadReplicaRoutingTests(TransactionTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # A second, real SQLite file stands in for the replica; it only ever
+        # receives data by copying the primary.
+        cls.workdir = Path(tempfile.mkdtemp(prefix="replica-"))
+        replica = {"ENGINE": "django.db.backends.sqlite3", "NAME": str(cls.workdir / "replica.sqlite3")}
+        connections.settings["replica1"] = connections.configure_settings({"default": {}, "replica1": replica})["replica1"]
+        cls.databases = cls.databases | {"replica1"}
+
+    @classmethod
+    def tearDownClass(cls):
+        connections["replica1"].close()
+        del connections["replica1"]
+        connections.settings.pop("replica1")
+        shutil.rmtree(cls.workdir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username="user1", password="pass12345")
+        Note.objects.create(user=self.user, title="synced", content="")
+        record_heartbeat()
+        sync_sqlite_replica("replica1")
+        probe_replicas()
+        # Committed on the primary after the copy: the replica has not caught up.
+        Note.objects.create(user=self.user, title="fresh", content="")
+
+    def note_titles(self, client=None) -> set[str]:
+        client = client or self.client
+        return {note.title for note in client.get(reverse("note_list")).context["notes"]}
+
+    def test_reads_use_replica_until_the_browser_writes(self):
+        self.client.login(username="user1", password="pass12345")
+        self.assertEqual(self.note_titles(), {"synced"})
+
+        self.client.post(reverse("note_create"), {"title": "mine", "content": "x"})
+        self.assertEqual(self.note_titles(), {"synced", "fresh", "mine"})
+
+        other = self.client_class()
+        other.login(username="user1", password="pass12345")
+        self.assertEqual(self.note_titles(other), {"synced"})
+
+    def test_stopped_replica_falls_back_to_primary(self):
+        self.client.login(username="user1", password="pass12345")
+        # The replica still holds an old beat while the primary's is fresh.
+        ReplicaHeartbeat.objects.using("replica1").update(beat_at=timezone.now() - timedelta(seconds=60))
+        record_heartbeat()
+        status = probe_replicas()
+
+        self.assertFalse(status[0]["healthy"])
+        self.assertEqual(self.note_titles(), {"synced", "fresh"})
+
+    def test_no_recent_probe_reads_from_primary(self):
+        self.client.login(username="user1", password="pass12345")
+        cache.clear()
+
+        self.assertEqual(self.note_titles(), {"synced", "fresh"})
+
+    def test_pool_stats_connect_the_requested_alias(self):
+        connections["replica1"].close()
+        out = StringIO()
+
+        call_command("db_pool_stats", database="replica1", stdout=out)
+
+        stats = json.loads(out.getvalue())
+        self.assertEqual(stats["alias"], "replica1")
+        self.assertTrue(stats["connected"])
@@ -5,8 +5,14 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('profile/', views.profile, name='profile'),
+    path('dashboard/', views.risk_dashboard, name='risk_dashboard'),
     path('reports/<int:pk>/', views.report_detail, name='report_detail'),
+    path('reports/<int:pk>/follow-up/', views.report_follow_up, name='report_follow_up'),
+    path('reports/<int:pk>/resume/', views.report_resume, name='report_resume'),
+    path('search/', views.search, name='search'),
     path('assessment/', views.assessment_test, name='assessment_test'),
+    path('assessment/draft/', views.assessment_draft, name='assessment_draft'),
+    path('assessment/step/<int:step>/', views.assessment_step, name='assessment_step'),
     path('signup/', views.signup, name='signup'),
     path('login/', auth_views.LoginView.as_view(template_name='registration/login.html'), name='login'),
     path('logout/', auth_views.LogoutView.as_view(), name='logout'),
@@ -1,128 +1,49 @@
-import re
-
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth import update_session_auth_hash
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
-
-from .ai_service import build_assessment_payload, generate_assessment_report
-from .assessment_data import ASSESSMENT_QUESTIONS
-from .forms import ClinicalAssessmentForm, NoteForm, ProfileUpdateForm, SignUpForm
-from .models import AssessmentReport, Note
-
-
-SECTION_ALIASES = {
-    "clinical summary": "clinical_summary",
-    "most likely conditions (ranked)": "most_likely_conditions",
-    "risk stratification": "risk_stratification",
-    "recommended diagnostic tests": "recommended_diagnostic_tests",
-    "recommended next steps (by urgency)": "recommended_next_steps",
-    "what to monitor": "what_to_monitor",
-    "red flags requiring immediate escalation": "red_flags",
-    "general supportive advice": "general_supportive_advice",
-    "what not to do": "what_not_to_do",
-}
-
-
-def _normalize_heading(line: str) -> str:
-    cleaned = re.sub(r"^#{1,6}\s*", "", line).strip()
-    cleaned = re.sub(r"^\d+\)\s*", "", cleaned).strip().lower()
-    return cleaned
-
-
-def _clean_markdown_for_display(text: str) -> str:
-    cleaned_lines = []
-    for line in text.splitlines():
-        line = re.sub(r"^\s*#{1,6}\s*", "", line)
-        cleaned_lines.append(line.rstrip())
-    return "\n".join(cleaned_lines).strip()
-
-
-def parse_assessment_sections(report: str) -> dict[str, str]:
-    sections = {value: "" for value in SECTION_ALIASES.values()}
-    current_key = None
-    bucket: list[str] = []
-
-    for raw_line in report.splitlines():
-        line = raw_line.rstrip()
-        if line.lstrip().startswith("#"):
-            heading = _normalize_heading(line)
-            next_key = SECTION_ALIASES.get(heading)
-            if next_key:
-                if current_key is not None:
-                    sections[current_key] = _clean_markdown_for_display("\n".join(bucket))
-                current_key = next_key
-                bucket = []
-                continue
-        if current_key is not None:
-            bucket.append(line)
-
-    if current_key is not None:
-        sections[current_key] = _clean_markdown_for_display("\n".join(bucket))
-
-    return sections
-
-
-def extract_risk_label(risk_text: str) -> tuple[str, int]:
-    lower = risk_text.lower()
-    if "emergency" in lower:
-        return "Emergency", 95
-    if "high" in lower:
-        return "High Risk", 82
-    if "moderate" in lower:
-        return "Moderate Risk", 65
-    if "low" in lower:
-        return "Low Risk", 35
-    return "Unclear", 50
-
-
-def extract_condition_cards(conditions_text: str) -> list[dict[str, str | int]]:
-    chunks = [chunk.strip() for chunk in re.split(r"\n\s*\n", conditions_text.strip()) if chunk.strip()]
-    cards = []
-    for chunk in chunks:
-        lines = [line.strip() for line in chunk.splitlines() if line.strip()]
-        if not lines:
-            continue
-        title = re.sub(r"^[-*]\s*", "", lines[0])
-        title = re.sub(r"^\d+[.)]\s*", "", title)
-        confidence = 50
-        joined = " ".join(lines)
-        if re.search(r"\bhigh\b", joined, re.IGNORECASE):
-            confidence = 82
-        elif re.search(r"\bmedium\b|\bmoderate\b", joined, re.IGNORECASE):
-            confidence = 60
-        elif re.search(r"\blow\b", joined, re.IGNORECASE):
-            confidence = 35
-        percent_match = re.search(r"(\d{1,3})\s*%", joined)
-        if percent_match:
-            confidence = max(0, min(100, int(percent_match.group(1))))
-
-        details = _clean_markdown_for_display("\n".join(lines[1:]))
-        cards.append(
-            {
-                "title": title,
-                "details": details,
-                "confidence": confidence,
-            }
-        )
-
-    if not cards and conditions_text.strip():
-        cards.append(
-            {
-                "title": "Differential Assessment",
-                "details": conditions_text.strip(),
-                "confidence": 50,
-            }
-        )
-    return cards[:5]
-
-
+from django.views.decorators.http import require_POST
+
+from .ai_service import build_assessment_payload, run_assessment
+from .analytics import record_assessment_event
+from .archive import find_user_report
+from .assessment_data import ASSESSMENT_QUESTIONS, ASSESSMENT_SECTIONS
+from .background_assessment import can_resume_assessment, resume_pending_assessment, start_background_assessment
+from .db_routing import read_from_replica
+from .drafts import DraftError, discard_draft, draft_answers, merge_with_draft, save_draft_answers
+from .follow_up import can_follow_up, run_follow_up
+from .forms import (
+    ClinicalAssessmentForm,
+    ClinicalBasicsForm,
+    FollowUpForm,
+    NoteForm,
+    ProfileUpdateForm,
+    SignUpForm,
+    assessment_section_form,
+)
+from .model_routing import route_assessment
+from .models import ArchivedReport, AssessmentReport, Note, SearchDocument, UserRiskSummary
+from .query_budget import query_budget
+from .red_flags import screen_payload
+from .report_parsing import extract_condition_cards, extract_risk_label, parse_assessment_sections
+from .report_repair import repair_report
+from .risk_summary import dashboard_context
+from .search import search_documents
+from .similarity import similar_cases
+
+
+@query_budget(3)
 def home(request):
     return render(request, "main/home.html")
 
 
+@query_budget(8)
 def signup(request):
     if request.user.is_authenticated:
         return redirect("home")
@@ -138,12 +59,15 @@ def signup(request):
 
 
 @login_required
+@query_budget(4)
+@read_from_replica
 def note_list(request):
     notes = Note.objects.filter(user=request.user)
     return render(request, "main/note_list.html", {"notes": notes})
 
 
 @login_required
+@query_budget(5)
 def note_create(request):
     if request.method == "POST":
         form = NoteForm(request.POST)
@@ -158,6 +82,7 @@ def note_create(request):
 
 
 @login_required
+@query_budget(5)
 def note_update(request, pk):
     note = get_object_or_404(Note, pk=pk, user=request.user)
     if request.method == "POST":
@@ -171,6 +96,7 @@ def note_update(request, pk):
 
 
 @login_required
+@query_budget(5)
 def note_delete(request, pk):
     note = get_object_or_404(Note, pk=pk, user=request.user)
     if request.method == "POST":
@@ -180,41 +106,151 @@ def note_delete(request, pk):
 
 
 @login_required
+@query_budget(6)
+@read_from_replica
+def search(request):
+    query = request.GET.get("q", "").strip()
+    kind = request.GET.get("kind", "")
+    if kind not in dict(SearchDocument.KIND_CHOICES):
+        kind = ""
+    results = search_documents(query, user_id=request.user.id, kind=kind or None)
+    page_obj = Paginator(results, 20).get_page(request.GET.get("page"))
+    context = {
+        "query": query,
+        "kind": kind,
+        "kind_choices": SearchDocument.KIND_CHOICES,
+        "page_obj": page_obj,
+    }
+    return render(request, "main/search.html", context)
+
+
+def _emergency_escalation(request, assessment, screen):
+    context = {"assessment": assessment, "hits": screen.hits, "terms_version": screen.version}
+    return render(request, "main/emergency_escalation.html", context)
+
+
+def _complete_assessment(request, cleaned_data):
+    payload = build_assessment_payload(cleaned_data)
+    screen = screen_payload(payload) if settings.RED_FLAG_PRESCREEN else None
+    if screen is not None and screen.emergency:
+        # Show escalation advice now; the model assessment completes in the background.
+        with transaction.atomic():
+            assessment = start_background_assessment(request.user, payload, screen)
+        return _emergency_escalation(request, assessment, screen)
+
+    decision = route_assessment(payload)
+    outcome = run_assessment(payload, decision.model, decision.timeout)
+    outcome, repair = repair_report(outcome, decision.model, decision.timeout)
+    report = outcome.text
+    sections = parse_assessment_sections(report)
+    risk_label, risk_score = extract_risk_label(sections.get("risk_stratification", ""))
+    condition_cards = extract_condition_cards(sections.get("most_likely_conditions", ""))
+    with transaction.atomic():
+        assessment = AssessmentReport.objects.create(
+            user=request.user,
+            payload=payload,
+            ai_report=report,
+            status=AssessmentReport.STATUS_READY if outcome.ok else AssessmentReport.STATUS_FAILED,
+            red_flags=screen.as_dict() if screen is not None else {},
+            response_id=outcome.response_id,
+        )
+        record_assessment_event(
+            outcome,
+            user_id=request.user.id,
+            report_id=assessment.pk,
+            risk_label=risk_label,
+            routing=decision,
+            repair=repair,
+        )
+    context = {
+        "report": report,
+        "payload": payload,
+        "question_count": len(ASSESSMENT_QUESTIONS),
+        "assessment": assessment,
+        "sections": sections,
+        "risk_label": risk_label,
+        "risk_score": risk_score,
+        "condition_cards": condition_cards,
+    }
+    return render(request, "main/assessment_result.html", context)
+
+
+# Analytics rollups read and write one row per granularity (minute, hour, day).
+@login_required
+@query_budget(28, max_repeats=3)
 def assessment_test(request):
     if request.method == "POST":
-        form = ClinicalAssessmentForm(request.POST)
+        form = ClinicalAssessmentForm(merge_with_draft(request.user, request.POST))
         if form.is_valid():
-            payload = build_assessment_payload(form.cleaned_data)
-            report = generate_assessment_report(payload)
-            sections = parse_assessment_sections(report)
-            risk_label, risk_score = extract_risk_label(sections.get("risk_stratification", ""))
-            condition_cards = extract_condition_cards(sections.get("most_likely_conditions", ""))
-            assessment = AssessmentReport.objects.create(
-                user=request.user,
-                payload=payload,
-                ai_report=report,
-            )
-            context = {
-                "report": report,
-                "payload": payload,
-                "question_count": len(ASSESSMENT_QUESTIONS),
-                "assessment": assessment,
-                "sections": sections,
-                "risk_label": risk_label,
-                "risk_score": risk_score,
-                "condition_cards": condition_cards,
-            }
-            return render(request, "main/assessment_result.html", context)
+            discard_draft(request.user)
+            return _complete_assessment(request, form.cleaned_data)
+        draft_restored = False
     else:
-        form = ClinicalAssessmentForm()
+        if settings.ASSESSMENT_FORM_MODE == "paged" and "single" not in request.GET:
+            return redirect("assessment_step", step=0)
+        initial = draft_answers(request.user)
+        form = ClinicalAssessmentForm(initial=initial)
+        draft_restored = bool(initial)
     return render(
         request,
         "main/assessment_form.html",
-        {"form": form, "question_count": len(ASSESSMENT_QUESTIONS)},
+        {"form": form, "question_count": len(ASSESSMENT_QUESTIONS), "draft_restored": draft_restored},
     )
 
 
 @login_required
+@require_POST
+@query_budget(6)
+def assessment_draft(request):
+    field = request.POST.get("field", "")
+    try:
+        draft = save_draft_answers(request.user, {field: request.POST.get("value", "")})
+    except DraftError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return JsonResponse({"version": draft.version, "saved_at": draft.updated_at.isoformat()})
+
+
+@login_required
+@query_budget(28, max_repeats=3)
+def assessment_step(request, step):
+    step_count = len(ASSESSMENT_SECTIONS) + 1
+    if step >= step_count:
+        return redirect("assessment_step", step=0)
+    form_class = ClinicalBasicsForm if step == 0 else assessment_section_form(step - 1)
+
+    if request.method == "POST":
+        form = form_class(request.POST)
+        if form.is_valid():
+            save_draft_answers(request.user, form.cleaned_data)
+            if "back" in request.POST and step > 0:
+                return redirect("assessment_step", step=step - 1)
+            if step < step_count - 1:
+                return redirect("assessment_step", step=step + 1)
+            full_form = ClinicalAssessmentForm(draft_answers(request.user))
+            if not full_form.is_valid():
+                messages.error(request, "Please complete the patient basics before submitting.")
+                return redirect("assessment_step", step=0)
+            discard_draft(request.user)
+            return _complete_assessment(request, full_form.cleaned_data)
+    else:
+        answers = draft_answers(request.user)
+        form = form_class(initial={name: answers[name] for name in form_class.base_fields if name in answers})
+
+    context = {
+        "form": form,
+        "step": step,
+        "step_count": step_count,
+        "step_title": "Patient Basics" if step == 0 else ASSESSMENT_SECTIONS[step - 1][0],
+        "is_last_step": step == step_count - 1,
+        "progress_percent": round((step + 1) * 100 / step_count),
+        "question_count": len(ASSESSMENT_QUESTIONS),
+    }
+    return render(request, "main/assessment_step.html", context)
+
+
+@login_required
+@query_budget(6)
+@read_from_replica
 def profile(request):
     profile_form = ProfileUpdateForm(instance=request.user)
     password_form = PasswordChangeForm(user=request.user)
@@ -238,22 +274,68 @@ def profile(request):
     context = {
         "profile_form": profile_form,
         "password_form": password_form,
-        "assessment_reports": request.user.assessment_reports.all()[:20],
+        "assessment_reports": request.user.assessment_reports.only("id", "user_id", "created_at")[:20],
     }
     return render(request, "main/profile.html", context)
 
 
 @login_required
+@query_budget(9)
+@read_from_replica
 def report_detail(request, pk):
-    report = get_object_or_404(AssessmentReport, pk=pk, user=request.user)
+    report = find_user_report(request.user, pk)
+    if report is None:
+        raise Http404("Report not found.")
     sections = parse_assessment_sections(report.ai_report)
     risk_label, risk_score = extract_risk_label(sections.get("risk_stratification", ""))
     condition_cards = extract_condition_cards(sections.get("most_likely_conditions", ""))
     context = {
         "report_item": report,
+        "is_archived": isinstance(report, ArchivedReport),
+        "is_pending": getattr(report, "status", "") == AssessmentReport.STATUS_PENDING,
+        "can_resume": can_resume_assessment(report),
+        "is_failed": getattr(report, "status", "") == AssessmentReport.STATUS_FAILED,
         "sections": sections,
         "risk_label": risk_label,
         "risk_score": risk_score,
         "condition_cards": condition_cards,
+        "similar_cases": similar_cases(report, request.user),
+        "follow_up_form": FollowUpForm() if can_follow_up(report) else None,
+        "revisions": AssessmentReport.objects.filter(user=request.user, parent_report_id=report.pk).only("id", "created_at"),
     }
     return render(request, "main/report_detail.html", context)
+
+
+@login_required
+@require_POST
+@query_budget(28, max_repeats=3)
+def report_follow_up(request, pk):
+    report = get_object_or_404(AssessmentReport, pk=pk, user=request.user)
+    if not can_follow_up(report):
+        raise Http404("Report cannot be followed up.")
+    form = FollowUpForm(request.POST)
+    if not form.is_valid():
+        messages.error(request, "Please enter your answers before sending them.")
+        return redirect("report_detail", pk=report.pk)
+    revision, screen = run_follow_up(report, form.cleaned_data["answers"])
+    if screen is not None and screen.emergency:
+        return _emergency_escalation(request, revision, screen)
+    return redirect("report_detail", pk=revision.pk)
+
+
+@login_required
+@require_POST
+@query_budget(28, max_repeats=3)
+def report_resume(request, pk):
+    report = get_object_or_404(AssessmentReport, pk=pk, user=request.user)
+    if can_resume_assessment(report):
+        resume_pending_assessment(report.pk)
+    return redirect("report_detail", pk=report.pk)
+
+
+@login_required
+@query_budget(4)
+@read_from_replica
+def risk_dashboard(request):
+    summary = UserRiskSummary.objects.filter(user=request.user).first()
+    return render(request, "main/risk_dashboard.html", dashboard_context(summary))